@@ -58,6 +58,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_extensions',
     'rest_framework',
     'rest_framework.authtoken',
@@ -107,6 +108,38 @@ DATABASES = {
     'default': dj_database_url.config(default=os.getenv('DATABASE_URL'))
 }
 
+# Cache
+# Analytics responses are cached per process and invalidated by a data version
+# stored in the database, so no external cache service is needed.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'analytics': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'analytics',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    # Pending draft autosaves (forms.autosave). Shared by every worker and the
+    # flush_autosaves command, and never culled while there is room.
+    'autosave': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('AUTOSAVE_CACHE_DIR', '/var/tmp/osa-autosave'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+ANALYTICS_CACHE_TIMEOUT = 300
+
+# Draft autosaves are kept in Submission.draft_buffer and only written to the
+# section tables when the form is finalized (see forms.drafts).
+FORMS_DRAFT_BUFFER = True
+
+# Autosaves within this many seconds of a draft's last save are coalesced and
+# written at most once per interval; run flush_autosaves every interval or so.
+FORMS_AUTOSAVE_INTERVAL = 30
+
 
 
 # Password validation
@@ -168,7 +201,9 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'if-none-match',
 ]
+CORS_EXPOSE_HEADERS = ['etag']
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -0,0 +1,293 @@
+"""
+Synthetic data and timing harness behind `manage.py benchmark`.
+
+Seeded rows are built with the factories from users/management/commands and
+written with bulk_create, so signals do not fire; the derived analytics tables
+are rebuilt once at the end instead.
+"""
+import json
+import math
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from forms.models import (
+    Address, Student, Submission, SocioEconomicStatus, PARD,
+    Referral, Referrer, ReferredPerson,
+)
+from forms.map import FORM_TYPE_UNSLUG_MAP
+from users.models import CustomUser, Role
+from users.management.commands.factories import (
+    AddressFactory, StudentFactory, SubmissionFactory, SocioEconomicStatusFactory,
+)
+from analytics import counters, rollups, timeseries
+from analytics.cache import DATA_VERSION, get_cache
+
+BENCHMARK_EMAIL_DOMAIN = 'benchmark.invalid'
+BENCHMARK_ADDRESS_PREFIX = 'BENCH'
+BENCHMARK_ADMIN_EMAIL = f'admin@{BENCHMARK_EMAIL_DOMAIN}'
+
+YEARS = list(range(2018, 2025))
+MAX_STUDENTS = len(YEARS) * 100000
+
+
+def _entry_year(index):
+    return YEARS[index % len(YEARS)]
+
+
+def _student_number(index):
+    # Year 99YY is reserved for benchmark students, so they never collide with real ones.
+    return f'99{_entry_year(index) % 100:02d}-{index // len(YEARS):05d}'
+
+
+def _created_at(rng, index):
+    # SubmissionFactory would date the forms from the (reserved) student number year.
+    return timezone.make_aware(datetime(
+        _entry_year(index), rng.randint(1, 12), rng.randint(1, 28), rng.randint(8, 17), rng.randint(0, 59),
+    ))
+
+
+def _address(index, kind):
+    address = AddressFactory.build()
+    address.address_line_1 = f'{BENCHMARK_ADDRESS_PREFIX} {kind}{index} {address.address_line_1}'[:100]
+    return address
+
+
+def seed(students, batch_size=2000, pard_rate=0.1, referral_rate=0.05, stdout=None):
+    """Add `students` benchmark students with BIS and SCIF forms plus some PARD and referral forms."""
+    if students > MAX_STUDENTS:
+        raise ValueError(f'At most {MAX_STUDENTS} benchmark students are supported.')
+
+    password = make_password(None)
+    offset = CustomUser.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}').exclude(email=BENCHMARK_ADMIN_EMAIL).count()
+    rng = random.Random(offset)
+
+    for start in range(offset, offset + students, batch_size):
+        indices = range(start, min(start + batch_size, offset + students))
+        with transaction.atomic():
+            users = CustomUser.objects.bulk_create([
+                CustomUser(email=f'student{i}@{BENCHMARK_EMAIL_DOMAIN}', password=password, role=Role.STUDENT)
+                for i in indices
+            ])
+            permanent = Address.objects.bulk_create([_address(i, 'P') for i in indices])
+            in_up = Address.objects.bulk_create([_address(i, 'U') for i in indices])
+
+            batch = []
+            for i, user, home, dorm in zip(indices, users, permanent, in_up):
+                batch.append(StudentFactory.build(
+                    student_number=_student_number(i), user=user,
+                    date_initial_entry=f'{_entry_year(i)}-{_entry_year(i) + 1}',
+                    permanent_address=home, address_while_in_up=dorm,
+                ))
+            batch = Student.objects.bulk_create(batch)
+
+            submissions = []
+            for i, student in zip(indices, batch):
+                form_types = ['Basic Information Sheet', 'Student Cumulative Information File']
+                if rng.random() < pard_rate:
+                    form_types.append('Psychosocial Assistance and Referral Desk')
+                if rng.random() < referral_rate:
+                    form_types.append('Counseling Referral Slip')
+                for form_type in form_types:
+                    submissions.append(SubmissionFactory.build(
+                        student=student, form_type=form_type, created_at=_created_at(rng, i),
+                    ))
+            submissions = Submission.objects.bulk_create(submissions)
+
+            socio, pards, referrals = [], [], []
+            for submission in submissions:
+                if submission.form_type == 'Basic Information Sheet':
+                    socio.append(SocioEconomicStatusFactory.build(student_number=submission.student, submission=submission))
+                elif submission.form_type == 'Psychosocial Assistance and Referral Desk':
+                    pards.append(PARD(student_number=submission.student, submission_id=submission))
+                elif submission.form_type == 'Counseling Referral Slip':
+                    referrals.append(submission)
+            SocioEconomicStatus.objects.bulk_create(socio)
+            PARD.objects.bulk_create(pards)
+
+            if referrals:
+                referrers = Referrer.objects.bulk_create([Referrer(student=s.student) for s in referrals])
+                referred = ReferredPerson.objects.bulk_create([
+                    ReferredPerson(
+                        first_name=s.student.first_name, last_name=s.student.last_name,
+                        contact_number=s.student.contact_number, degree_program=s.student.degree_program,
+                        year_level=s.student.current_year_level, gender=s.student.sex,
+                    )
+                    for s in referrals
+                ])
+                Referral.objects.bulk_create([
+                    Referral(submission=s, referrer=referrer, referred_person=person,
+                             reason_for_referral='Benchmark', initial_actions_taken='Benchmark')
+                    for s, referrer, person in zip(referrals, referrers, referred)
+                ])
+
+        if stdout:
+            stdout.write(f'Seeded {indices.stop - offset}/{students} students')
+
+    refresh_derived()
+
+
+def flush():
+    """Delete every row created by seed()."""
+    with transaction.atomic():
+        students = Student.objects.filter(user__email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}')
+        submissions = Submission.objects.filter(student__in=students)
+        referrals = Referral.objects.filter(submission__in=submissions)
+        referrer_ids = list(referrals.values_list('referrer_id', flat=True))
+        referred_ids = list(referrals.values_list('referred_person_id', flat=True))
+        submissions.delete()
+        Referrer.objects.filter(pk__in=referrer_ids).delete()
+        ReferredPerson.objects.filter(pk__in=referred_ids).delete()
+        deleted, _ = CustomUser.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}').delete()
+        Address.objects.filter(address_line_1__startswith=f'{BENCHMARK_ADDRESS_PREFIX} ').delete()
+    refresh_derived()
+    return deleted
+
+
+def refresh_derived():
+    rollups.rebuild()
+    counters.reconcile()
+    timeseries.backfill()
+    # Cached dashboard responses predate the bulk inserts.
+    counters.increment(DATA_VERSION)
+
+
+def benchmark_admin():
+    """The dedicated benchmark admin account; removed again by flush()."""
+    admin = CustomUser.objects.filter(email=BENCHMARK_ADMIN_EMAIL).first()
+    if admin is None:
+        admin = CustomUser.objects.create_superuser(BENCHMARK_ADMIN_EMAIL, None)
+    return admin
+
+
+def endpoints():
+    """(name, url) for every dashboard endpoint and admin list view."""
+    student = Student.objects.filter(submission__status='submitted').order_by('pk').first()
+    since = timezone.localdate() - timedelta(days=2 * 365)
+    urls = [
+        ('dashboard.summary', '/api/dashboard/summary/'),
+        ('dashboard.bar_data', '/api/dashboard/bar-data/'),
+        ('dashboard.admin_reports', '/api/dashboard/admin-reports/'),
+        ('dashboard.recent_submissions', '/api/dashboard/recent-submissions/'),
+        ('dashboard.recent_bis_submissions', '/api/dashboard/recent-bis-submissions/'),
+        ('dashboard.recent_scif_submissions', '/api/dashboard/recent-scif-submissions/'),
+        ('dashboard.recent_drafts', '/api/dashboard/recent-drafts/'),
+        ('dashboard.activity', '/api/dashboard/activity/'),
+        ('dashboard.timeseries', f'/api/dashboard/timeseries/?granularity=month&start={since.isoformat()}'),
+        ('admin.students', '/api/forms/admin/students/'),
+        ('admin.bis_list', '/api/forms/admin/basic-information-sheet-submissions'),
+        ('admin.scif_list', '/api/forms/admin/student-cumulative-information-file-submissions'),
+        ('admin.referral_list', '/api/forms/admin/counseling-referral-slip-submissions/'),
+        ('admin.pard_list', '/api/forms/admin/psychosocial-assistance-and-referral-desk'),
+    ]
+    if student:
+        form_type = student.submission_set.filter(status='submitted').values_list('form_type', flat=True).first()
+        urls += [
+            ('admin.student_profile', f'/api/forms/admin/students/{student.pk}/'),
+            ('admin.student_forms', f'/api/forms/admin/student-forms/{student.pk}/'),
+            ('admin.student_form', f'/api/forms/admin/student-forms/{student.pk}/{FORM_TYPE_UNSLUG_MAP[form_type]}/'),
+        ]
+    return urls
+
+
+class QueryCounter:
+    """Counts executed statements without the 9000-entry cap of connection.queries."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def run(repeat=10, warmup=1, use_cache=False, only=None):
+    """Time each endpoint `repeat` times and return one result dict per endpoint."""
+    client = APIClient(SERVER_NAME=settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost')
+    client.force_authenticate(benchmark_admin())
+    cache = get_cache()
+
+    results = []
+    for name, url in endpoints():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        timings, queries, status, size = [], 0, None, 0
+        for iteration in range(warmup + repeat):
+            if not use_cache:
+                cache.clear()
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                response = client.get(url)
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+                elapsed = (time.perf_counter() - started) * 1000
+            if iteration >= warmup:
+                timings.append(elapsed)
+                queries = counter.count
+                status, size = response.status_code, len(content)
+
+        results.append({
+            'name': name,
+            'url': url,
+            'status': status,
+            'queries': queries,
+            'bytes': size,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(_percentile(timings, 0.95), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'max_ms': round(max(timings), 2),
+        })
+    return results
+
+
+def report(results, repeat, use_cache):
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'cache': use_cache,
+        'dataset': {
+            'students': Student.objects.count(),
+            'submissions': Submission.objects.count(),
+            'referrals': Referral.objects.count(),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance, min_delta_ms=5):
+    """
+    Regressions of `current` against a previous report: more queries, or a
+    p95 latency more than `tolerance` (a fraction) and `min_delta_ms` above the
+    baseline.
+    """
+    previous = {entry['name']: entry for entry in baseline.get('results', [])}
+    regressions = []
+    for entry in current['results']:
+        before = previous.get(entry['name'])
+        if not before:
+            continue
+        if entry['queries'] > before['queries']:
+            regressions.append(f"{entry['name']}: queries {before['queries']} -> {entry['queries']}")
+        slower = entry['p95_ms'] - before['p95_ms']
+        if slower > min_delta_ms and entry['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{entry['name']}: p95 {before['p95_ms']}ms -> {entry['p95_ms']}ms")
+    return regressions
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
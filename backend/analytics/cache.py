@@ -0,0 +1,80 @@
+import hashlib
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Max
+from rest_framework import status
+from rest_framework.response import Response
+
+from analytics import counters
+from forms.models import Submission
+
+DATA_VERSION = 'data:version'
+
+
+def get_cache():
+    return caches[getattr(settings, 'ANALYTICS_CACHE_ALIAS', 'analytics')]
+
+
+def data_version():
+    """The current data version; read from the database so every worker agrees on it."""
+    return counters.get_counts([DATA_VERSION])[DATA_VERSION]
+
+
+def bump_data_version():
+    """Invalidate every cached analytics response once the current transaction commits."""
+    transaction.on_commit(lambda: counters.increment(DATA_VERSION))
+
+
+def draft_watermark(request=None):
+    """
+    The latest saved_on of any draft. Draft saves leave the data version alone
+    (see analytics.signals), so views listing drafts add this to it.
+    """
+    saved_on = Submission.objects.filter(status='draft').aggregate(latest=Max('saved_on'))['latest']
+    return saved_on.isoformat() if saved_on else ''
+
+
+def versioned_cache(view=None, watermark=None):
+    """
+    Cache a GET view's response body under the current data version.
+
+    Responses carry an ETag built from the version and the request path, and a
+    matching If-None-Match is answered with 304 without running the view.
+    `watermark(request)`, if given, returns a string that is added to the
+    version, for data that changes without bumping it.
+    Place it under @api_view so authentication and permissions still apply.
+    """
+    if view is None:
+        return partial(versioned_cache, watermark=watermark)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        version = data_version()
+        if watermark:
+            version = f'{version}:{watermark(request)}'
+        path = request.get_full_path()
+        digest = hashlib.sha1(f'{version}:{path}'.encode('utf-8')).hexdigest()
+        etag = f'"{digest}"'
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cache = get_cache()
+        key = f'analytics:{digest}'
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, headers=headers)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 300))
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+    return wrapper
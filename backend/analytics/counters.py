@@ -0,0 +1,216 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from forms.models import Student, Submission
+from analytics.models import AnalyticsCounter, StudentFormStatus
+
+FORM_BITS = {
+    'Basic Information Sheet': 1,
+    'Student Cumulative Information File': 2,
+    'Psychosocial Assistance and Referral Desk': 4,
+    'Counseling Referral Slip': 8,
+}
+
+ENROLLED_STUDENTS = 'students:enrolled'
+
+
+def submitted_key(form_type):
+    return f'submitted:{form_type}'
+
+
+def counted_live(key):
+    """Whether `key` counts rows of the live tables (see live_counts)."""
+    return key == ENROLLED_STUDENTS or key.startswith('submitted:')
+
+
+def live_counts():
+    """The counted_live() counters, computed from the live tables."""
+    counts = {submitted_key(form_type): 0 for form_type in FORM_BITS}
+    counts.update({
+        submitted_key(row['form_type']): row['total']
+        for row in Submission.objects.filter(status='submitted').values('form_type').annotate(total=Count('pk')).order_by()
+    })
+    counts[ENROLLED_STUDENTS] = Student.objects.filter(status='enrolled').count()
+    return counts
+
+
+def bootstrap_counters():
+    """
+    Create the missing counted_live() counters from the live tables, for data
+    that predates the counters. Counters that already exist are left alone.
+    """
+    for key, value in live_counts().items():
+        AnalyticsCounter.objects.get_or_create(key=key, defaults={'value': value})
+
+
+def increment(key, delta=1):
+    # One UPDATE once the row exists; only a counter's first increment creates it.
+    if AnalyticsCounter.objects.filter(key=key).update(value=F('value') + delta):
+        return
+    if counted_live(key):
+        # Signals run after the change reached the live tables, so the
+        # bootstrapped count already includes `delta`.
+        bootstrap_counters()
+        return
+    AnalyticsCounter.objects.get_or_create(key=key)
+    AnalyticsCounter.objects.filter(key=key).update(value=F('value') + delta)
+
+
+def get_counts(keys):
+    """
+    Read several counters with one primary-key lookup. Missing counted_live()
+    counters are bootstrapped from the live tables; other missing keys are 0.
+    """
+    values = dict(AnalyticsCounter.objects.filter(key__in=keys).values_list('key', 'value'))
+    if any(key not in values and counted_live(key) for key in keys):
+        bootstrap_counters()
+        values = dict(AnalyticsCounter.objects.filter(key__in=keys).values_list('key', 'value'))
+    return {key: values.get(key, 0) for key in keys}
+
+
+def live_bitmap(student_id):
+    """A student's submitted_forms bitmap, computed from their submissions."""
+    bitmap = 0
+    form_types = (
+        Submission.objects
+        .filter(student_id=student_id, status='submitted')
+        .values_list('form_type', flat=True)
+        .distinct()
+    )
+    for form_type in form_types:
+        bitmap |= FORM_BITS.get(form_type, 0)
+    return bitmap
+
+
+def status_bitmap(student_id):
+    """
+    A student's stored bitmap. A student without a row yet (their forms
+    predate the bitmaps) gets one built from their submissions.
+    """
+    bitmap = StudentFormStatus.objects.filter(student_id=student_id).values_list('submitted_forms', flat=True).first()
+    if bitmap is None:
+        status_row, _ = StudentFormStatus.objects.get_or_create(
+            student_id=student_id, defaults={'submitted_forms': live_bitmap(student_id)},
+        )
+        bitmap = status_row.submitted_forms
+    return bitmap
+
+
+def mark_submitted(student_id, form_type):
+    bit = FORM_BITS.get(form_type)
+    if not student_id or not bit:
+        return
+    status_bitmap(student_id)
+    StudentFormStatus.objects.filter(student_id=student_id).update(submitted_forms=F('submitted_forms').bitor(bit))
+
+
+def unmark_submitted(student_id, form_type):
+    """Clear a form bit unless the student still has another submitted form of that type."""
+    bit = FORM_BITS.get(form_type)
+    if not student_id or not bit:
+        return
+    if Submission.objects.filter(student_id=student_id, form_type=form_type, status='submitted').exists():
+        return
+    StudentFormStatus.objects.filter(student_id=student_id).update(submitted_forms=F('submitted_forms').bitand(~bit))
+
+
+def submitted_forms(student_id):
+    """Map each form type to whether the student has submitted it."""
+    bitmap = status_bitmap(student_id)
+    return {form_type: bool(bitmap & bit) for form_type, bit in FORM_BITS.items()}
+
+
+def submission_state(instance):
+    """The counted fields of a submission, or None if any of them was deferred."""
+    data = instance.__dict__
+    if any(field not in data for field in ('status', 'form_type', 'student_id')):
+        return None
+    return data['status'], data['form_type'], data['student_id']
+
+
+def apply_submission_change(old_state, new_state):
+    if old_state == new_state:
+        return
+    with transaction.atomic():
+        if old_state and old_state[0] == 'submitted':
+            increment(submitted_key(old_state[1]), -1)
+            unmark_submitted(old_state[2], old_state[1])
+        if new_state and new_state[0] == 'submitted':
+            increment(submitted_key(new_state[1]))
+            mark_submitted(new_state[2], new_state[1])
+
+
+def resync_submission(form_type, student_id):
+    """Recount one form type and one student's bitmap when the previous state is unknown."""
+    with transaction.atomic():
+        AnalyticsCounter.objects.update_or_create(
+            key=submitted_key(form_type),
+            defaults={'value': Submission.objects.filter(form_type=form_type, status='submitted').count()},
+        )
+        if student_id and Submission.objects.filter(student_id=student_id, form_type=form_type, status='submitted').exists():
+            mark_submitted(student_id, form_type)
+        else:
+            unmark_submitted(student_id, form_type)
+
+
+def resync_enrolled():
+    AnalyticsCounter.objects.update_or_create(
+        key=ENROLLED_STUDENTS,
+        defaults={'value': Student.objects.filter(status='enrolled').count()},
+    )
+
+
+def reconcile(fix=True):
+    """
+    Recompute every counter and bitmap from the live tables and return the
+    drifted entries as (key, stored, expected). With fix=True the stored values
+    are repaired.
+    """
+    with transaction.atomic():
+        expected = live_counts()
+
+        stored = {
+            counter.key: counter
+            for counter in AnalyticsCounter.objects.select_for_update().filter(key__in=expected)
+        }
+        drift = []
+        for key, value in expected.items():
+            counter = stored.get(key)
+            current = counter.value if counter else 0
+            if current != value:
+                drift.append((key, current, value))
+                if fix:
+                    AnalyticsCounter.objects.update_or_create(key=key, defaults={'value': value})
+
+        bitmaps = defaultdict(int)
+        submitted_pairs = (
+            Submission.objects
+            .filter(status='submitted', student__isnull=False)
+            .values_list('student_id', 'form_type')
+            .distinct()
+        )
+        for student_id, form_type in submitted_pairs.iterator(chunk_size=2000):
+            bitmaps[student_id] |= FORM_BITS.get(form_type, 0)
+
+        to_create, to_update = [], []
+        existing = StudentFormStatus.objects.all().iterator(chunk_size=2000)
+        seen = set()
+        for status_row in existing:
+            seen.add(status_row.student_id)
+            value = bitmaps.get(status_row.student_id, 0)
+            if status_row.submitted_forms != value:
+                drift.append((f'student:{status_row.student_id}', status_row.submitted_forms, value))
+                status_row.submitted_forms = value
+                to_update.append(status_row)
+        for student_id, value in bitmaps.items():
+            if student_id not in seen:
+                drift.append((f'student:{student_id}', 0, value))
+                to_create.append(StudentFormStatus(student_id=student_id, submitted_forms=value))
+
+        if fix:
+            StudentFormStatus.objects.bulk_update(to_update, ['submitted_forms'], batch_size=2000)
+            StudentFormStatus.objects.bulk_create(to_create, batch_size=2000)
+
+    return drift
@@ -0,0 +1,68 @@
+import re
+
+from django.db.models import Q
+
+# Cohort query parameter -> Student field. Every analytics endpoint accepts
+# these; comma-separated values select several cohorts at once.
+STUDENT_FIELDS = {
+    'college': 'college',
+    'degree_program': 'degree_program',
+    'year_level': 'current_year_level',
+    'entry_year': 'date_initial_entry',
+    'entry_semester': 'date_initial_entry_sem',
+    'sex': 'sex',
+    'region': 'permanent_address__region',
+}
+
+# The same parameters on the demographic rollup cells.
+ROLLUP_FIELDS = {
+    'college': 'college',
+    'degree_program': 'degree_program',
+    'year_level': 'year_level',
+    'entry_year': 'entry_year',
+    'entry_semester': 'entry_semester',
+    'sex': 'sex',
+    'region': 'region',
+}
+
+
+def _entry_year(value):
+    # Accept "2023" as shorthand for the "2023-2024" academic year.
+    if re.fullmatch(r'\d{4}', value):
+        return f'{value}-{int(value) + 1}'
+    return value
+
+
+def cohort_params(query_params):
+    """Parse the cohort filters out of a request's query params into {param: [values]}."""
+    cohort = {}
+    for param in STUDENT_FIELDS:
+        raw = query_params.get(param)
+        if not raw:
+            continue
+        values = [value.strip() for value in raw.split(',') if value.strip()]
+        if param == 'entry_year':
+            values = [_entry_year(value) for value in values]
+        if values:
+            cohort[param] = values
+    return cohort
+
+
+def _q(cohort, fields, prefix=''):
+    condition = Q()
+    for param, values in cohort.items():
+        lookup = f'{prefix}{fields[param]}'
+        if len(values) == 1:
+            condition &= Q(**{lookup: values[0]})
+        else:
+            condition &= Q(**{f'{lookup}__in': values})
+    return condition
+
+
+def student_q(cohort, prefix=''):
+    """Q over Student fields; pass prefix='student__' to filter related rows such as submissions."""
+    return _q(cohort, STUDENT_FIELDS, prefix)
+
+
+def rollup_q(cohort):
+    return _q(cohort, ROLLUP_FIELDS)
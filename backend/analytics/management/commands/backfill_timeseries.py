@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from analytics import timeseries
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily submission counts behind the time-series endpoint from the submissions table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only rebuild days on or after this date (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid date '{options['since']}'.")
+
+        buckets = timeseries.backfill(since=since)
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {buckets} daily buckets.'))
@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Times every dashboard endpoint and admin list view, optionally after seeding '
+        'synthetic students, and writes a JSON report with query counts and p50/p95 latencies.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, metavar='N',
+                            help='Bulk-insert N benchmark students (with BIS, SCIF, PARD and referral forms) first.')
+        parser.add_argument('--flush', action='store_true', help='Delete previously seeded benchmark data first.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--cache', action='store_true', help='Leave the analytics response cache enabled.')
+        parser.add_argument('--only', action='append', default=[], metavar='PREFIX',
+                            help='Only time endpoints whose name starts with PREFIX (e.g. dashboard, admin.students).')
+        parser.add_argument('--report', help='Path of the JSON report. Defaults to benchmark-<timestamp>.json.')
+        parser.add_argument('--compare', metavar='REPORT', help='Fail if results regress against this earlier report.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95 slowdown against --compare, as a fraction (default 0.2).')
+        parser.add_argument('--skip-run', action='store_true', help='Only seed or flush; do not time anything.')
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            deleted = benchmark.flush()
+            self.stdout.write(f'Flushed benchmark data ({deleted} rows).')
+
+        if options['seed']:
+            try:
+                benchmark.seed(options['seed'], batch_size=options['batch_size'], stdout=self.stdout)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        if options['skip_run']:
+            return
+
+        results = benchmark.run(
+            repeat=options['repeat'], warmup=options['warmup'],
+            use_cache=options['cache'], only=options['only'],
+        )
+        report = benchmark.report(results, options['repeat'], options['cache'])
+
+        self.stdout.write(f"{'endpoint':<36}{'status':>7}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}")
+        for entry in results:
+            self.stdout.write(
+                f"{entry['name']:<36}{entry['status']:>7}{entry['queries']:>9}{entry['p50_ms']:>10}{entry['p95_ms']:>10}"
+            )
+
+        path = options['report'] or f"benchmark-{timezone.now():%Y%m%d-%H%M%S}.json"
+        with open(path, 'w', encoding='utf-8') as destination:
+            json.dump(report, destination, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {path}.'))
+
+        if options['compare']:
+            regressions = benchmark.compare(report, benchmark.load_report(options['compare']), options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(regression)
+                raise CommandError(f'{len(regressions)} regressions against {options["compare"]}.')
+            self.stdout.write(self.style.SUCCESS('No regressions.'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from analytics import snapshots
+
+
+class Command(BaseCommand):
+    help = 'Freezes the admin reports, summary and bar chart payloads as the snapshot for an academic year and semester.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('academic_year', help='Format: YYYY-YYYY (e.g., 2023-2024).')
+        parser.add_argument('semester', help='e.g. "1st semester", "2nd semester" or "Mid semester".')
+        parser.add_argument('--replace', action='store_true', help='Overwrite an existing snapshot for the same period.')
+
+    def handle(self, *args, **options):
+        try:
+            snapshot = snapshots.freeze(options['academic_year'], options['semester'], replace=options['replace'])
+        except snapshots.SnapshotError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'Saved analytics snapshot {snapshot.pk} for {snapshot}.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from analytics import counters
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the submission counters and per-student form bitmaps and repairs any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without repairing it.')
+
+    def handle(self, *args, **options):
+        drift = counters.reconcile(fix=not options['dry_run'])
+
+        for key, stored, expected in drift:
+            self.stdout.write(f'{key}: stored {stored}, expected {expected}')
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Counters are in sync.'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} drifted counters found.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {len(drift)} drifted counters.'))
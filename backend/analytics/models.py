@@ -1,3 +1,130 @@
 from django.db import models
 
-# Create your models here.
+
+class DemographicRollup(models.Model):
+    """
+    Number of enrolled students per demographic cell. Kept current by
+    analytics.signals and rebuilt with `manage.py rebuild_demographic_rollups`.
+    Birth year is stored instead of an age bucket so the cells never go stale;
+    ages are bucketed when the rollup is read.
+    """
+    college = models.CharField(max_length=20)
+    degree_program = models.CharField(max_length=50)
+    year_level = models.CharField(max_length=10)
+    entry_year = models.CharField(max_length=9)
+    entry_semester = models.CharField(max_length=15)
+    sex = models.CharField(max_length=6)
+    region = models.CharField(max_length=100, blank=True, default='')
+    birth_year = models.PositiveSmallIntegerField()
+    has_scholarship = models.BooleanField(default=False)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'analytics_demographic_rollup'
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'college', 'degree_program', 'year_level', 'entry_year', 'entry_semester',
+                    'sex', 'region', 'birth_year', 'has_scholarship',
+                ],
+                name='unique_demographic_cell',
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.degree_program} / {self.year_level} / {self.sex}: {self.count}"
+
+
+class StudentDemographic(models.Model):
+    """The rollup cell each enrolled student is currently counted in."""
+    student = models.OneToOneField('forms.Student', on_delete=models.CASCADE, primary_key=True, related_name='demographic')
+    college = models.CharField(max_length=20)
+    degree_program = models.CharField(max_length=50)
+    year_level = models.CharField(max_length=10)
+    entry_year = models.CharField(max_length=9)
+    entry_semester = models.CharField(max_length=15)
+    sex = models.CharField(max_length=6)
+    region = models.CharField(max_length=100, blank=True, default='')
+    birth_year = models.PositiveSmallIntegerField()
+    has_scholarship = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = 'analytics_student_demographic'
+
+    def cell(self):
+        return (
+            self.college, self.degree_program, self.year_level, self.entry_year, self.entry_semester,
+            self.sex, self.region, self.birth_year, self.has_scholarship,
+        )
+
+
+class AnalyticsCounter(models.Model):
+    """A named running total, e.g. submitted forms per form type."""
+    key = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'analytics_counter'
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
+
+
+class StudentFormStatus(models.Model):
+    """Bitmap of the form types a student has at least one submitted form for."""
+    student = models.OneToOneField('forms.Student', on_delete=models.CASCADE, primary_key=True, related_name='form_status')
+    submitted_forms = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        db_table = 'analytics_student_form_status'
+
+
+class DailySubmissionCount(models.Model):
+    """
+    Submissions per local calendar day, form type and metric:
+    'created' counts forms started (drafts), 'submitted' counts forms submitted.
+    Appended to by analytics.signals and backfilled with `manage.py backfill_timeseries`.
+    """
+    METRIC_CHOICES = [
+        ('created', 'Created'),
+        ('submitted', 'Submitted'),
+    ]
+
+    metric = models.CharField(max_length=10, choices=METRIC_CHOICES)
+    form_type = models.CharField(max_length=50)
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'analytics_daily_submission_count'
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'form_type', 'day'], name='unique_daily_submission_count')
+        ]
+        indexes = [
+            models.Index(fields=['metric', 'day'], name='daily_submission_metric_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.form_type} {self.metric}: {self.count}"
+
+
+class AnalyticsSnapshot(models.Model):
+    """
+    The admin reports, summary and bar chart payloads frozen for one academic
+    year and semester with `manage.py freeze_analytics_snapshot`.
+    """
+    academic_year = models.CharField(max_length=9, help_text="Format: YYYY-YYYY (e.g., 2023-2024)")
+    semester = models.CharField(max_length=15)
+    created_at = models.DateTimeField(auto_now_add=True)
+    payload = models.JSONField()
+
+    class Meta:
+        db_table = 'analytics_snapshot'
+        ordering = ['-academic_year', '-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['academic_year', 'semester'], name='unique_analytics_snapshot')
+        ]
+
+    def __str__(self):
+        return f"{self.academic_year} {self.semester}"
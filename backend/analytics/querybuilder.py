@@ -0,0 +1,106 @@
+from django.db.models import Case, CharField, Count, Q, Sum, Value, When
+
+
+class Dimension:
+    """
+    A grouping axis for crosstab().
+
+    - field: model field (or annotation) to group on.
+    - values: discrete values to keep, in output order. Required for columns.
+    - labels: optional mapping of value -> output key.
+    - buckets: list of (label, start, end) ranges; the field is bucketed with a
+      CASE expression instead of being grouped on directly.
+    """
+
+    def __init__(self, field, values=None, labels=None, buckets=None):
+        self.field = field
+        self.buckets = buckets
+        self.labels = labels or {}
+        if buckets is not None:
+            self.values = [label for label, _, _ in buckets]
+        else:
+            self.values = list(values) if values is not None else None
+
+    def key(self, value):
+        return self.labels.get(value, value)
+
+    def expression(self):
+        if self.buckets is None:
+            return None
+        return Case(
+            *[
+                When(**{f'{self.field}__gte': start, f'{self.field}__lte': end}, then=Value(label))
+                for label, start, end in self.buckets
+            ],
+            default=Value(None),
+            output_field=CharField(),
+        )
+
+    def condition(self, value):
+        if self.buckets is not None:
+            _, start, end = next(bucket for bucket in self.buckets if bucket[0] == value)
+            return Q(**{f'{self.field}__gte': start, f'{self.field}__lte': end})
+        return Q(**{self.field: value})
+
+
+def _aggregate(measure, condition=None):
+    if measure is None:
+        return Count('pk', filter=condition)
+    return Sum(measure, filter=condition)
+
+
+def crosstab(queryset, rows=None, columns=None, measure=None, filters=None, row_key='name', total_key=None, fill=True):
+    """
+    Pivot `queryset` into a list of dicts with a single grouped SQL statement.
+
+    Rows are produced by GROUP BY on `rows` (CASE-bucketed if it has buckets);
+    each of `columns` becomes a conditionally aggregated column. The measure is
+    COUNT(*) by default or SUM(measure) when a field name is given, which lets
+    the same builder run over raw rows or pre-aggregated rollup cells.
+
+    Without `rows` a single dict is returned, computed with one aggregate query.
+    """
+    if filters:
+        queryset = queryset.filter(**filters)
+
+    # Internal aliases keep output keys (which may contain spaces or clash with
+    # model fields) out of the SQL.
+    aggregates, keys = {}, {}
+    if columns is not None:
+        for index, value in enumerate(columns.values):
+            alias = f'_col{index}'
+            aggregates[alias] = _aggregate(measure, columns.condition(value))
+            keys[alias] = str(columns.key(value))
+    if total_key or not aggregates:
+        aggregates['_total'] = _aggregate(measure)
+        keys['_total'] = total_key or 'value'
+
+    if rows is None:
+        result = queryset.aggregate(**aggregates)
+        return {keys[alias]: amount or 0 for alias, amount in result.items()}
+
+    expression = rows.expression()
+    group_field = rows.field
+    if expression is not None:
+        group_field = '_bucket'
+        queryset = queryset.annotate(_bucket=expression)
+
+    grouped = queryset.order_by().values(group_field).annotate(**aggregates)
+
+    pivot = {}
+    for entry in grouped:
+        value = entry.pop(group_field)
+        if rows.values is not None and value not in rows.values:
+            continue
+        pivot[value] = {keys[alias]: amount or 0 for alias, amount in entry.items()}
+
+    if rows.values is not None and fill:
+        ordered_values = rows.values
+    else:
+        ordered_values = list(pivot)
+
+    empty = {key: 0 for key in keys.values()}
+    return [
+        {row_key: rows.key(value), **pivot.get(value, empty)}
+        for value in ordered_values
+    ]
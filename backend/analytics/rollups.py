@@ -0,0 +1,130 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+
+from forms.models import Student, SocioEconomicStatus
+from analytics.models import DemographicRollup, StudentDemographic
+
+CELL_FIELDS = (
+    'college', 'degree_program', 'year_level', 'entry_year', 'entry_semester',
+    'sex', 'region', 'birth_year', 'has_scholarship',
+)
+
+AGE_GROUPS = [
+    ('Below 18', 0, 17),
+    ('18–19', 18, 19),
+    ('20–21', 20, 21),
+    ('22–23', 22, 23),
+    ('24–25', 24, 25),
+    ('26–27', 26, 27),
+    ('Above 27', 28, 150),
+]
+
+
+def age_group_label(age):
+    for label, start, end in AGE_GROUPS:
+        if start <= age <= end:
+            return label
+    return None
+
+
+def enrolled_cells():
+    """Values queryset giving the rollup cell of every enrolled student."""
+    scholarship_subquery = SocioEconomicStatus.objects.filter(
+        student_number=OuterRef('student_number'),
+        submission__status='submitted',
+        has_scholarship=True
+    )
+    return (
+        Student.objects
+        .filter(status='enrolled')
+        .annotate(
+            year_level=F('current_year_level'),
+            entry_year=F('date_initial_entry'),
+            entry_semester=F('date_initial_entry_sem'),
+            region=F('permanent_address__region'),
+            birth_year=F('birthdate__year'),
+            has_scholarship=Exists(scholarship_subquery),
+        )
+        .values_list('student_number', *CELL_FIELDS)
+    )
+
+
+def _apply_deltas(deltas):
+    for cell, delta in deltas.items():
+        if not delta:
+            continue
+        rollup, _ = DemographicRollup.objects.get_or_create(**dict(zip(CELL_FIELDS, cell)))
+        DemographicRollup.objects.filter(pk=rollup.pk).update(count=F('count') + delta)
+
+
+def refresh_students(student_numbers):
+    """Move the given students into their current rollup cells."""
+    student_numbers = set(student_numbers)
+    if not student_numbers:
+        return
+
+    with transaction.atomic():
+        current = {
+            row[0]: tuple(row[1:])
+            for row in enrolled_cells().filter(student_number__in=student_numbers)
+        }
+        counted = {
+            m.student_id: m
+            for m in StudentDemographic.objects.select_for_update().filter(student_id__in=student_numbers)
+        }
+
+        deltas = Counter()
+        for number in student_numbers:
+            membership = counted.get(number)
+            old_cell = membership.cell() if membership else None
+            new_cell = current.get(number)
+            if old_cell == new_cell:
+                continue
+
+            if old_cell:
+                deltas[old_cell] -= 1
+            if new_cell:
+                deltas[new_cell] += 1
+                StudentDemographic.objects.update_or_create(
+                    student_id=number, defaults=dict(zip(CELL_FIELDS, new_cell))
+                )
+            else:
+                membership.delete()
+
+        _apply_deltas(deltas)
+
+
+def remove_student(student_number):
+    """Take a student out of the rollup before the row itself is deleted."""
+    with transaction.atomic():
+        membership = StudentDemographic.objects.select_for_update().filter(student_id=student_number).first()
+        if membership:
+            _apply_deltas({membership.cell(): -1})
+            membership.delete()
+
+
+def rebuild(chunk_size=2000):
+    """Recompute every rollup cell from the live tables."""
+    with transaction.atomic():
+        StudentDemographic.objects.all().delete()
+        DemographicRollup.objects.all().delete()
+
+        totals = Counter()
+        batch = []
+        for row in enrolled_cells().iterator(chunk_size=chunk_size):
+            cell = tuple(row[1:])
+            totals[cell] += 1
+            batch.append(StudentDemographic(student_id=row[0], **dict(zip(CELL_FIELDS, cell))))
+            if len(batch) >= chunk_size:
+                StudentDemographic.objects.bulk_create(batch)
+                batch = []
+        StudentDemographic.objects.bulk_create(batch)
+
+        DemographicRollup.objects.bulk_create(
+            [DemographicRollup(count=count, **dict(zip(CELL_FIELDS, cell))) for cell, count in totals.items()],
+            batch_size=chunk_size,
+        )
+
+    return sum(totals.values()), len(totals)
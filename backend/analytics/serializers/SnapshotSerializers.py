@@ -0,0 +1,7 @@
+from rest_framework import serializers
+from analytics.models import AnalyticsSnapshot
+
+class AnalyticsSnapshotSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AnalyticsSnapshot
+        fields = ['id', 'academic_year', 'semester', 'created_at']
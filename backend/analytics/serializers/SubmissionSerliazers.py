@@ -1,6 +1,13 @@
 from rest_framework import serializers
 from forms.models import Submission
 
+# Columns read by the feed serializers; pair with select_related('student') so
+# the student fields come from the same joined query.
+FEED_ONLY_FIELDS = [
+    'id', 'form_type', 'status', 'submitted_on', 'saved_on', 'student_id',
+    'student__student_number', 'student__first_name', 'student__last_name',
+]
+
 class RecentSubmissionSerializer(serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField()
     student_number = serializers.SerializerMethodField()
@@ -18,4 +25,11 @@ class RecentSubmissionSerializer(serializers.ModelSerializer):
     def get_student_number(self, obj):
         if obj.student is None:
             return "N/A"  # or None, or "Guest"
-        return obj.student.student_number
\ No newline at end of file
+        return obj.student.student_number
+
+
+class ActivityFeedSerializer(RecentSubmissionSerializer):
+    saved_on = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+
+    class Meta(RecentSubmissionSerializer.Meta):
+        fields = RecentSubmissionSerializer.Meta.fields + ['saved_on']
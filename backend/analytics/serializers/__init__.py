@@ -1 +1,2 @@
-from .SubmissionSerliazers import RecentSubmissionSerializer
\ No newline at end of file
+from .SubmissionSerliazers import RecentSubmissionSerializer, ActivityFeedSerializer, FEED_ONLY_FIELDS
+from .SnapshotSerializers import AnalyticsSnapshotSerializer
\ No newline at end of file
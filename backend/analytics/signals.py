@@ -0,0 +1,128 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from forms.models import Student, Address, SocioEconomicStatus, Submission, Referral, PARD
+from analytics import cache, counters, rollups, timeseries
+
+
+_DEFERRED = object()
+
+
+def _refresh_on_commit(student_numbers):
+    student_numbers = [number for number in student_numbers if number]
+    if student_numbers:
+        transaction.on_commit(lambda: rollups.refresh_students(student_numbers))
+
+
+@receiver(post_init, sender=Student)
+def remember_student_status(sender, instance, **kwargs):
+    instance._counted_status = instance.__dict__.get('status', _DEFERRED)
+
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, **kwargs):
+    _refresh_on_commit([instance.pk])
+
+    old_status = None if created else instance._counted_status
+    if old_status is _DEFERRED:
+        counters.resync_enrolled()
+    elif old_status != instance.status:
+        if old_status == 'enrolled':
+            counters.increment(counters.ENROLLED_STUDENTS, -1)
+        if instance.status == 'enrolled':
+            counters.increment(counters.ENROLLED_STUDENTS)
+    instance._counted_status = instance.status
+
+
+@receiver(pre_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    rollups.remove_student(instance.pk)
+
+
+@receiver(post_delete, sender=Student)
+def student_removed(sender, instance, **kwargs):
+    # After the delete, so a counter bootstrapped here no longer counts the student.
+    if instance.status == 'enrolled':
+        counters.increment(counters.ENROLLED_STUDENTS, -1)
+
+
+@receiver(post_save, sender=Address)
+def address_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    _refresh_on_commit(
+        Student.objects.filter(permanent_address=instance).values_list('student_number', flat=True)
+    )
+
+
+@receiver(post_save, sender=SocioEconomicStatus)
+@receiver(post_delete, sender=SocioEconomicStatus)
+def socio_economic_status_changed(sender, instance, **kwargs):
+    _refresh_on_commit([instance.student_number_id])
+
+
+@receiver(post_init, sender=Submission)
+def remember_submission_state(sender, instance, **kwargs):
+    instance._counted_state = counters.submission_state(instance)
+    instance._series_point = timeseries.submission_point(instance)
+
+
+@receiver(post_save, sender=Submission)
+def submission_saved(sender, instance, created, **kwargs):
+    # The scholarship flag only counts submitted BIS forms.
+    if instance.form_type == 'Basic Information Sheet':
+        _refresh_on_commit([instance.student_id])
+
+    new_state = counters.submission_state(instance)
+    if created:
+        counters.apply_submission_change(None, new_state)
+    elif instance._counted_state is None or new_state is None:
+        counters.resync_submission(instance.form_type, instance.student_id)
+    else:
+        counters.apply_submission_change(instance._counted_state, new_state)
+    instance._counted_state = new_state
+
+    if created:
+        timeseries.record(timeseries.CREATED, instance.form_type, timeseries.local_day(instance.created_at))
+    new_point = timeseries.submission_point(instance)
+    timeseries.apply_submission_change(None if created else instance._series_point, new_point)
+    instance._series_point = new_point
+
+
+@receiver(post_delete, sender=Submission)
+def submission_deleted(sender, instance, **kwargs):
+    counters.apply_submission_change(instance._counted_state, None)
+    # Keep the buckets equal to what a backfill from the live table would give.
+    if 'created_at' in instance.__dict__:
+        timeseries.record(timeseries.CREATED, instance.form_type, timeseries.local_day(instance.created_at), -1)
+    timeseries.apply_submission_change(instance._series_point, None)
+
+
+# Connected last so the version is bumped after the rollup refreshes above
+# have been queued, and cached dashboards never pin pre-refresh figures.
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Submission)
+@receiver(post_save, sender=Referral)
+@receiver(post_delete, sender=Referral)
+@receiver(post_save, sender=PARD)
+@receiver(post_delete, sender=PARD)
+@receiver(post_save, sender=Address)
+@receiver(post_save, sender=SocioEconomicStatus)
+@receiver(post_delete, sender=SocioEconomicStatus)
+def analytics_data_changed(sender, **kwargs):
+    cache.bump_data_version()
+
+
+# Draft saves (forms.writes.touch_submission, forms.drafts) only move these.
+# Leaving the version alone for them keeps cached dashboards warm through
+# autosave peaks; views listing drafts add analytics.cache.draft_watermark.
+DRAFT_SAVE_FIELDS = frozenset({'saved_on', 'updated_at', 'section_versions', 'draft_buffer', 'autosave_token'})
+
+
+@receiver(post_save, sender=Submission)
+def submission_data_changed(sender, update_fields=None, **kwargs):
+    if update_fields and update_fields <= DRAFT_SAVE_FIELDS:
+        return
+    cache.bump_data_version()
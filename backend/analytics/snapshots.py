@@ -0,0 +1,95 @@
+import re
+
+from django.db import transaction
+
+from forms.models import SemesterEnum
+from analytics.models import AnalyticsSnapshot
+
+REPORTS = ('adminReports', 'summary', 'barData')
+
+# Keys that identify an entry in a list of chart rows, in order of preference.
+IDENTITY_KEYS = ('title', 'name', 'label')
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def validate_period(academic_year, semester):
+    match = re.fullmatch(r'(20\d{2})-(20\d{2})', academic_year or '')
+    if not match or int(match.group(2)) != int(match.group(1)) + 1:
+        raise SnapshotError("Academic year must look like YYYY-YYYY (e.g., 2023-2024).")
+    if semester not in SemesterEnum.values:
+        raise SnapshotError(f"Semester must be one of: {', '.join(SemesterEnum.values)}.")
+
+
+def build_payload():
+    # Imported here because the views module imports this one.
+    from analytics.views.reports import build_admin_reports
+    from analytics.views.summary import build_bar_data, build_summary
+
+    return {
+        'adminReports': build_admin_reports(),
+        'summary': build_summary(),
+        'barData': build_bar_data(),
+    }
+
+
+def freeze(academic_year, semester, replace=False):
+    """Store the current dashboard payloads as the snapshot for a semester."""
+    validate_period(academic_year, semester)
+    with transaction.atomic():
+        existing = AnalyticsSnapshot.objects.select_for_update().filter(academic_year=academic_year, semester=semester).first()
+        if existing and not replace:
+            raise SnapshotError(f"A snapshot for {academic_year} {semester} already exists.")
+        payload = build_payload()
+        if existing:
+            existing.payload = payload
+            existing.save(update_fields=['payload'])
+            return existing
+        return AnalyticsSnapshot.objects.create(academic_year=academic_year, semester=semester, payload=payload)
+
+
+def _identity(entry):
+    if isinstance(entry, dict):
+        for key in IDENTITY_KEYS:
+            if key in entry:
+                return key, entry[key]
+    return None
+
+
+def diff(old, new):
+    """
+    Structural difference between two payloads. Numbers become
+    {'from', 'to', 'change'}; other changed values become {'from', 'to'}; chart
+    rows are matched by title/name/label rather than position. Unchanged parts
+    are left out, so an empty result means the payloads are equal.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        result = {}
+        for key in list(old) + [key for key in new if key not in old]:
+            change = diff(old.get(key), new.get(key))
+            if change is not None:
+                result[key] = change
+        return result or None
+
+    if isinstance(old, list) and isinstance(new, list):
+        old_ids = [_identity(entry) for entry in old]
+        new_ids = [_identity(entry) for entry in new]
+        if all(old_ids) and all(new_ids):
+            old_rows = dict(zip(old_ids, old))
+            new_rows = dict(zip(new_ids, new))
+            result = []
+            for identity in old_ids + [identity for identity in new_ids if identity not in old_rows]:
+                change = diff(old_rows.get(identity), new_rows.get(identity))
+                if change is not None:
+                    key, value = identity
+                    result.append({key: value, **(change if isinstance(change, dict) else {'value': change})})
+            return result or None
+        return None if old == new else {'from': old, 'to': new}
+
+    if old == new:
+        return None
+    if isinstance(old, (int, float)) and isinstance(new, (int, float)) and not isinstance(old, bool):
+        return {'from': old, 'to': new, 'change': round(new - old, 2)}
+    return {'from': old, 'to': new}
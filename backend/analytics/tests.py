@@ -1,3 +1,438 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from analytics import benchmark, cache, counters, timeseries
+from analytics.models import AnalyticsCounter, DailySubmissionCount, DemographicRollup, StudentDemographic, StudentFormStatus
+from analytics.rollups import CELL_FIELDS
+from forms.models import PhilippineRegionEnum, Student, Submission
+from forms.writes import touch_submission
+from users.models import CustomUser
+from users.management.commands.factories import SocioEconomicStatusFactory, StudentFactory, SubmissionFactory
+
+FAST_HASHER = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+
+
+def admin_client():
+    client = APIClient(SERVER_NAME='localhost')
+    client.force_authenticate(CustomUser.objects.create_superuser('analytics@example.com', 'pw'))
+    return client
+
+
+class DraftViewCacheTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.client = admin_client()
+        self.drafts = [
+            SubmissionFactory(student=StudentFactory(), form_type='Basic Information Sheet', status='draft',
+                              saved_on=timezone.now() - timedelta(hours=hours), submitted_on=None)
+            for hours in (3, 2, 1)
+        ]
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_draft_save_changes_draft_list_etags(self):
+        for url in ('/api/dashboard/recent-drafts/', '/api/dashboard/activity/?status=draft'):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                self.assertEqual(self.revalidate(url, first['ETag']).status_code, 304)
+
+                version = cache.data_version()
+                oldest = Submission.objects.filter(status='draft').order_by('saved_on').first()
+                with self.captureOnCommitCallbacks(execute=True):
+                    touch_submission(oldest, ['preferences'], timezone.now())
+                self.assertEqual(cache.data_version(), version)
+
+                second = self.revalidate(url, first['ETag'])
+                self.assertEqual(second.status_code, 200)
+                self.assertNotEqual(second['ETag'], first['ETag'])
+                self.assertNotEqual(second.data, first.data)
+
+    def test_draft_save_keeps_other_etags(self):
+        url = '/api/dashboard/activity/'
+        first = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            touch_submission(self.drafts[0], ['preferences'], timezone.now())
+        self.assertEqual(self.revalidate(url, first['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.drafts[0].status = 'submitted'
+            self.drafts[0].save()
+        self.assertEqual(self.revalidate(url, first['ETag']).status_code, 200)
+
+
+@FAST_HASHER
+class DemographicRollupTests(TestCase):
+    """The signal-maintained rollup against a rebuild from the live tables."""
+
+    def rollup(self):
+        return {
+            tuple(row[:-1]): row[-1]
+            for row in DemographicRollup.objects.filter(count__gt=0).values_list(*CELL_FIELDS, 'count')
+        }
+
+    def memberships(self):
+        return {membership.student_id: membership.cell() for membership in StudentDemographic.objects.all()}
+
+    def cell_of(self, student):
+        return StudentDemographic.objects.get(student=student).cell()
+
+    def assert_matches_rebuild(self):
+        incremental = self.rollup(), self.memberships()
+        self.assertFalse(DemographicRollup.objects.filter(count__lt=0).exists())
+        call_command('rebuild_demographic_rollups', stdout=StringIO())
+        self.assertEqual((self.rollup(), self.memberships()), incremental)
+
+    def enrolled(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return StudentFactory(status='enrolled', **kwargs)
+
+    def test_new_students_are_counted(self):
+        first, second = self.enrolled(), self.enrolled()
+        self.assertEqual(sum(self.rollup().values()), 2)
+        self.assertEqual(self.rollup().get(self.cell_of(first)), 2 if self.cell_of(first) == self.cell_of(second) else 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentFactory(status='graduated')
+        self.assertEqual(sum(self.rollup().values()), 2)
+        self.assert_matches_rebuild()
+
+    def test_student_edit_moves_cells(self):
+        student = self.enrolled()
+        other = self.enrolled()
+        old_cell = self.cell_of(student)
+        with self.captureOnCommitCallbacks(execute=True):
+            student.college = 'CSM' if student.college != 'CSM' else 'CHSS'
+            student.sex = 'Female' if student.sex == 'Male' else 'Male'
+            student.save()
+        new_cell = self.cell_of(student)
+        self.assertNotEqual(new_cell, old_cell)
+        self.assertEqual(self.rollup().get(new_cell), 1 + (self.cell_of(other) == new_cell))
+        self.assertEqual(self.rollup().get(old_cell, 0), int(self.cell_of(other) == old_cell))
+        self.assert_matches_rebuild()
+
+    def test_leaving_enrollment_removes_the_student(self):
+        student = self.enrolled()
+        with self.captureOnCommitCallbacks(execute=True):
+            student.status = 'graduated'
+            student.save()
+        self.assertEqual(self.rollup(), {})
+        self.assertFalse(StudentDemographic.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            student.status = 'enrolled'
+            student.save()
+        self.assertEqual(sum(self.rollup().values()), 1)
+        self.assert_matches_rebuild()
+
+    def test_address_edit_moves_region(self):
+        student = self.enrolled()
+        address = student.permanent_address
+        region = next(value for value in PhilippineRegionEnum.values if value != address.region)
+        with self.captureOnCommitCallbacks(execute=True):
+            address.region = region
+            address.save()
+        self.assertEqual(self.cell_of(student)[CELL_FIELDS.index('region')], region)
+        self.assert_matches_rebuild()
+
+    def test_scholarship_counts_only_submitted_bis(self):
+        student = self.enrolled()
+        scholarship = CELL_FIELDS.index('has_scholarship')
+        with self.captureOnCommitCallbacks(execute=True):
+            bis = SubmissionFactory(student=student, form_type='Basic Information Sheet', status='draft', submitted_on=None)
+            status = SocioEconomicStatusFactory(student_number=student, submission=bis, has_scholarship=True)
+        self.assertFalse(self.cell_of(student)[scholarship])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bis.status = 'submitted'
+            bis.submitted_on = timezone.now()
+            bis.save()
+        self.assertTrue(self.cell_of(student)[scholarship])
+        self.assert_matches_rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            status.has_scholarship = False
+            status.save()
+        self.assertFalse(self.cell_of(student)[scholarship])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            status.has_scholarship = True
+            status.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            status.delete()
+        self.assertFalse(self.cell_of(student)[scholarship])
+        self.assertEqual(sum(self.rollup().values()), 1)
+        self.assert_matches_rebuild()
+
+    def test_deleted_students_are_removed(self):
+        student, other = self.enrolled(), self.enrolled()
+        with self.captureOnCommitCallbacks(execute=True):
+            student.delete()
+        self.assertEqual(self.rollup(), {self.cell_of(other): 1})
+        self.assert_matches_rebuild()
+
+
+@FAST_HASHER
+class CounterTests(TestCase):
+    """Dashboard counters and form bitmaps across status transitions."""
+    BIS = 'Basic Information Sheet'
+    SCIF = 'Student Cumulative Information File'
+
+    def setUp(self):
+        self.student = StudentFactory(status='enrolled')
+
+    def count(self, key):
+        return counters.get_counts([key])[key]
+
+    def submitted(self, form_type):
+        return self.count(counters.submitted_key(form_type))
+
+    def assert_live(self):
+        """Every counter and bitmap equals a recount from the live tables."""
+        self.assertEqual(counters.reconcile(fix=False), [])
+
+    def test_submission_transitions(self):
+        draft = SubmissionFactory(student=self.student, form_type=self.BIS, status='draft', submitted_on=None)
+        self.assertEqual(self.submitted(self.BIS), 0)
+        self.assertFalse(counters.submitted_forms(self.student.pk)[self.BIS])
+
+        draft.status = 'submitted'
+        draft.save()
+        self.assertEqual(self.submitted(self.BIS), 1)
+        self.assertTrue(counters.submitted_forms(self.student.pk)[self.BIS])
+
+        draft.save()
+        self.assertEqual(self.submitted(self.BIS), 1)
+
+        draft.status = 'draft'
+        draft.save()
+        self.assertEqual(self.submitted(self.BIS), 0)
+        self.assertFalse(counters.submitted_forms(self.student.pk)[self.BIS])
+        self.assert_live()
+
+    def test_created_and_deleted_submissions(self):
+        bis = SubmissionFactory(student=self.student, form_type=self.BIS)
+        scif = SubmissionFactory(student=self.student, form_type=self.SCIF)
+        self.assertEqual((self.submitted(self.BIS), self.submitted(self.SCIF)), (1, 1))
+        self.assertEqual(StudentFormStatus.objects.get(student=self.student).submitted_forms, 3)
+
+        bis.delete()
+        self.assertEqual((self.submitted(self.BIS), self.submitted(self.SCIF)), (0, 1))
+        self.assertEqual(counters.submitted_forms(self.student.pk), {
+            self.BIS: False, self.SCIF: True,
+            'Psychosocial Assistance and Referral Desk': False, 'Counseling Referral Slip': False,
+        })
+        scif.delete()
+        self.assert_live()
+
+    def test_bit_stays_while_another_form_of_the_type_is_submitted(self):
+        pard = 'Psychosocial Assistance and Referral Desk'
+        first = SubmissionFactory(student=self.student, form_type=pard)
+        # The factory returns the student's existing form of a type.
+        Submission.objects.create(student=self.student, form_type=pard, status='submitted', submitted_on=timezone.now())
+        self.assertEqual(self.submitted(pard), 2)
+
+        first.delete()
+        self.assertEqual(self.submitted(pard), 1)
+        self.assertTrue(counters.submitted_forms(self.student.pk)[pard])
+        self.assert_live()
+
+    def test_deferred_save_resyncs(self):
+        bis = SubmissionFactory(student=self.student, form_type=self.BIS, status='draft', submitted_on=None)
+        partial = Submission.objects.only('id', 'submitted_on').get(pk=bis.pk)
+        Submission.objects.filter(pk=bis.pk).update(status='submitted')
+        partial.submitted_on = timezone.now()
+        partial.save()
+        self.assertEqual(self.submitted(self.BIS), 1)
+        self.assert_live()
+
+    def test_enrollment_transitions(self):
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 1)
+        other = StudentFactory(status='enrolled')
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 2)
+
+        other.status = 'loa'
+        other.save()
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 1)
+        other.save()
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 1)
+        other.status = 'enrolled'
+        other.save()
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 2)
+
+        Student.objects.get(pk=other.pk).delete()
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 1)
+        StudentFactory(status='graduated').delete()
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 1)
+
+        deferred = Student.objects.only('student_number').get(pk=self.student.pk)
+        Student.objects.filter(pk=self.student.pk).update(status='dropped')
+        deferred.save()
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 0)
+        self.assert_live()
+
+    def test_reconcile_repairs_drift(self):
+        SubmissionFactory(student=self.student, form_type=self.BIS)
+        # Writes that bypass the signals.
+        Submission.objects.filter(student=self.student).update(status='draft')
+        AnalyticsCounter.objects.filter(key=counters.ENROLLED_STUDENTS).update(value=7)
+
+        drift = counters.reconcile(fix=False)
+        self.assertCountEqual(drift, [
+            (counters.submitted_key(self.BIS), 1, 0),
+            (counters.ENROLLED_STUDENTS, 7, 1),
+            (f'student:{self.student.pk}', 1, 0),
+        ])
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 7)
+
+        self.assertCountEqual(counters.reconcile(fix=True), drift)
+        self.assertEqual(self.submitted(self.BIS), 0)
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 1)
+        self.assertFalse(counters.submitted_forms(self.student.pk)[self.BIS])
+        self.assert_live()
+
+    def test_missing_rows_are_bootstrapped_from_live_data(self):
+        SubmissionFactory(student=self.student, form_type=self.SCIF)
+        AnalyticsCounter.objects.all().delete()
+        StudentFormStatus.objects.all().delete()
+
+        self.assertEqual(self.submitted(self.SCIF), 1)
+        self.assertEqual(self.count(counters.ENROLLED_STUDENTS), 1)
+        SubmissionFactory(student=self.student, form_type=self.BIS)
+        self.assertEqual(self.submitted(self.BIS), 1)
+        self.assertTrue(all(counters.submitted_forms(self.student.pk)[form_type] for form_type in (self.BIS, self.SCIF)))
+        self.assert_live()
+
+
+@FAST_HASHER
+class TimeseriesTests(TestCase):
+    """Daily submission buckets kept by the signals against backfill()."""
+    PARD = 'Psychosocial Assistance and Referral Desk'
+
+    def setUp(self):
+        self.student = StudentFactory()
+
+    def submit(self, at, form_type=PARD, status='submitted'):
+        return Submission.objects.create(student=self.student, form_type=form_type, status=status, submitted_on=at)
+
+    def table(self):
+        rows = DailySubmissionCount.objects.exclude(count=0).values_list('metric', 'form_type', 'day', 'count')
+        return {(metric, form_type, day): count for metric, form_type, day, count in rows}
+
+    def submitted_days(self):
+        return {day: count for (metric, _, day), count in self.table().items() if metric == timeseries.SUBMITTED}
+
+    def assert_matches_backfill(self):
+        live = self.table()
+        timeseries.backfill()
+        self.assertEqual(self.table(), live)
+
+    def test_days_are_local_calendar_days(self):
+        # 23:30 and 00:30 in Manila, on either side of local midnight.
+        self.submit(datetime(2024, 3, 10, 15, 30, tzinfo=dt_timezone.utc))
+        self.submit(datetime(2024, 3, 10, 16, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(self.submitted_days(), {date(2024, 3, 10): 1, date(2024, 3, 11): 1})
+        self.assert_matches_backfill()
+
+    @override_settings(TIME_ZONE='UTC')
+    def test_days_follow_the_configured_timezone(self):
+        self.submit(datetime(2024, 3, 10, 15, 30, tzinfo=dt_timezone.utc))
+        self.submit(datetime(2024, 3, 10, 16, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(self.submitted_days(), {date(2024, 3, 10): 2})
+        self.assert_matches_backfill()
+
+    def test_transitions_match_backfill(self):
+        at = timezone.make_aware(datetime(2024, 5, 6, 9))
+        kept = self.submit(at)
+        moved = self.submit(at)
+        draft = self.submit(None, status='draft')
+        deleted = self.submit(at + timedelta(days=1))
+
+        moved.submitted_on = at + timedelta(days=2)
+        moved.save()
+        draft.status = 'submitted'
+        draft.submitted_on = at
+        draft.save()
+        kept.status = 'draft'
+        kept.save()
+        kept.status = 'submitted'
+        kept.save()
+        deleted.delete()
+
+        self.assertEqual(self.submitted_days(), {date(2024, 5, 6): 2, date(2024, 5, 8): 1})
+        self.assertEqual(self.table()[(timeseries.CREATED, self.PARD, timezone.localdate())], 3)
+        self.assert_matches_backfill()
+
+    def test_deferred_save_recounts_the_new_day(self):
+        at = timezone.make_aware(datetime(2024, 5, 6, 9))
+        self.submit(at)
+        moved = self.submit(at)
+
+        # Without the old values the old bucket cannot be known; the new one is recounted.
+        deferred = Submission.objects.only('id').get(pk=moved.pk)
+        deferred.status, deferred.form_type, deferred.submitted_on = 'submitted', self.PARD, at + timedelta(days=3)
+        deferred.save(update_fields=['status', 'form_type', 'submitted_on'])
+        self.assertEqual(self.submitted_days(), {date(2024, 5, 6): 2, date(2024, 5, 9): 1})
+
+        timeseries.backfill()
+        self.assertEqual(self.submitted_days(), {date(2024, 5, 6): 1, date(2024, 5, 9): 1})
+
+    def test_week_and_month_rollups_fill_gaps(self):
+        for day in (date(2024, 1, 31), date(2024, 2, 1), date(2024, 2, 5), date(2024, 3, 20)):
+            self.submit(timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=12)))
+
+        weeks = timeseries.series(timeseries.SUBMITTED, date(2024, 1, 31), date(2024, 3, 31), 'week')
+        self.assertEqual(weeks[0], {'date': '2024-01-29', 'value': 2})
+        self.assertEqual(weeks[1], {'date': '2024-02-05', 'value': 1})
+        self.assertEqual(weeks[-2], {'date': '2024-03-18', 'value': 1})
+        self.assertEqual(weeks[-1], {'date': '2024-03-25', 'value': 0})
+        self.assertEqual(len(weeks), 9)
+        self.assertEqual(sum(point['value'] for point in weeks), 4)
+
+        months = timeseries.series(timeseries.SUBMITTED, date(2024, 1, 15), date(2024, 4, 30), 'month')
+        self.assertEqual([(point['date'], point['value']) for point in months],
+                         [('2024-01-01', 1), ('2024-02-01', 2), ('2024-03-01', 1), ('2024-04-01', 0)])
+
+        days = timeseries.series(timeseries.SUBMITTED, date(2024, 1, 30), date(2024, 2, 2), form_type=self.PARD)
+        self.assertEqual([point['value'] for point in days], [0, 1, 1, 0])
+
+        for granularity, start, end in [('day', date(2024, 1, 30), date(2024, 2, 6)),
+                                        ('week', date(2024, 1, 31), date(2024, 3, 31)),
+                                        ('month', date(2024, 1, 15), date(2024, 4, 30))]:
+            with self.subTest(granularity=granularity):
+                self.assertEqual(
+                    timeseries.cohort_series(timeseries.SUBMITTED, start, end, granularity),
+                    timeseries.series(timeseries.SUBMITTED, start, end, granularity),
+                )
+
+    def test_backfill_since_replaces_only_later_days(self):
+        self.submit(timezone.make_aware(datetime(2024, 6, 1, 12)))
+        self.submit(timezone.make_aware(datetime(2024, 6, 3, 12)))
+        DailySubmissionCount.objects.filter(metric=timeseries.SUBMITTED).update(count=5)
+
+        timeseries.backfill(since=date(2024, 6, 2))
+        self.assertEqual(self.submitted_days(), {date(2024, 6, 1): 5, date(2024, 6, 3): 1})
+
+
+class BenchmarkSeedTests(TestCase):
+    def test_seed_keeps_clear_of_real_students(self):
+        # The first number benchmark students were given before the reserved range.
+        real = StudentFactory(student_number='2018-00000')
+        benchmark.seed(9, batch_size=4)
+        benchmark.seed(5, batch_size=4)
+
+        seeded = Student.objects.filter(user__email__endswith=f'@{benchmark.BENCHMARK_EMAIL_DOMAIN}')
+        self.assertEqual(seeded.count(), 14)
+        self.assertTrue(all(number.startswith('99') for number in seeded.values_list('student_number', flat=True)))
+        years = {
+            when.year for when in
+            Submission.objects.filter(student__in=seeded).values_list('submitted_on', flat=True) if when
+        }
+        self.assertTrue(years <= set(range(benchmark.YEARS[0], benchmark.YEARS[-1] + 2)))
+
+        benchmark.flush()
+        self.assertEqual(list(Student.objects.values_list('pk', flat=True)), [real.pk])
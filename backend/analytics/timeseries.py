@@ -0,0 +1,181 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import Trunc, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from forms.models import Submission
+from analytics.models import DailySubmissionCount
+from analytics.filters import student_q
+
+CREATED = 'created'
+SUBMITTED = 'submitted'
+METRICS = [CREATED, SUBMITTED]
+
+GRANULARITIES = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def local_day(value):
+    return timezone.localdate(value) if value else None
+
+
+def record(metric, form_type, day, delta=1):
+    if not day or not delta:
+        return
+    DailySubmissionCount.objects.get_or_create(metric=metric, form_type=form_type, day=day)
+    DailySubmissionCount.objects.filter(metric=metric, form_type=form_type, day=day).update(count=F('count') + delta)
+
+
+UNKNOWN = object()
+
+
+def submission_point(instance):
+    """
+    The (form_type, submitted day) a submission is counted under, None if it is
+    not submitted, or UNKNOWN if one of the fields was deferred.
+    """
+    data = instance.__dict__
+    if any(field not in data for field in ('status', 'form_type', 'submitted_on')):
+        return UNKNOWN
+    if data['status'] != 'submitted' or not data['submitted_on']:
+        return None
+    return data['form_type'], local_day(data['submitted_on'])
+
+
+def resync_day(form_type, day):
+    """Recount one submitted bucket from the live table."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    total = Submission.objects.filter(
+        status='submitted', form_type=form_type,
+        submitted_on__gte=start, submitted_on__lt=start + timedelta(days=1),
+    ).count()
+    DailySubmissionCount.objects.update_or_create(
+        metric=SUBMITTED, form_type=form_type, day=day, defaults={'count': total}
+    )
+
+
+def apply_submission_change(old_point, new_point):
+    if old_point == new_point:
+        return
+    if old_point is UNKNOWN or new_point is UNKNOWN:
+        # The previous bucket cannot be known; recount the one we can see.
+        if new_point not in (None, UNKNOWN):
+            resync_day(*new_point)
+        return
+    with transaction.atomic():
+        if old_point:
+            record(SUBMITTED, old_point[0], old_point[1], -1)
+        if new_point:
+            record(SUBMITTED, new_point[0], new_point[1])
+
+
+def backfill(since=None):
+    """
+    Recompute the daily buckets from Submission.created_at and submitted_on.
+    With `since`, only days from that date on are replaced.
+    """
+    tz = timezone.get_current_timezone()
+    sources = [
+        (CREATED, Submission.objects.all(), 'created_at'),
+        (SUBMITTED, Submission.objects.filter(status='submitted', submitted_on__isnull=False), 'submitted_on'),
+    ]
+
+    totals = Counter()
+    with transaction.atomic():
+        existing = DailySubmissionCount.objects.all()
+        if since:
+            existing = existing.filter(day__gte=since)
+        existing.delete()
+
+        for metric, queryset, field in sources:
+            if since:
+                queryset = queryset.filter(**{f'{field}__date__gte': since})
+            grouped = (
+                queryset
+                .annotate(day=TruncDate(field, tzinfo=tz))
+                .values('form_type', 'day')
+                .annotate(total=Count('pk'))
+                .order_by()
+            )
+            for row in grouped:
+                totals[(metric, row['form_type'], row['day'])] += row['total']
+
+        DailySubmissionCount.objects.bulk_create(
+            [
+                DailySubmissionCount(metric=metric, form_type=form_type, day=day, count=count)
+                for (metric, form_type, day), count in totals.items()
+            ],
+            batch_size=2000,
+        )
+    return len(totals)
+
+
+def _bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(day, granularity):
+    if granularity == 'week':
+        return day + timedelta(days=7)
+    if granularity == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def series(metric, start, end, granularity='day', form_type=None):
+    """
+    Counts per bucket between `start` and `end` (inclusive) with one grouped
+    range scan over the daily table. Empty buckets are returned as 0.
+    """
+    queryset = DailySubmissionCount.objects.filter(metric=metric, day__gte=start, day__lte=end)
+    if form_type:
+        queryset = queryset.filter(form_type=form_type)
+
+    trunc = GRANULARITIES[granularity]
+    if trunc is not None:
+        queryset = queryset.annotate(bucket=trunc('day'))
+    else:
+        queryset = queryset.annotate(bucket=F('day'))
+    totals = dict(queryset.values('bucket').annotate(total=Sum('count')).order_by().values_list('bucket', 'total'))
+    return _fill(totals, start, end, granularity)
+
+
+def cohort_series(metric, start, end, granularity='day', form_type=None, cohort=None):
+    """
+    Same as series() for a student cohort. The daily table is cohort-blind, so
+    this groups the submissions themselves in one query instead.
+    """
+    field = 'created_at' if metric == CREATED else 'submitted_on'
+    queryset = Submission.objects.filter(
+        student_q(cohort or {}, prefix='student__'),
+        **{f'{field}__date__gte': start, f'{field}__date__lte': end},
+    )
+    if metric == SUBMITTED:
+        queryset = queryset.filter(status='submitted')
+    if form_type:
+        queryset = queryset.filter(form_type=form_type)
+
+    bucket = Trunc(field, granularity, output_field=DateField(), tzinfo=timezone.get_current_timezone())
+    totals = dict(
+        queryset.annotate(bucket=bucket).values('bucket').annotate(total=Count('pk')).order_by().values_list('bucket', 'total')
+    )
+    return _fill(totals, start, end, granularity)
+
+
+def _fill(totals, start, end, granularity):
+    points = []
+    bucket = _bucket_start(start, granularity)
+    while bucket <= end:
+        points.append({'date': bucket.isoformat(), 'value': totals.get(bucket, 0)})
+        bucket = _next_bucket(bucket, granularity)
+    return points
@@ -6,7 +6,12 @@ from analytics.views import (
     recent_bis_submissions_view,
     recent_scif_submissions_view,
     recent_drafts_view,
-    admin_reports
+    admin_reports,
+    activity_feed_view,
+    timeseries_view,
+    snapshot_list_view,
+    snapshot_detail_view,
+    snapshot_diff_view
 )
 
 urlpatterns = [
@@ -17,4 +22,9 @@ urlpatterns = [
     path('recent-scif-submissions/', recent_scif_submissions_view),
     path('recent-drafts/', recent_drafts_view),
     path('admin-reports/', admin_reports),
+    path('activity/', activity_feed_view),
+    path('timeseries/', timeseries_view),
+    path('snapshots/', snapshot_list_view),
+    path('snapshots/diff/', snapshot_diff_view),
+    path('snapshots/<int:snapshot_id>/', snapshot_detail_view),
 ]
@@ -1,2 +1,5 @@
 from .summary import bar_data_view, summary_data_view, recent_submissions_view, recent_scif_submissions_view, recent_bis_submissions_view, recent_drafts_view
-from .reports import admin_reports
\ No newline at end of file
+from .reports import admin_reports
+from .activity import activity_feed_view
+from .timeseries import timeseries_view
+from .snapshots import snapshot_list_view, snapshot_detail_view, snapshot_diff_view
\ No newline at end of file
@@ -0,0 +1,56 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from forms.models import Submission
+from forms.map import FORM_TYPE_SLUG_MAP
+from analytics.pagination import ActivityFeedPagination, DraftFeedPagination
+from analytics.serializers import ActivityFeedSerializer, FEED_ONLY_FIELDS
+from analytics.filters import cohort_params, student_q
+from analytics.cache import draft_watermark, versioned_cache
+
+FEED_STATUSES = {
+    'submitted': ActivityFeedPagination,
+    'draft': DraftFeedPagination,
+}
+
+
+def feed_queryset(status='submitted', form_type=None, cohort=None):
+    """Submissions with the student columns joined in, ready for the feed serializers."""
+    queryset = Submission.objects.filter(status=status).select_related('student').only(*FEED_ONLY_FIELDS)
+    if form_type:
+        queryset = queryset.filter(form_type=form_type)
+    if cohort:
+        queryset = queryset.filter(student_q(cohort, prefix='student__'))
+    return queryset
+
+
+def feed_watermark(request):
+    return draft_watermark() if request.query_params.get('status') == 'draft' else ''
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@versioned_cache(watermark=feed_watermark)
+def activity_feed_view(request):
+    """
+    Newest-first feed of submissions, paged with an opaque `cursor`.
+
+    Query params: status (submitted|draft, default submitted), form_type (slug
+    or full name), page_size (max 50) and the cohort filters. Submitted forms
+    are ordered by submitted_on and drafts by saved_on.
+    """
+    status = request.query_params.get('status', 'submitted')
+    if status not in FEED_STATUSES:
+        return Response({'error': f"Invalid status '{status}'."}, status=400)
+
+    form_type = request.query_params.get('form_type')
+    if form_type:
+        form_type = FORM_TYPE_SLUG_MAP.get(form_type, form_type)
+        if form_type not in FORM_TYPE_SLUG_MAP.values():
+            return Response({'error': f"Invalid form type '{form_type}'."}, status=400)
+
+    paginator = FEED_STATUSES[status]()
+    page = paginator.paginate_queryset(feed_queryset(status, form_type, cohort_params(request.query_params)), request)
+    serializer = ActivityFeedSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
@@ -1,63 +1,54 @@
-from django.db.models import Count, Avg, Q, OuterRef, Exists, F, Value
+from django.db.models import F, Q, Sum, Value
 from django.utils.timezone import now
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from forms.models import Student, SocioEconomicStatus
 from forms.models import YearLevelEnum
+from analytics.models import DemographicRollup
+from analytics.querybuilder import Dimension, crosstab
+from analytics.rollups import AGE_GROUPS
+from analytics.filters import cohort_params, rollup_q
+from analytics.cache import versioned_cache
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@versioned_cache
 def admin_reports(request):
-    today = now().date()
-
-    ages_qs = Student.objects.filter(status='enrolled').annotate(age=today.year - F('birthdate__year'))
+    return Response(build_admin_reports(cohort_params(request.query_params)))
 
-    avg_age = ages_qs.aggregate(avg=Avg('age'))['avg'] or 0
-    avg_age = int(avg_age)
 
-    region_counts = Student.objects.filter(status='enrolled').values('permanent_address__region').annotate(count=Count('student_number')).order_by('-count')
-    top_region = region_counts[0]['permanent_address__region'] if region_counts else "N/A"
-
-    
-    total_students = Student.objects.filter(status='enrolled').count()
+def build_admin_reports(cohort=None):
+    today = now().date()
 
-    scholarship_subquery = SocioEconomicStatus.objects.filter(
-        student_number=OuterRef('student_number'),
-        submission__status='submitted',
-        has_scholarship=True
+    # Every figure below is read from the rollup cells with one grouped query
+    # per chart, so the cost of this view does not grow with the student count.
+    cells = (
+        DemographicRollup.objects
+        .filter(rollup_q(cohort or {}), count__gt=0)
+        .annotate(age=Value(today.year) - F('birth_year'))
     )
-    students_with_scholarship = Student.objects.filter(status='enrolled').annotate(
-        has_scholarship=Exists(scholarship_subquery)
+
+    totals = cells.aggregate(
+        students=Sum('count'),
+        scholars=Sum('count', filter=Q(has_scholarship=True)),
+        age_total=Sum(F('age') * F('count')),
     )
-    scholarship_count = students_with_scholarship.filter(has_scholarship=True).count()
-    scholarship_rate = round((scholarship_count / total_students) * 100, 1) if total_students else 0
+    total_students = totals['students'] or 0
+    scholarship_count = totals['scholars'] or 0
 
-    program_counts = Student.objects.filter(status='enrolled').values('degree_program').annotate(count=Count('student_number')).order_by('-count')[:3]
-    top_3_programs = ", ".join([p['degree_program'] for p in program_counts])
+    avg_age = int(totals['age_total'] / total_students) if total_students else 0
 
-    gender_counts = Student.objects.filter(status='enrolled').values('sex').annotate(count=Count('student_number'))
-    gender_data = [{'label': g['sex'], 'value': g['count']} for g in gender_counts]
+    scholarship_rate = round((scholarship_count / total_students) * 100, 1) if total_students else 0
 
-    region_data = [{'name': r['permanent_address__region'], 'Students': r['count']} for r in region_counts]
+    region_data = crosstab(cells, rows=Dimension('region'), measure='count', total_key='Students')
     region_data.sort(key=lambda x: x['name'])
-    
-    age_groups = [
-        ('Below 18', 0, 17),
-        ('18–19', 18, 19),
-        ('20–21', 20, 21),
-        ('22–23', 22, 23),
-        ('24–25', 24, 25),
-        ('26–27', 26, 27),
-        ('Above 27', 28, 150),
-    ]
-    age_data = []
-    for label, start, end in age_groups:
-        count = ages_qs.filter(age__gte=start, age__lte=end).count()
-        age_data.append({'name': label, 'Students': count})
+    top_region = max(region_data, key=lambda x: x['Students'])['name'] if region_data else "N/A"
+
+    gender_data = crosstab(cells, rows=Dimension('sex'), measure='count', row_key='label')
+
+    age_data = crosstab(cells, rows=Dimension('age', buckets=AGE_GROUPS), measure='count', total_key='Students')
 
-    year_level_values = [choice.value for choice in YearLevelEnum]
     year_level_labels = {
         '1st Year': 'First Year',
         '2nd Year': 'Second Year',
@@ -65,20 +56,18 @@ def admin_reports(request):
         '4th Year': 'Fourth Year',
         '5th Year': 'Fifth Year',
     }
+    year_level_data = crosstab(
+        cells,
+        rows=Dimension('degree_program'),
+        columns=Dimension('year_level', values=[choice.value for choice in YearLevelEnum], labels=year_level_labels),
+        measure='count',
+        total_key='total',
+    )
 
-    programs = Student.objects.filter(status='enrolled').values_list('degree_program', flat=True).distinct()
-    year_level_data = []
-
-    for program in programs:
-        counts = {year_level_labels.get(yl, yl): 0 for yl in year_level_values}
-        students_in_program = Student.objects.filter(degree_program=program, status='enrolled')
-        for s in students_in_program:
-            yl_label = year_level_labels.get(s.current_year_level)
-            if yl_label:
-                counts[yl_label] += 1
-        entry = {'name': program}
-        entry.update(counts)
-        year_level_data.append(entry)
+    ranked_programs = sorted(year_level_data, key=lambda x: (-x['total'], x['name']))
+    top_3_programs = ", ".join([p['name'] for p in ranked_programs[:3]])
+    for entry in year_level_data:
+        entry.pop('total')
 
     today_formatted = today.strftime("%b %d")
 
@@ -90,10 +79,10 @@ def admin_reports(request):
         {'title': 'Top 3 Programs by student population', 'value': top_3_programs, 'interval': f'as of {today_formatted}', 'data': []},
     ]
 
-    return Response({
+    return {
         'summaryData': summary_data,
         'genderData': gender_data,
         'regionData': region_data,
         'ageData': age_data,
         'yearLevelData': year_level_data,
-    })
+    }
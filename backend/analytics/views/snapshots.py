@@ -0,0 +1,61 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from analytics.models import AnalyticsSnapshot
+from analytics.serializers import AnalyticsSnapshotSerializer
+from analytics.snapshots import REPORTS, diff
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def snapshot_list_view(request):
+    snapshots = AnalyticsSnapshot.objects.defer('payload')
+    academic_year = request.query_params.get('academic_year')
+    if academic_year:
+        snapshots = snapshots.filter(academic_year=academic_year)
+    return Response(AnalyticsSnapshotSerializer(snapshots, many=True).data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def snapshot_detail_view(request, snapshot_id):
+    """
+    A frozen snapshot. With ?report=adminReports|summary|barData only that
+    payload is returned, in the same shape as the live endpoint.
+    """
+    try:
+        snapshot = AnalyticsSnapshot.objects.get(pk=snapshot_id)
+    except AnalyticsSnapshot.DoesNotExist:
+        return Response({'error': 'Snapshot not found.'}, status=404)
+
+    report = request.query_params.get('report')
+    if report:
+        if report not in REPORTS:
+            return Response({'error': f"Invalid report '{report}'."}, status=400)
+        return Response(snapshot.payload.get(report))
+
+    data = AnalyticsSnapshotSerializer(snapshot).data
+    data['payload'] = snapshot.payload
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def snapshot_diff_view(request):
+    """Differences between two snapshots: ?from=<id>&to=<id>."""
+    try:
+        ids = [int(request.query_params[param]) for param in ('from', 'to')]
+    except (KeyError, ValueError):
+        return Response({'error': "Both 'from' and 'to' snapshot ids are required."}, status=400)
+
+    snapshots = AnalyticsSnapshot.objects.in_bulk(ids)
+    if len(snapshots) != len(set(ids)):
+        return Response({'error': 'Snapshot not found.'}, status=404)
+    old, new = snapshots[ids[0]], snapshots[ids[1]]
+
+    return Response({
+        'from': AnalyticsSnapshotSerializer(old).data,
+        'to': AnalyticsSnapshotSerializer(new).data,
+        'diff': diff(old.payload, new.payload) or {},
+    })
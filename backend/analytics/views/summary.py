@@ -1,10 +1,14 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from django.db.models import Count
 from django.utils.timezone import now, timedelta
 from forms.models import Student, Submission
 from analytics.serializers import RecentSubmissionSerializer
+from analytics.querybuilder import Dimension, crosstab
+from analytics import counters
+from analytics.views.activity import feed_queryset
+from analytics.filters import cohort_params, student_q
+from analytics.cache import draft_watermark, versioned_cache
 
 def calculate_trend(data):
     if len(data) < 2:
@@ -32,98 +36,80 @@ def calculate_trend_percentage(data):
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@versioned_cache
 def bar_data_view(request):
-    grouped = (
-        Student.objects
-        .filter(status='enrolled')
-        .values('degree_program', 'sex')
-        .annotate(total=Count('student_number'))
-    )
+    return Response(build_bar_data(cohort_params(request.query_params)))
 
-    result = {}
-    for entry in grouped:
-        prog = entry['degree_program']
-        sex = entry['sex']
-        if prog not in result:
-            result[prog] = {'Male': 0, 'Female': 0}
-        result[prog][sex] = entry['total']
 
-    bar_data = [
-        {
-            'name': k,
-            'Male': v.get('Male', 0),
-            'Female': v.get('Female', 0)
-        }
-        for k, v in result.items()
-    ]
+def build_bar_data(cohort=None):
+    bar_data = crosstab(
+        Student.objects.filter(student_q(cohort or {}), status='enrolled'),
+        rows=Dimension('degree_program'),
+        columns=Dimension('sex', values=['Male', 'Female']),
+        total_key='total',
+    )
 
-    total_students = Student.objects.filter(status='enrolled').count()
+    total_students = 0
+    for entry in bar_data:
+        total_students += entry.pop('total')
 
-    return Response({
+    return {
         "barData": bar_data,
         "totalStudents": total_students
-    })
+    }
+
+SUMMARY_FORM_CARDS = [
+    ('Student Cumulative Information File', "#FFA600"),
+    ('Basic Information Sheet', "#014421"),
+    ('Counseling Referral Slip', "#1976D2"),
+    ('Psychosocial Assistance and Referral Desk', "#F56B1B"),
+]
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@versioned_cache
 def summary_data_view(request):
+    return Response(build_summary(cohort_params(request.query_params)))
+
+
+def build_summary(cohort=None):
     today = now().date()
 
+    keys = [counters.ENROLLED_STUDENTS] + [counters.submitted_key(form_type) for form_type, _ in SUMMARY_FORM_CARDS]
+    if cohort:
+        # The running counters are cohort-blind; count the cohort directly.
+        counts = {counters.ENROLLED_STUDENTS: Student.objects.filter(student_q(cohort), status='enrolled').count()}
+        submitted = crosstab(
+            Submission.objects.filter(student_q(cohort, prefix='student__'), status='submitted'),
+            columns=Dimension('form_type', values=[form_type for form_type, _ in SUMMARY_FORM_CARDS]),
+        )
+        counts.update({counters.submitted_key(form_type): total for form_type, total in submitted.items()})
+    else:
+        counts = counters.get_counts(keys)
+
     summary = [
         {
             "title": "Total Number of Students",
-            "value": Student.objects.filter(status='enrolled').count(),
+            "value": counts[counters.ENROLLED_STUDENTS],
             "subtitle": f"Registered users as of {today.strftime('%b %d')}",
             "color": "#94141B",
-        },
-        {
-            "title": "Student Cumulative Information File",
-            "value": Submission.objects.filter(
-                form_type='Student Cumulative Information File',
-                status='submitted'
-            ).count(),
-            "subtitle": f"Submissions as of {today.strftime('%b %d')}",
-            "color": "#FFA600",
-        },
-        {
-            "title": "Basic Information Sheet",
-            "value": Submission.objects.filter(
-                form_type='Basic Information Sheet',
-                status='submitted'
-            ).count(),
-            "subtitle": f"Submissions as of {today.strftime('%b %d')}",
-            "color": "#014421",
-        },
-        {
-            "title": "Counseling Referral Slip",
-            "value": Submission.objects.filter(
-                form_type='Counseling Referral Slip',
-                status='submitted'
-            ).count(),
-            "subtitle": f"Submissions as of {today.strftime('%b %d')}",
-            "color": "#1976D2",
-        },
-        {
-            "title": "Psychosocial Assistance and Referral Desk",
-            "value": Submission.objects.filter(
-                form_type='Psychosocial Assistance and Referral Desk',
-                status='submitted'
-            ).count(),
-            "subtitle": f"Submissions as of {today.strftime('%b %d')}",
-            "color": "#F56B1B",
         }
     ]
+    for form_type, color in SUMMARY_FORM_CARDS:
+        summary.append({
+            "title": form_type,
+            "value": counts[counters.submitted_key(form_type)],
+            "subtitle": f"Submissions as of {today.strftime('%b %d')}",
+            "color": color,
+        })
 
-    return Response({"summary": summary})
+    return {"summary": summary}
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@versioned_cache
 def recent_submissions_view(request):
     try:
-        submissions = (
-            Submission.objects
-            .filter(status="submitted")
-            .order_by('-submitted_on')[:8]
-        )
+        submissions = feed_queryset('submitted', cohort=cohort_params(request.query_params)).order_by('-submitted_on', '-id')[:8]
         serializer = RecentSubmissionSerializer(submissions, many=True)
         return Response(serializer.data, status=200)
 
@@ -133,13 +119,10 @@ def recent_submissions_view(request):
    
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@versioned_cache
 def recent_bis_submissions_view(request):
     try:
-        submissions = (
-            Submission.objects
-            .filter(status="submitted", form_type="Basic Information Sheet")
-            .order_by('-submitted_on')[:8]
-        )
+        submissions = feed_queryset('submitted', 'Basic Information Sheet', cohort_params(request.query_params)).order_by('-submitted_on', '-id')[:8]
         serializer = RecentSubmissionSerializer(submissions, many=True)
         return Response(serializer.data, status=200)
 
@@ -148,13 +131,10 @@ def recent_bis_submissions_view(request):
     
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@versioned_cache
 def recent_scif_submissions_view(request):
     try:
-        submissions = (
-            Submission.objects
-            .filter(status="submitted", form_type="Student Cumulative Information File")
-            .order_by('-submitted_on')[:8]
-        )
+        submissions = feed_queryset('submitted', 'Student Cumulative Information File', cohort_params(request.query_params)).order_by('-submitted_on', '-id')[:8]
         serializer = RecentSubmissionSerializer(submissions, many=True)
         return Response(serializer.data, status=200)
 
@@ -163,13 +143,14 @@ def recent_scif_submissions_view(request):
         
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@versioned_cache(watermark=draft_watermark)
 def recent_drafts_view(request):
-    drafts = Submission.objects.filter(status='draft').order_by('saved_on')[:4]
+    drafts = feed_queryset('draft', cohort=cohort_params(request.query_params)).order_by('saved_on')[:4]
     data = [
         {
             "id": s.id,
             "formType": s.form_type,
-            "student": f"{s.student.first_name} {s.student.last_name}"
+            "student": f"{s.student.first_name} {s.student.last_name}" if s.student else "Guest Submission"
         }
         for s in drafts
     ]
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from forms.map import FORM_TYPE_SLUG_MAP
+from analytics import timeseries
+from analytics.cache import versioned_cache
+from analytics.filters import cohort_params
+from analytics.views.summary import calculate_trend, calculate_trend_percentage
+
+MAX_RANGE_DAYS = 3 * 366
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@versioned_cache
+def timeseries_view(request):
+    """
+    Submission counts over time.
+
+    Query params: metric (created|submitted, default submitted), form_type
+    (slug or full name), granularity (day|week|month, default day), start and
+    end (YYYY-MM-DD, default the last 30 days), and the cohort filters.
+    """
+    params = request.query_params
+
+    metric = params.get('metric', timeseries.SUBMITTED)
+    if metric not in timeseries.METRICS:
+        return Response({'error': f"Invalid metric '{metric}'."}, status=400)
+
+    granularity = params.get('granularity', 'day')
+    if granularity not in timeseries.GRANULARITIES:
+        return Response({'error': f"Invalid granularity '{granularity}'."}, status=400)
+
+    form_type = params.get('form_type')
+    if form_type:
+        form_type = FORM_TYPE_SLUG_MAP.get(form_type, form_type)
+        if form_type not in FORM_TYPE_SLUG_MAP.values():
+            return Response({'error': f"Invalid form type '{form_type}'."}, status=400)
+
+    try:
+        end = parse_date(params['end']) if params.get('end') else localdate()
+        start = parse_date(params['start']) if params.get('start') else end - timedelta(days=29)
+    except (TypeError, ValueError):
+        start = end = None
+    if not start or not end or start > end:
+        return Response({'error': 'Invalid date range.'}, status=400)
+    if (end - start).days > MAX_RANGE_DAYS:
+        return Response({'error': f'Date range cannot exceed {MAX_RANGE_DAYS} days.'}, status=400)
+
+    cohort = cohort_params(params)
+    if cohort:
+        points = timeseries.cohort_series(metric, start, end, granularity=granularity, form_type=form_type, cohort=cohort)
+    else:
+        points = timeseries.series(metric, start, end, granularity=granularity, form_type=form_type)
+    values = [point['value'] for point in points]
+
+    return Response({
+        'metric': metric,
+        'granularity': granularity,
+        'series': points,
+        'total': sum(values),
+        'trend': calculate_trend(values),
+        'trendPercentage': calculate_trend_percentage(values),
+    })
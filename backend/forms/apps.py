@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class FormsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'forms'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate, pre_migrate
+        from forms.search import ensure_search_extensions, ensure_trigram_index
+        pre_migrate.connect(ensure_search_extensions, sender=self)
+        post_migrate.connect(ensure_trigram_index, sender=self)
+
+        from forms.schema import build_registry
+        build_registry()
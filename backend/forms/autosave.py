@@ -0,0 +1,78 @@
+"""
+Coalescing store for autosaves (see forms.drafts.autosave_sections).
+
+Browsers autosave a draft every few seconds. An autosave arriving within
+FORMS_AUTOSAVE_INTERVAL seconds of the submission's last save (saved_on) is
+not written to the database; its sections are merged into a pending entry
+kept in the 'autosave' cache. The next autosave after the interval, an
+explicit save, finalize, or the flush_autosaves command writes the entry
+out and removes it, so each draft is written at most once per interval.
+
+The cache must be shared by every worker and the flush_autosaves command.
+Entries are read and replaced only while holding the submission's row lock
+(forms.writes.lock_submission), so concurrent autosaves and writes apply one
+after the other. An entry is only removed after its write has committed,
+so a crash between the two writes it again rather than losing it. Until it
+is removed, the write stores its token in Submission.autosave_token, and an
+entry with that token is no longer pending: an autosave arriving in between
+starts a new entry instead of merging into the written one, whose older
+data would otherwise be written again over later saves.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Entries left behind by deleted drafts expire after a week.
+ENTRY_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def get_cache():
+    return caches[getattr(settings, 'FORMS_AUTOSAVE_CACHE_ALIAS', 'autosave')]
+
+
+def autosave_interval():
+    """Seconds autosaves are coalesced for; 0 writes every autosave through."""
+    return getattr(settings, 'FORMS_AUTOSAVE_INTERVAL', 30)
+
+
+def entry_key(submission_id):
+    return f'autosave:{submission_id}'
+
+
+def pending(submission_id, written=''):
+    """
+    The pending entry of a submission ({'sections': ..., 'token': ...}), or
+    None. `written` is the submission's autosave_token.
+    """
+    entry = get_cache().get(entry_key(submission_id))
+    if entry is None or entry['token'] == written:
+        return None
+    return entry
+
+
+def pending_many(submission_ids, written=None):
+    """
+    {submission id: pending entry} for the submissions that have one;
+    `written` maps submission ids to their autosave_token.
+    """
+    written = written or {}
+    entries = get_cache().get_many([entry_key(pk) for pk in submission_ids])
+    return {
+        pk: entries[entry_key(pk)] for pk in submission_ids
+        if entry_key(pk) in entries and entries[entry_key(pk)]['token'] != written.get(pk, '')
+    }
+
+
+def stash(submission_id, sections):
+    """Store the merged pending sections of a submission under a new token. Returns the entry."""
+    entry = {'sections': sections, 'token': uuid.uuid4().hex}
+    get_cache().set(entry_key(submission_id), entry, ENTRY_TIMEOUT)
+    return entry
+
+
+def discard(submission_id, token):
+    """Remove the pending entry once written out, unless a newer autosave has replaced it."""
+    entry = get_cache().get(entry_key(submission_id))
+    if entry is not None and entry['token'] == token:
+        get_cache().delete(entry_key(submission_id))
@@ -0,0 +1,86 @@
+"""
+Reads every section of a form bundle in a fixed number of queries.
+
+Each section is one query on its submission foreign key, joining the nested
+foreign keys its serializer renders and prefetching its many-to-many fields.
+A bundle therefore costs one query per section plus one per prefetch, however
+many rows the sections hold. A read that goes over its budget is logged, so a
+serializer that starts lazy-loading a relation shows up instead of quietly
+adding N queries; the tests hold every form type to its budget exactly.
+"""
+import logging
+from contextlib import contextmanager
+
+from django.db import connection
+
+from forms import autosave
+from forms.drafts import overlay_draft
+from forms.schema import get_form
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def query_budget(budget, label):
+    """Log a warning if the block runs more than `budget` queries."""
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield
+    if counter.count > budget:
+        logger.warning(f'{label} ran {counter.count} queries; its budget is {budget}.')
+
+
+def load_bundle(submission, form_type):
+    """
+    Serialized data of every section of `submission`, keyed like
+    FORM_SECTIONS_MAP[form_type], with its buffered draft sections and
+    pending autosave applied.
+    """
+    form = get_form(form_type)
+    data = {}
+    with query_budget(form.budget, f'{form_type} bundle'):
+        for section in form:
+            queryset = section.for_submission(submission)
+            if section.many:
+                data[section.key] = section.serializer_class(queryset, many=True).data
+            else:
+                instance = queryset.first()
+                data[section.key] = section.serializer_class(instance).data if instance else None
+    entry = autosave.pending(submission.pk, submission.autosave_token) if submission.status == 'draft' else None
+    return overlay_draft(data, submission.draft_buffer, entry)
+
+
+def load_bundles(submissions, form_type):
+    """
+    load_bundle for many submissions (or submission ids) of one form type, in
+    the same number of queries. Returns {submission id: sections}. Buffered
+    draft sections and pending autosaves are not applied; see
+    forms.drafts.overlay_draft.
+    """
+    form = get_form(form_type)
+    ids = [getattr(submission, 'pk', submission) for submission in submissions]
+    bundles = {pk: {} for pk in ids}
+    if not ids:
+        return bundles
+
+    with query_budget(form.budget, f'{form_type} bundles'):
+        for section in form:
+            rows = {pk: [] for pk in ids}
+            for instance in section.queryset().filter(**{f'{section.link}__in': ids}).order_by('pk'):
+                rows[getattr(instance, section.link_attname)].append(instance)
+
+            for pk, instances in rows.items():
+                if section.many:
+                    bundles[pk][section.key] = section.serializer_class(instances, many=True).data
+                else:
+                    bundles[pk][section.key] = section.serializer_class(instances[0]).data if instances else None
+    return bundles
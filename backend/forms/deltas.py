@@ -0,0 +1,227 @@
+"""
+Delta autosave: field-level patches against versioned form sections.
+
+Instead of resending whole sections, the client sends for each section it
+touched the version it last saw and a list of JSON Patch style operations:
+
+    {"sections": {
+        "family_data": {"version": 3, "ops": [
+            {"op": "replace", "path": "/mother/first_name", "value": "Ana"}]},
+        "siblings": {"version": 5, "ops": [
+            {"op": "replace", "path": "/12/age", "value": 19},
+            {"op": "add", "path": "/-", "value": {"first_name": "Ben"}},
+            {"op": "remove", "path": "/14"}]}
+    }}
+
+In a single-object section a path names a field, or a field of a nested
+object. In a repeating section it starts with a row id: "/<id>/<field>"
+patches a row, "add" at "/-" appends one and "remove" at "/<id>" deletes
+one. Only the touched fields are validated and only columns whose value
+changed are written.
+
+Every save of a section bumps its number in Submission.section_versions. If
+a delta names an older version, nothing is applied and the caller gets the
+current versions back to refetch from.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from forms.drafts import materialize
+from forms.serializers.SerializerSCIF import assign_changed
+from forms.writes import attach_owners, bulk_writable, lock_submission, touch_submission
+
+OPS = ('add', 'replace', 'remove')
+
+# Set by the server; a delta may not move rows between submissions or students.
+LOCKED_FIELDS = frozenset({'id', 'submission', 'student'})
+
+
+class DeltaError(ValueError):
+    pass
+
+
+def parse_pointer(path):
+    if not isinstance(path, str) or not path.startswith('/') or path == '/':
+        raise DeltaError(f"Invalid path {path!r}.")
+    return [part.replace('~1', '/').replace('~0', '~') for part in path[1:].split('/')]
+
+
+def _merge(current, changes):
+    merged = dict(current)
+    for name, value in changes.items():
+        merged[name] = _merge(merged[name], value) if isinstance(value, dict) and isinstance(merged.get(name), dict) else value
+    return merged
+
+
+def _put(target, parts, value, path):
+    if parts[0] in LOCKED_FIELDS:
+        raise DeltaError(f"'{parts[0]}' cannot be changed ({path}).")
+    for part in parts[:-1]:
+        target = target.setdefault(part, {})
+        if not isinstance(target, dict):
+            raise DeltaError(f"Conflicting operations on {path}.")
+    target[parts[-1]] = value
+
+
+class SectionDelta:
+    """The operations for one section, grouped into field changes, row changes, new rows and removals."""
+
+    def __init__(self, key, body, many):
+        if not isinstance(body, dict) or type(body.get('version')) is not int or not isinstance(body.get('ops'), list):
+            raise DeltaError(f"'{key}' needs an integer 'version' and a list of 'ops'.")
+        self.key = key
+        self.many = many
+        self.version = body['version']
+        self.fields = {}
+        self.rows = {}
+        self.adds = []
+        self.removes = set()
+        # Fields patched below the top level, per row id (None for a single-object section).
+        self.nested = {}
+
+        for op in body['ops']:
+            if not isinstance(op, dict) or op.get('op') not in OPS:
+                raise DeltaError(f"'{key}': op must be one of {', '.join(OPS)}.")
+            if op['op'] != 'remove' and 'value' not in op:
+                raise DeltaError(f"'{key}': '{op['op']}' needs a value.")
+            path = op.get('path')
+            parts = parse_pointer(path)
+            value = op.get('value')
+
+            if not many:
+                _put(self.fields, parts, None if op['op'] == 'remove' else value, path)
+                if len(parts) > 1:
+                    self.nested.setdefault(None, set()).add(parts[0])
+            elif parts == ['-']:
+                if op['op'] != 'add' or not isinstance(value, dict):
+                    raise DeltaError(f"'{key}': '/-' only takes an 'add' of a row object.")
+                self.adds.append({name: item for name, item in value.items() if name not in LOCKED_FIELDS})
+            else:
+                try:
+                    row_id = int(parts[0])
+                except ValueError:
+                    raise DeltaError(f"'{key}': rows are addressed by id ({path}).")
+                if len(parts) == 1:
+                    if op['op'] != 'remove':
+                        raise DeltaError(f"'{key}': whole rows can only be removed; patch their fields instead ({path}).")
+                    self.removes.add(row_id)
+                else:
+                    _put(self.rows.setdefault(row_id, {}), parts[1:], None if op['op'] == 'remove' else value, path)
+                    if len(parts) > 2:
+                        self.nested.setdefault(row_id, set()).add(parts[1])
+
+    def changes(self, target, serializer_class, instance, context):
+        """
+        The data to validate for a single-object section (target None) or a
+        row. Nested objects are validated as a whole (ParentSerializer, for
+        one, reads missing fields as null), so patches below the top level
+        are merged into their stored value first.
+        """
+        data = self.fields if target is None else self.rows[target]
+        nested = self.nested.get(target)
+        if not nested or instance is None:
+            return data
+        current = serializer_class(instance, context=context).data
+        return {
+            name: _merge(current[name], value) if name in nested and isinstance(current.get(name), dict) else value
+            for name, value in data.items()
+        }
+
+
+def parse_deltas(form, payload):
+    """SectionDelta for each section of `form` named in payload['sections']; raises DeltaError on malformed input."""
+    body = payload.get('sections') if isinstance(payload, dict) else None
+    if not isinstance(body, dict) or not body:
+        raise DeltaError("Send the changed sections under 'sections'.")
+    unknown = [key for key in body if key not in form]
+    if unknown:
+        raise DeltaError(f"Unknown sections: {', '.join(unknown)}.")
+    return [SectionDelta(key, section, many=form[key].many) for key, section in body.items()]
+
+
+def _validate_fields(delta, section, submission, student, context):
+    instance = section.for_submission(submission).first()
+    data = attach_owners(delta.changes(None, section.serializer_class, instance, context), section, submission, student, many=False)
+    serializer = section.serializer_class(instance=instance, data=data, partial=True, context=context)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    return serializer, None
+
+
+def _validate_rows(delta, section, submission, student, context):
+    serializer_class = section.serializer_class
+    queryset = section.for_submission(submission).filter(pk__in=set(delta.rows) | delta.removes)
+    existing = {row.pk: row for row in queryset} if delta.rows or delta.removes else {}
+    errors, update_rows, create_data = {}, [], []
+
+    for row_id in sorted((set(delta.rows) | delta.removes) - set(existing)):
+        errors[f'/{row_id}'] = ['No such row.']
+    for row_id in delta.rows:
+        if row_id in existing and row_id not in delta.removes:
+            changes = delta.changes(row_id, serializer_class, existing[row_id], context)
+            serializer = serializer_class(instance=existing[row_id], data=changes, partial=True, context=context)
+            if serializer.is_valid():
+                update_rows.append((existing[row_id], serializer.validated_data))
+            else:
+                errors[f'/{row_id}'] = serializer.errors
+
+    add_errors = []
+    for row in delta.adds:
+        serializer = serializer_class(data=attach_owners(row, section, submission, student, many=False), partial=True, context=context)
+        if serializer.is_valid():
+            create_data.append(serializer.validated_data)
+        add_errors.append(serializer.errors)
+    if any(add_errors):
+        errors['/-'] = add_errors
+
+    return (update_rows, create_data, delta.removes & set(existing)), errors
+
+
+def apply_deltas(form, deltas, submission, student, request=None):
+    """
+    Validate and write `deltas` in one transaction. Returns (result, errors,
+    conflicts); nothing is written unless errors and conflicts are both empty.
+    `result` holds the new section versions and the ids of created rows.
+    """
+    context = {'submission': submission, 'student': student, 'request': request}
+    with transaction.atomic():
+        current = lock_submission(submission)
+        conflicts = {delta.key: current.get(delta.key, 0) for delta in deltas if delta.version != current.get(delta.key, 0)}
+        if conflicts:
+            return None, {}, conflicts
+
+        # Deltas address stored rows, so buffered draft sections are written out first.
+        errors = materialize(form, submission, student, request)
+        if errors:
+            return None, errors, {}
+
+        plans = []
+        for delta in deltas:
+            section = form[delta.key]
+            validate = _validate_rows if delta.many else _validate_fields
+            plan, error = validate(delta, section, submission, student, context)
+            if error:
+                errors[delta.key] = error
+            else:
+                plans.append((delta, section, plan))
+        if errors:
+            transaction.set_rollback(True)
+            return None, errors, {}
+
+        created = {}
+        for delta, section, plan in plans:
+            if delta.many:
+                update_rows, create_data, removes = plan
+                rows = section.serializer_class(many=True, context=context).sync(update_rows, create_data, removes)
+                created[delta.key] = [row.pk for row in rows[len(update_rows):]]
+            elif plan.instance is not None and bulk_writable(section.serializer_class, section.model):
+                dirty = assign_changed(plan.instance, plan.validated_data)
+                if dirty:
+                    plan.instance.save(update_fields=dirty)
+            else:
+                plan.save()
+
+        touch_submission(submission, [delta.key for delta in deltas], timezone.now())
+
+    versions = {delta.key: submission.section_versions[delta.key] for delta in deltas}
+    return {'versions': versions, 'created': created}, {}, {}
@@ -0,0 +1,181 @@
+"""
+Zipped dossiers: every form of many students at once, for case conferences
+and accreditation reports.
+
+Students are read in batches. Each batch costs a fixed number of queries: the
+profiles, their submissions, one batched bundle load per form type, graduation
+records and referrals received. Every finished dossier is written to the zip
+stream and handed to the consumer straight away, so the archive is never held
+in memory.
+"""
+import json
+import zipfile
+from collections import defaultdict
+
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from forms.bundles import load_bundles
+from forms.exports import DATASETS, ExportError
+from forms.map import FORM_TYPE_UNSLUG_MAP
+from forms.models import Student, Submission, Referral, GraduateStudent
+from forms.serializers import StudentSerializer, SubmissionSerializer, ReferralSerializer, GraduateStudentSerializer
+
+MAX_STUDENTS = 1000
+BATCH_SIZE = 50
+
+
+class ZipStream:
+    """Write-only file for zipfile that collects the bytes written since the last pop()."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def select_students(student_numbers=None, params=None):
+    """
+    Student numbers for a dossier export, from an explicit list and/or the
+    filters of the `students` export dataset. Returns (found, missing).
+    """
+    student_numbers = [number.strip() for number in student_numbers or [] if number and number.strip()]
+    params = {key: value for key, value in (params or {}).items() if value not in (None, '')}
+    if not student_numbers and not params:
+        raise ExportError('Pass student numbers or at least one student filter.')
+
+    queryset = DATASETS['students'].filter(Student.objects.all(), params)
+    if student_numbers:
+        queryset = queryset.filter(student_number__in=student_numbers)
+    found = list(queryset.order_by('student_number').values_list('student_number', flat=True)[:MAX_STUDENTS + 1])
+    if len(found) > MAX_STUDENTS:
+        raise ExportError(f'At most {MAX_STUDENTS} students can be exported at once.')
+
+    selected = set(found)
+    missing = sorted({number for number in student_numbers if number not in selected}) if student_numbers and not params else []
+    return found, missing
+
+
+def build_dossiers(student_numbers, batch_size=BATCH_SIZE):
+    """Yield (student_number, dossier) for each student, reading them `batch_size` at a time."""
+    for start in range(0, len(student_numbers), batch_size):
+        batch = student_numbers[start:start + batch_size]
+        students = (
+            Student.objects
+            .filter(student_number__in=batch)
+            .select_related('user', 'permanent_address', 'address_while_in_up', 'photo')
+            .order_by('student_number')
+        )
+        submissions = list(
+            Submission.objects
+            .filter(student__in=batch, status='submitted')
+            .select_related('student')
+            .order_by('submitted_on', 'id')
+        )
+
+        by_form_type = defaultdict(list)
+        for submission in submissions:
+            by_form_type[submission.form_type].append(submission)
+        sections = {}
+        for form_type, group in by_form_type.items():
+            sections.update(load_bundles(group, FORM_TYPE_UNSLUG_MAP[form_type]))
+
+        forms = defaultdict(lambda: defaultdict(list))
+        for submission in submissions:
+            forms[submission.student_id][FORM_TYPE_UNSLUG_MAP[submission.form_type]].append({
+                'submission': SubmissionSerializer(submission).data,
+                **sections[submission.pk],
+            })
+
+        graduation = defaultdict(list)
+        for record in GraduateStudent.objects.filter(student_number__in=batch).select_related('student_number').order_by('id'):
+            graduation[record.student_number_id].append(GraduateStudentSerializer(record).data)
+
+        referrals_received = defaultdict(list)
+        referrals = (
+            Referral.objects
+            .filter(referred_person__student__in=batch, submission__status='submitted')
+            .select_related('referred_person')
+            .order_by('referral_date', 'id')
+        )
+        for referral in referrals:
+            referrals_received[referral.referred_person.student_id].append(ReferralSerializer(referral).data)
+
+        for student in students:
+            number = student.student_number
+            yield number, {
+                'student': StudentSerializer(student).data,
+                'forms': {slug: entries for slug, entries in forms[number].items()},
+                'graduation': graduation[number],
+                'referrals_received': referrals_received[number],
+            }
+
+
+def _rows(value, label=''):
+    """Flatten nested dossier data into (label, value) rows for the HTML view."""
+    if isinstance(value, dict):
+        rows = []
+        for key, item in value.items():
+            rows.extend(_rows(item, f'{label}.{key}' if label else str(key)))
+        return rows
+    if isinstance(value, list):
+        if not value:
+            return [(label, '')]
+        rows = []
+        for index, item in enumerate(value, start=1):
+            rows.extend(_rows(item, f'{label} [{index}]'))
+        return rows
+    return [(label, '' if value is None else value)]
+
+
+def render_html(dossier):
+    sections = [('Student profile', _rows(dossier['student']))]
+    for slug, entries in dossier['forms'].items():
+        for index, entry in enumerate(entries, start=1):
+            title = slug.replace('-', ' ').title()
+            sections.append((f'{title} ({index})' if len(entries) > 1 else title, _rows(entry)))
+    if dossier['graduation']:
+        sections.append(('Graduation', _rows(dossier['graduation'])))
+    if dossier['referrals_received']:
+        sections.append(('Referrals received', _rows(dossier['referrals_received'])))
+
+    student = dossier['student']
+    return render_to_string('student_dossier.html', {
+        'student': student,
+        'sections': sections,
+        'generated_at': timezone.localtime(),
+    })
+
+
+def stream_dossiers(student_numbers, missing=(), html=False, batch_size=BATCH_SIZE):
+    """
+    Yield the bytes of a zip archive holding <student_number>/dossier.json (and
+    dossier.html with html=True) for each student, plus manifest.json.
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        exported = []
+        for number, dossier in build_dossiers(student_numbers, batch_size=batch_size):
+            archive.writestr(f'{number}/dossier.json', json.dumps(dossier, indent=2, default=str))
+            if html:
+                archive.writestr(f'{number}/dossier.html', render_html(dossier))
+            exported.append(number)
+            yield stream.pop()
+
+        archive.writestr('manifest.json', json.dumps({
+            'generated_at': timezone.localtime().isoformat(),
+            'students': exported,
+            'missing': list(missing),
+            'html': html,
+        }, indent=2))
+    yield stream.pop()
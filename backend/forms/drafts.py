@@ -0,0 +1,233 @@
+"""
+Draft buffer: autosaves of a draft kept in one JSON document per submission.
+
+Nothing reads a draft's section tables but the student editing it, so while
+a submission is a draft FormBundleView.patch validates the sections it is
+sent and merges them into Submission.draft_buffer, written with a single
+UPDATE, instead of syncing up to thirteen normalized tables on every save.
+Only the sections a student changed are buffered; load_bundle overlays them
+on the stored rows, so every reader sees the same data whichever store holds
+it.
+
+The buffer is written out to the section tables (materialized) in one
+transaction when the form is finalized, and before anything edits those
+tables directly (delta autosave, admin edits). Checks against the stored
+rows, such as uniqueness, run then rather than on every autosave.
+
+Autosaves can be coalesced further before they reach the buffer (see
+forms.autosave): every write of the buffer first takes in the submission's
+pending autosave, so older data never lands on top of newer.
+"""
+import copy
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.validators import UniqueTogetherValidator
+
+from forms import autosave
+from forms.models import Submission
+from forms.writes import lock_submission, persist_sections, touch_submission, validate_sections, write_sections
+
+
+def buffering(submission):
+    """Whether saves to `submission` go to its draft buffer."""
+    return getattr(settings, 'FORMS_DRAFT_BUFFER', True) and submission.status == 'draft'
+
+
+def merge_section(current, data):
+    """
+    `data` saved over `current`, a section as buffered or as stored. An
+    object keeps the fields `data` leaves out, as a partial save would; a
+    list replaces `current`, each row keeping the fields of the row with the
+    same id.
+    """
+    if isinstance(data, list):
+        rows = {row.get('id'): row for row in current or [] if row.get('id') is not None}
+        return [{**rows.get(row.get('id'), {}), **row} for row in data]
+    if isinstance(current, dict):
+        return {**current, **data}
+    return data
+
+
+def overlay_draft(bundle, draft_buffer, entry=None):
+    """
+    Apply the buffered sections of a submission, then its pending autosave
+    entry, to its loaded bundle (see forms.bundles).
+    """
+    for sections in (draft_buffer, entry['sections'] if entry else {}):
+        for key, data in sections.items():
+            if key in bundle:
+                bundle[key] = merge_section(bundle[key], data)
+    return bundle
+
+
+def _strip_owners(section, data):
+    # Owners are attached from the submission when the buffer is written out.
+    if isinstance(data, list):
+        return [_strip_owners(section, row) for row in data]
+    return {name: value for name, value in data.items() if name not in section.owners}
+
+
+def _draft_serializer(section, data, context):
+    many = isinstance(data, list)
+    serializer = section.serializer_class(data=data, many=many, partial=True, context=context)
+    child = serializer.child if many else serializer
+    child.validators = [validator for validator in child.validators if not isinstance(validator, UniqueTogetherValidator)]
+    return serializer
+
+
+def validate_draft(form, payload, submission, student, request=None):
+    """
+    Validate the sections of `form` present in `payload` without reading
+    their tables. Returns (sections, errors); `sections` is a list of
+    (key, data) ready to merge into the buffer.
+    """
+    context = {'submission': submission, 'student': student, 'request': request}
+    valid, errors = [], {}
+    for section in form:
+        section_data = payload.get(section.key)
+        if section_data is None:
+            continue
+        section_data = _strip_owners(section, copy.deepcopy(section_data))
+        serializer = _draft_serializer(section, copy.deepcopy(section_data), context)
+        if serializer.is_valid():
+            valid.append((section.key, section_data))
+        else:
+            errors[section.key] = serializer.errors
+    return valid, errors
+
+
+def absorb_autosave(submission):
+    """
+    Merge the pending autosave entry into submission.draft_buffer and mark
+    it written in submission.autosave_token (in memory; the caller saves
+    both), then drop the entry once the transaction commits. Call after
+    lock_submission(). Returns the keys of the sections taken in.
+    """
+    entry = autosave.pending(submission.pk, submission.autosave_token)
+    if entry is None:
+        return []
+    draft_buffer = dict(submission.draft_buffer)
+    for key, section_data in entry['sections'].items():
+        draft_buffer[key] = merge_section(draft_buffer.get(key), section_data)
+    submission.draft_buffer = draft_buffer
+    submission.autosave_token = entry['token']
+    transaction.on_commit(lambda: autosave.discard(submission.pk, entry['token']))
+    return list(entry['sections'])
+
+
+def _write_buffer(submission, sections):
+    """Take in the pending autosave and merge `sections` over it into the draft buffer, in one UPDATE."""
+    with transaction.atomic():
+        lock_submission(submission)
+        keys = absorb_autosave(submission)
+        draft_buffer = dict(submission.draft_buffer)
+        for key, section_data in sections:
+            draft_buffer[key] = merge_section(draft_buffer.get(key), section_data)
+        submission.draft_buffer = draft_buffer
+        if keys or sections:
+            touch_submission(submission, list(dict.fromkeys(keys + [key for key, _ in sections])),
+                             timezone.now(), fields=['draft_buffer', 'autosave_token'])
+    return {key: draft_buffer[key] for key, _ in sections}
+
+
+def buffer_sections(form, payload, submission, student, request=None):
+    """
+    Validate the sections in `payload` and merge them into the draft buffer,
+    bumping their versions, in one UPDATE. Returns (data, errors) like
+    forms.writes.write_sections; nothing is buffered on errors.
+    """
+    valid, errors = validate_draft(form, payload, submission, student, request)
+    if errors:
+        return {}, errors
+    return _write_buffer(submission, valid), {}
+
+
+def autosave_sections(form, payload, submission, student, request=None):
+    """
+    Validate an autosave and, within FORMS_AUTOSAVE_INTERVAL of the last
+    save, merge it into the pending autosave entry instead of writing it
+    (see forms.autosave). Returns (data, errors, durable); `durable` says
+    whether the data is in the database.
+    """
+    valid, errors = validate_draft(form, payload, submission, student, request)
+    if errors:
+        return {}, errors, False
+
+    interval = timedelta(seconds=autosave.autosave_interval())
+    if submission.saved_on is None or timezone.now() - submission.saved_on >= interval:
+        return _write_buffer(submission, valid), {}, True
+
+    with transaction.atomic():
+        lock_submission(submission)
+        entry = autosave.pending(submission.pk, submission.autosave_token)
+        sections = dict(entry['sections']) if entry else {}
+        for key, section_data in valid:
+            sections[key] = merge_section(sections.get(key), section_data)
+        autosave.stash(submission.pk, sections)
+    return {key: sections[key] for key, _ in valid}, {}, False
+
+
+def flush_autosave(submission):
+    """Write the pending autosave entry of `submission` to its draft buffer. Returns whether there was one."""
+    if autosave.pending(submission.pk, submission.autosave_token) is None:
+        return False
+    _write_buffer(submission, [])
+    return True
+
+
+def flush_autosaves(since):
+    """flush_autosave() every draft saved since `since` that has a pending entry. Returns how many."""
+    ids = list(Submission.objects.filter(status='draft', saved_on__gte=since).values_list('pk', flat=True))
+    flushed = 0
+    # flush_autosave() skips the entries already written out.
+    for submission in Submission.objects.filter(pk__in=list(autosave.pending_many(ids))):
+        flushed += flush_autosave(submission)
+    return flushed
+
+
+def materialize(form, submission, student, request=None):
+    """
+    Write the buffered sections to their tables and empty the buffer. Call
+    after lock_submission(), inside its transaction. Returns the validation
+    errors keyed by section; nothing is written if there are any.
+    """
+    absorb_autosave(submission)
+    if not submission.draft_buffer:
+        return {}
+    writes, errors = validate_sections(form, copy.deepcopy(submission.draft_buffer), submission, student, request)
+    if errors:
+        # Keep the pending autosave taken in above.
+        transaction.set_rollback(True)
+        return errors
+    persist_sections(writes)
+    submission.draft_buffer = {}
+    submission.save(update_fields=['draft_buffer', 'autosave_token', 'updated_at'])
+    return {}
+
+
+def flush_draft(form, submission, student, request=None):
+    """materialize() in its own transaction, for paths about to write the section tables."""
+    with transaction.atomic():
+        lock_submission(submission)
+        return materialize(form, submission, student, request)
+
+
+def save_draft(form, payload, submission, student, request=None, coalesce=False):
+    """
+    Save sections of a draft: into the buffer, or straight to the tables
+    with buffering turned off. Returns (data, errors, durable); with
+    `coalesce`, autosaves may be held back and so not durable yet.
+    """
+    if buffering(submission):
+        if coalesce:
+            return autosave_sections(form, payload, submission, student, request)
+        data, errors = buffer_sections(form, payload, submission, student, request)
+        return data, errors, not errors
+    errors = flush_draft(form, submission, student, request)
+    if errors:
+        return {}, errors, False
+    data, errors = write_sections(form, payload, submission, student, request)
+    return data, errors, not errors
@@ -0,0 +1,232 @@
+import csv
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from forms.models import Student, Submission, Referral, PARD
+
+CHUNK_SIZE = 2000
+
+
+class ExportError(ValueError):
+    pass
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+class ExportDataset:
+    """
+    A flat, filterable projection of one table.
+
+    - columns: output column -> ORM lookup passed to values_list().
+    - filters: query parameter -> ORM lookup. Comma-separated values become __in;
+      a parameter with no values (blank or only commas) is ignored.
+    - default_columns: columns used when none are requested.
+    """
+
+    def __init__(self, queryset, columns, filters=None, default_columns=None, ordering=None):
+        self._queryset = queryset
+        self.columns = columns
+        self.filters = filters or {}
+        self.default_columns = default_columns or list(columns)
+        self.ordering = ordering or []
+
+    def queryset(self):
+        return self._queryset() if callable(self._queryset) else self._queryset.all()
+
+    def select_columns(self, requested=None):
+        if not requested:
+            return list(self.default_columns)
+        unknown = [column for column in requested if column not in self.columns]
+        if unknown:
+            raise ExportError(f"Unknown columns: {', '.join(unknown)}.")
+        return list(requested)
+
+    def filter(self, queryset, params):
+        for param, lookup in self.filters.items():
+            value = params.get(param)
+            if value in (None, ''):
+                continue
+            values = [part.strip() for part in str(value).split(',') if part.strip()]
+            if not values:
+                continue
+            if lookup.endswith(('__date__gte', '__date__lte')):
+                try:
+                    values = [date.fromisoformat(values[0])]
+                except ValueError:
+                    raise ExportError(f"'{param}' must be a date (YYYY-MM-DD).")
+            try:
+                if len(values) > 1 and not lookup.endswith(('__gte', '__lte')):
+                    queryset = queryset.filter(**{f'{lookup}__in': values})
+                else:
+                    queryset = queryset.filter(**{lookup: values[0]})
+            except (ValidationError, ValueError):
+                raise ExportError(f"Invalid value for '{param}'.")
+        return queryset
+
+    def rows(self, columns, params=None, chunk_size=CHUNK_SIZE):
+        """Yield one tuple per row through a server-side cursor."""
+        queryset = self.filter(self.queryset(), params or {})
+        lookups = [self.columns[column] for column in columns]
+        return queryset.order_by(*self.ordering).values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def _submissions(form_type):
+    return lambda: Submission.objects.filter(form_type=form_type, status='submitted')
+
+
+SUBMISSION_COLUMNS = {
+    'id': 'id',
+    'form_type': 'form_type',
+    'status': 'status',
+    'saved_on': 'saved_on',
+    'submitted_on': 'submitted_on',
+    'student_number': 'student__student_number',
+    'first_name': 'student__first_name',
+    'last_name': 'student__last_name',
+    'degree_program': 'student__degree_program',
+    'year_level': 'student__current_year_level',
+    'college': 'student__college',
+}
+
+SUBMISSION_FILTERS = {
+    'degree_program': 'student__degree_program',
+    'year_level': 'student__current_year_level',
+    'college': 'student__college',
+    'student_status': 'student__status',
+    'submitted_from': 'submitted_on__date__gte',
+    'submitted_to': 'submitted_on__date__lte',
+}
+
+DATASETS = {
+    'students': ExportDataset(
+        Student.objects.all(),
+        columns={
+            'student_number': 'student_number',
+            'last_name': 'last_name',
+            'first_name': 'first_name',
+            'middle_name': 'middle_name',
+            'nickname': 'nickname',
+            'email': 'user__email',
+            'sex': 'sex',
+            'birthdate': 'birthdate',
+            'contact_number': 'contact_number',
+            'college': 'college',
+            'degree_program': 'degree_program',
+            'year_level': 'current_year_level',
+            'date_initial_entry': 'date_initial_entry',
+            'date_initial_entry_sem': 'date_initial_entry_sem',
+            'status': 'status',
+            'region': 'permanent_address__region',
+            'province': 'permanent_address__province',
+            'city_municipality': 'permanent_address__city_municipality',
+        },
+        filters={
+            'status': 'status',
+            'college': 'college',
+            'degree_program': 'degree_program',
+            'year_level': 'current_year_level',
+            'sex': 'sex',
+            'region': 'permanent_address__region',
+        },
+        default_columns=[
+            'student_number', 'last_name', 'first_name', 'email', 'sex',
+            'college', 'degree_program', 'year_level', 'status',
+        ],
+        ordering=['student_number'],
+    ),
+    'basic-information-sheet': ExportDataset(
+        _submissions('Basic Information Sheet'), SUBMISSION_COLUMNS, SUBMISSION_FILTERS, ordering=['id'],
+    ),
+    'student-cumulative-information-file': ExportDataset(
+        _submissions('Student Cumulative Information File'), SUBMISSION_COLUMNS, SUBMISSION_FILTERS, ordering=['id'],
+    ),
+    'psychosocial-assistance-and-referral-desk': ExportDataset(
+        lambda: Submission.objects.filter(
+            form_type='Psychosocial Assistance and Referral Desk', status='submitted'
+        ).exclude(
+            Exists(PARD.objects.filter(submission_id=OuterRef('pk'), status='deleted'))
+        ),
+        {**SUBMISSION_COLUMNS, 'pard_status': 'pard__status'},
+        {**SUBMISSION_FILTERS, 'pard_status': 'pard__status'},
+        ordering=['id'],
+    ),
+    'counseling-referral-slip': ExportDataset(
+        Referral.objects.filter(submission__status='submitted'),
+        columns={
+            'id': 'id',
+            'submission_id': 'submission_id',
+            'referral_date': 'referral_date',
+            'referral_status': 'referral_status',
+            'referrer_student_number': 'referrer__student__student_number',
+            'referrer_first_name': 'referrer__first_name',
+            'referrer_last_name': 'referrer__last_name',
+            'referrer_department_unit': 'referrer__department_unit',
+            'referred_student_number': 'referred_person__student__student_number',
+            'referred_first_name': 'referred_person__first_name',
+            'referred_last_name': 'referred_person__last_name',
+            'referred_degree_program': 'referred_person__degree_program',
+            'referred_year_level': 'referred_person__year_level',
+        },
+        filters={
+            'referral_status': 'referral_status',
+            'referred_from': 'referral_date__date__gte',
+            'referred_to': 'referral_date__date__lte',
+        },
+        ordering=['-referral_date', '-id'],
+    ),
+}
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _text(value):
+    return '' if value is None else _value(value)
+
+
+def render_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_text(value) for value in row])
+
+
+def render_jsonl(columns, rows):
+    for row in rows:
+        yield json.dumps({column: _value(value) for column, value in zip(columns, row)}, default=str) + '\n'
+
+
+FORMATS = {
+    'csv': (render_csv, 'text/csv'),
+    'jsonl': (render_jsonl, 'application/x-ndjson'),
+}
+
+
+def export(dataset_name, output='csv', columns=None, params=None, chunk_size=CHUNK_SIZE):
+    """
+    Return (chunks, content_type) for an export. `chunks` is a lazy generator of
+    strings, so the rows are fetched and encoded as the consumer iterates.
+    """
+    dataset = DATASETS.get(dataset_name)
+    if dataset is None:
+        raise ExportError(f"Unknown dataset '{dataset_name}'.")
+    if output not in FORMATS:
+        raise ExportError(f"Unknown format '{output}'.")
+
+    columns = dataset.select_columns(columns)
+    render, content_type = FORMATS[output]
+    return render(columns, dataset.rows(columns, params, chunk_size=chunk_size)), content_type
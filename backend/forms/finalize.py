@@ -0,0 +1,51 @@
+"""
+Finalize checks over the compiled form registry (forms.schema).
+
+Each section already knows which field links its rows to a submission,
+whether they are also keyed by student and whether it may be left empty, so
+nothing is introspected per request. Checking a submission costs one query
+per section whatever the number of rows, and reports every problem at once:
+each missing section and the model validation (clean()) of every row, not
+just the first.
+"""
+from django.core.exceptions import ValidationError
+
+from forms.schema import get_form
+
+
+def section_rows(section, submission):
+    filters = {section.link: submission}
+    if 'student' in section.owners:
+        filters['student'] = submission.student_id
+    queryset = section.model.objects.filter(**filters).order_by('pk')
+    return list(queryset if section.many else queryset[:1])
+
+
+def _messages(error):
+    return error.message_dict if hasattr(error, 'error_dict') else {'non_field_errors': error.messages}
+
+
+def finalize_errors(submission, form_type):
+    """
+    Every reason `submission` cannot be finalized yet, keyed by section
+    (and by row id for repeating sections); empty when it can.
+    """
+    errors = {}
+    for section in get_form(form_type):
+        rows = section_rows(section, submission)
+        if not rows:
+            if not section.optional:
+                errors[section.key] = ['Section missing.']
+            continue
+
+        row_errors = {}
+        for row in rows:
+            # clean() reads the submission status; hand it the one already loaded.
+            setattr(row, section.link, submission)
+            try:
+                row.clean()
+            except ValidationError as e:
+                row_errors[row.pk] = _messages(e)
+        if row_errors:
+            errors[section.key] = row_errors if section.many else row_errors[rows[0].pk]
+    return errors
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from forms.exports import CHUNK_SIZE, DATASETS, FORMATS, ExportError, export
+
+
+class Command(BaseCommand):
+    help = 'Writes a dataset export (the same one served by admin/exports/) to a file or stdout.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('--output', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--columns', default='', help='Comma-separated column names.')
+        parser.add_argument('--filter', action='append', default=[], metavar='NAME=VALUE',
+                            help='Filter to apply; may be repeated.')
+        parser.add_argument('--file', help='Destination path. Defaults to stdout.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        params = {}
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f"Filters must look like NAME=VALUE, got '{item}'.")
+            params[name] = value
+
+        columns = [column for column in options['columns'].split(',') if column]
+        try:
+            chunks, _ = export(
+                options['dataset'], output=options['output'], columns=columns,
+                params=params, chunk_size=options['chunk_size'],
+            )
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        if options['file']:
+            with open(options['file'], 'w', newline='', encoding='utf-8') as destination:
+                for chunk in chunks:
+                    destination.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported {options['dataset']} to {options['file']}."))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
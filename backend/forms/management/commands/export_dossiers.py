@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from forms.dossiers import BATCH_SIZE, select_students, stream_dossiers
+from forms.exports import ExportError
+
+
+class Command(BaseCommand):
+    help = 'Writes a zip of student dossiers (the same one served by admin/dossiers/) to a file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Destination .zip path.')
+        parser.add_argument('--student', action='append', default=[], metavar='STUDENT_NUMBER',
+                            help='Student to include; may be repeated.')
+        parser.add_argument('--filter', action='append', default=[], metavar='NAME=VALUE',
+                            help='Students dataset filter to apply; may be repeated.')
+        parser.add_argument('--html', action='store_true', help='Also render dossier.html for each student.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        params = {}
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f"Filters must look like NAME=VALUE, got '{item}'.")
+            params[name] = value
+
+        try:
+            found, missing = select_students(options['student'], params)
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        with open(options['file'], 'wb') as destination:
+            for chunk in stream_dossiers(found, missing=missing, html=options['html'], batch_size=options['batch_size']):
+                destination.write(chunk)
+
+        if missing:
+            self.stderr.write(self.style.WARNING(f"Not found: {', '.join(missing)}"))
+        self.stderr.write(self.style.SUCCESS(f"Exported {len(found)} dossiers to {options['file']}."))
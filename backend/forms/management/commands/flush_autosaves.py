@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from forms.drafts import flush_autosaves
+
+
+class Command(BaseCommand):
+    help = 'Writes pending coalesced autosaves to their drafts. Safe to rerun after a crash.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24,
+                            help='Look at drafts saved within this many hours (default 24).')
+
+    def handle(self, *args, **options):
+        flushed = flush_autosaves(timezone.now() - timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} pending autosaves.'))
@@ -57,6 +57,25 @@ OPTIONAL_SECTIONS = {
     'counseling-referral-slip': []
 }
 
+# Sections returned as lists; every other section is its first row or None.
+MANY_SECTIONS = {
+    'siblings',
+    'previous_school_record',
+    'college_awards',
+    'memberships',
+    'psychometric_data',
+}
+
+# Relations rendered by the section serializers: foreign keys to join and
+# many-to-many fields to prefetch.
+SECTION_PLANS = {
+    'student_support': {'prefetch': ['support']},
+    'siblings': {'prefetch': ['students']},
+    'family_data': {'select': ['mother', 'father', 'guardian']},
+    'previous_school_record': {'select': ['school__school_address']},
+    'referral': {'select': ['referred_person']},
+}
+
 FORM_TYPE_SLUG_MAP = {
     'basic-information-sheet': 'Basic Information Sheet',
     'student-cumulative-information-file': 'Student Cumulative Information File',
@@ -24,6 +24,10 @@ class PARD(models.Model):
 
     class Meta:
         db_table = 'pard_details'
+        indexes = [
+            # Admin PARD queue: status lookup per submission
+            models.Index(fields=['status', 'submission_id'], name='pard_status_submission_idx'),
+        ]
 
     def clean(self):
         """
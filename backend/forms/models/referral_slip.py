@@ -93,6 +93,13 @@ class Referral(models.Model):
         max_length=15, choices=ReferralStatus.choices, null=True, default=ReferralStatus.UNREAD
     )
 
+    class Meta:
+        indexes = [
+            # Referral inbox: newest first, optionally narrowed to one status
+            models.Index(fields=['referral_status', '-referral_date', '-id'], name='referral_status_date_idx'),
+            models.Index(fields=['-referral_date', '-id'], name='referral_date_idx'),
+        ]
+
     def clean(self):
         if self.submission.status == 'draft':
             return
@@ -1,5 +1,7 @@
 import re
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
 from users.models import CustomUser
 from .address import Address  
@@ -54,6 +56,43 @@ class Student(models.Model):
     is_complete = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=50, choices=StudentStatus.choices,  default=StudentStatus.ENROLLED)
+
+    # Full-text document for the admin student search, computed by Postgres on every write
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('last_name', 'first_name', weight='A', config='simple')
+            + SearchVector('nickname', 'middle_name', weight='B', config='simple')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # Cohort filters on the admin reports; the partial indexes only
+            # cover enrolled students, which is what the dashboards count.
+            models.Index(fields=['status', 'college', 'degree_program'], name='student_status_cohort_idx'),
+            models.Index(
+                fields=['college', 'degree_program', 'sex'],
+                condition=models.Q(status='enrolled'),
+                name='student_enrolled_college_idx',
+            ),
+            models.Index(
+                fields=['current_year_level', 'degree_program', 'sex'],
+                condition=models.Q(status='enrolled'),
+                name='student_enrolled_year_idx',
+            ),
+            models.Index(
+                fields=['date_initial_entry', 'date_initial_entry_sem'],
+                condition=models.Q(status='enrolled'),
+                name='student_enrolled_entry_idx',
+            ),
+            # Admin student search: full text and student number prefixes. The
+            # trigram index for typo-tolerant names needs pg_trgm and is added
+            # after migrate when it is installed (forms.search.ensure_trigram_index).
+            GinIndex(fields=['search_vector'], name='student_search_vector_idx'),
+            models.Index(fields=['student_number'], opclasses=['varchar_pattern_ops'], name='student_number_prefix_idx'),
+        ]
     
     def clean(self):
         if not re.match(r"^20\d{2}-20\d{2}$", self.date_initial_entry):
@@ -20,6 +20,12 @@ class Submission(models.Model):
     saved_on = models.DateTimeField(null=True, blank=True) 
     submitted_on = models.DateTimeField(null=True, blank=True)  
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped on every save of a section, keyed by section name; delta autosaves must name the version they edit.
+    section_versions = models.JSONField(default=dict, blank=True)
+    # Section payloads autosaved while a draft and not yet written to the section tables (see forms.drafts).
+    draft_buffer = models.JSONField(default=dict, blank=True)
+    # Token of the last pending autosave written out (see forms.autosave), so it is not taken in twice.
+    autosave_token = models.CharField(max_length=32, blank=True, default='')
 
     class Meta:
         constraints = [
@@ -32,6 +38,12 @@ class Submission(models.Model):
                 name='unique_form_type'
             )
         ]
+        indexes = [
+            # Keyset pagination of the activity feed, with and without a form type filter
+            models.Index(fields=['status', '-submitted_on', '-id'], name='submission_feed_idx'),
+            models.Index(fields=['status', 'form_type', '-submitted_on', '-id'], name='submission_feed_type_idx'),
+            models.Index(fields=['status', '-saved_on', '-id'], name='submission_draft_feed_idx'),
+        ]
  
 
     def clean(self):
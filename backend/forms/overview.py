@@ -0,0 +1,146 @@
+"""
+Everything the admin UI shows about one student ("student 360") in a bounded
+number of queries: the profile, every submission with per-section row counts
+and PARD status, referrals made and received, their acknowledgement receipts
+and graduation info. Full section data is added per form type on request.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+
+from forms import autosave
+from forms.bundles import load_bundles, query_budget
+from forms.drafts import overlay_draft
+from forms.map import FORM_TYPE_UNSLUG_MAP
+from forms.models import Student, Submission, Referral, AcknowledgementReceipt, GraduateStudent, PARD
+from forms.schema import REGISTRY, all_sections, get_form
+from forms.serializers import (
+    StudentSerializer, AcknowledgementReceiptSerializer, GraduateStudentSerializer,
+    REFERRAL_LIST_VALUES, referral_list_rows,
+)
+
+# Profile, submissions, referrals, receipts, graduation.
+OVERVIEW_QUERIES = 5
+
+SUBMISSION_VALUES = ['id', 'form_type', 'status', 'saved_on', 'submitted_on']
+
+
+def _row_count(section):
+    field = section.link
+    rows = section.model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+def parse_expand(value):
+    """Form type slugs named by ?expand= ('all' for every form type)."""
+    slugs = [slug.strip() for slug in (value or '').split(',') if slug.strip()]
+    if 'all' in slugs:
+        return list(REGISTRY)
+    unknown = [slug for slug in slugs if slug not in REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown form types: {', '.join(unknown)}.")
+    return slugs
+
+
+def student_overview(student_number, expand=()):
+    """The student 360 payload, or None if the student does not exist."""
+    budget = OVERVIEW_QUERIES + sum(get_form(slug).budget for slug in expand)
+    sections = all_sections()
+    with query_budget(budget, 'student overview'):
+        student = (
+            Student.objects
+            .select_related('user', 'permanent_address', 'address_while_in_up', 'photo')
+            .filter(student_number=student_number)
+            .first()
+        )
+        if student is None:
+            return None
+
+        pard_status = PARD.objects.filter(submission_id=OuterRef('pk')).order_by('-id').values('status')[:1]
+        rows = list(
+            Submission.objects
+            .filter(student=student)
+            .annotate(
+                pard_status=Subquery(pard_status),
+                **{f'{key}_rows': _row_count(section) for key, section in sections.items()},
+            )
+            .values(*SUBMISSION_VALUES, 'pard_status', 'draft_buffer', 'autosave_token', *(f'{key}_rows' for key in sections))
+            .order_by('form_type', 'created_at', 'id')
+        )
+
+        date_field = serializers.DateTimeField()
+        submissions, form_status, draft_buffers, written = [], {slug: None for slug in REGISTRY}, {}, {}
+        for row in rows:
+            slug = FORM_TYPE_UNSLUG_MAP[row['form_type']]
+            form = get_form(slug)
+            counts = {section.key: row[f'{section.key}_rows'] for section in form}
+            # Buffered draft sections replace what their tables hold.
+            for key, data in row['draft_buffer'].items():
+                if key in counts:
+                    counts[key] = len(data) if isinstance(data, list) else 1
+            entry = {
+                'id': row['id'],
+                'form_type': row['form_type'],
+                'slug': slug,
+                'status': row['status'],
+                'saved_on': date_field.to_representation(row['saved_on']) if row['saved_on'] else None,
+                'submitted_on': date_field.to_representation(row['submitted_on']) if row['submitted_on'] else None,
+                'sections': counts,
+                'missing_sections': [
+                    key for key, count in counts.items()
+                    if not count and not form[key].optional
+                ],
+            }
+            if slug == 'psychosocial-assistance-and-referral-desk':
+                entry['pard_status'] = row['pard_status']
+            submissions.append(entry)
+            draft_buffers[row['id']] = row['draft_buffer']
+            written[row['id']] = row['autosave_token']
+            # Submitted wins over draft for the per-form summary.
+            if form_status[slug] != 'submitted':
+                form_status[slug] = row['status']
+
+        for slug in expand:
+            group = [entry for entry in submissions if entry['slug'] == slug]
+            ids = [entry['id'] for entry in group]
+            bundles, pending = load_bundles(ids, slug), autosave.pending_many(ids, written)
+            for entry in group:
+                entry['data'] = overlay_draft(bundles[entry['id']], draft_buffers[entry['id']], pending.get(entry['id']))
+
+        referral_rows = list(
+            Referral.objects
+            .filter(Q(referrer__student=student) | Q(referred_person__student=student), submission__status='submitted')
+            .values(
+                'id', 'submission_id', 'referral_date', 'referral_status', 'referrer_id', 'referred_person_id',
+                referred_student_id=F('referred_person__student_id'),
+                **REFERRAL_LIST_VALUES,
+            )
+            .order_by('-referral_date', '-id')
+        )
+        referrals = {'made': [], 'received': []}
+        for row, data in zip(referral_rows, referral_list_rows(referral_rows)):
+            if row['referrer_student_id'] == student.student_number:
+                referrals['made'].append(data)
+            if row['referred_student_id'] == student.student_number:
+                referrals['received'].append(data)
+
+        receipts = []
+        if referral_rows:
+            receipts = AcknowledgementReceiptSerializer(
+                AcknowledgementReceipt.objects
+                .filter(referral__in=[row['id'] for row in referral_rows])
+                .select_related('referral__referred_person', 'referral__referrer__student', 'counselor')
+                .order_by('-date_of_receipt', '-id'),
+                many=True,
+            ).data
+
+        graduation = GraduateStudent.objects.filter(student_number=student).select_related('student_number').order_by('-id').first()
+
+        return {
+            'profile': StudentSerializer(student).data,
+            'form_status': form_status,
+            'submissions': submissions,
+            'referrals': referrals,
+            'acknowledgement_receipts': receipts,
+            'graduation': GraduateStudentSerializer(graduation).data if graduation else None,
+        }
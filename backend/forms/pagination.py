@@ -0,0 +1,33 @@
+from rest_framework.pagination import CursorPagination
+from analytics.pagination import KeysetPagination
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Cursor pagination, on unless the client opts out with ?paginate=false.
+    Only admin pages that filter and page the whole list in the browser
+    should opt out.
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    paginate_query_param = 'paginate'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.paginate_query_param) == 'false':
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+class StudentCursorPagination(OptionalCursorPagination):
+    ordering = ('last_name', 'first_name', 'student_number')
+
+class SubmissionCursorPagination(OptionalCursorPagination):
+    ordering = ('-submitted_on', '-id')
+
+class ReferralInboxPagination(KeysetPagination):
+    ordering_field = 'referral_date'
+    page_size = 25
+    max_page_size = 100
+
+class SubmissionListPagination(OptionalCursorPagination):
+    """Cursor pages for the generic admin submission list."""
+    ordering = ('-submitted_on', '-id')
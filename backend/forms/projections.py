@@ -0,0 +1,84 @@
+from rest_framework import serializers
+
+# Public field name -> ORM lookup for the admin submission lists. "student.*"
+# fields are returned nested under "student", like AdminSubmissionDetailSerializer.
+SUBMISSION_FIELDS = {
+    'id': 'id',
+    'form_type': 'form_type',
+    'status': 'status',
+    'created_at': 'created_at',
+    'saved_on': 'saved_on',
+    'submitted_on': 'submitted_on',
+    'updated_at': 'updated_at',
+    'student.student_number': 'student__student_number',
+    'student.first_name': 'student__first_name',
+    'student.last_name': 'student__last_name',
+    'student.middle_name': 'student__middle_name',
+    'student.current_year_level': 'student__current_year_level',
+    'student.degree_program': 'student__degree_program',
+    'student.college': 'student__college',
+    'student.sex': 'student__sex',
+    'student.status': 'student__status',
+    'student.email': 'student__user__email',
+}
+
+STUDENT_SUMMARY_FIELDS = [
+    'student.student_number', 'student.first_name', 'student.last_name',
+    'student.current_year_level', 'student.degree_program',
+]
+
+DEFAULT_SUBMISSION_FIELDS = ['id', 'form_type', 'status', 'saved_on', 'submitted_on', 'student']
+
+DATETIME_FIELDS = {'created_at', 'saved_on', 'submitted_on', 'updated_at'}
+
+
+class ProjectionError(ValueError):
+    pass
+
+
+class SubmissionProjection:
+    """
+    Turns a ?fields= list into the values() lookups to query and back into
+    response rows, so columns and joins that were not asked for are never read.
+    `student` alone expands to the student summary fields.
+    """
+
+    def __init__(self, fields=None, extra=()):
+        requested = fields or DEFAULT_SUBMISSION_FIELDS
+        expanded = []
+        for field in requested:
+            names = STUDENT_SUMMARY_FIELDS if field == 'student' else [field]
+            for name in names:
+                if name not in SUBMISSION_FIELDS:
+                    raise ProjectionError(f"Unknown field '{field}'.")
+                if name not in expanded:
+                    expanded.append(name)
+        self.fields = expanded
+        self.has_student = any(name.startswith('student.') for name in expanded)
+        # Columns needed by the caller (e.g. the pagination cursor) but not returned.
+        self.extra = [name for name in extra if name not in expanded]
+
+    def lookups(self):
+        lookups = [SUBMISSION_FIELDS[name] for name in self.fields + self.extra]
+        if self.has_student:
+            lookups.append('student_id')
+        return list(dict.fromkeys(lookups))
+
+    def shape(self, rows):
+        date_field = serializers.DateTimeField()
+        data = []
+        for row in rows:
+            item = {}
+            student = {} if self.has_student and row['student_id'] is not None else None
+            for name in self.fields:
+                value = row[SUBMISSION_FIELDS[name]]
+                if name in DATETIME_FIELDS:
+                    value = date_field.to_representation(value) if value is not None else None
+                if name.startswith('student.'):
+                    if student is not None:
+                        student[name.split('.', 1)[1]] = value
+                    item.setdefault('student', student)
+                else:
+                    item[name] = value
+            data.append(item)
+        return data
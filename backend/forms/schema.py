@@ -0,0 +1,188 @@
+"""
+Registry of form types and their sections, compiled once when the app is
+ready (FormsConfig.ready) from the declarations in forms.map.
+
+Each FormSection knows its model and serializer, how its rows link to a
+submission, which owner keys a payload may leave out, whether it is a list
+and whether it may be left empty, which relations its serializer renders
+(and so how to query it in a fixed number of queries), and a JSON Schema of
+its payload. Views and the read/write paths look sections up here instead of
+introspecting models on every request.
+"""
+import hashlib
+import json
+
+from rest_framework import serializers
+
+from forms.map import FORM_SECTIONS_MAP, FORM_TYPE_SLUG_MAP, MANY_SECTIONS, OPTIONAL_SECTIONS, SECTION_PLANS
+from forms.models import Submission
+
+JSON_SCHEMA_DIALECT = 'https://json-schema.org/draft/2020-12/schema'
+
+_FIELD_TYPES = [
+    (serializers.BooleanField, {'type': 'boolean'}),
+    (serializers.IntegerField, {'type': 'integer'}),
+    (serializers.FloatField, {'type': 'number'}),
+    (serializers.DecimalField, {'type': 'string', 'format': 'decimal'}),
+    (serializers.DateTimeField, {'type': 'string', 'format': 'date-time'}),
+    (serializers.DateField, {'type': 'string', 'format': 'date'}),
+    (serializers.TimeField, {'type': 'string', 'format': 'time'}),
+    (serializers.EmailField, {'type': 'string', 'format': 'email'}),
+    (serializers.CharField, {'type': 'string'}),
+    (serializers.JSONField, {}),
+]
+
+
+def _with_null(schema, field):
+    if getattr(field, 'allow_null', False) and 'type' in schema:
+        schema['type'] = [schema['type'], 'null']
+    return schema
+
+
+def field_schema(field):
+    """JSON Schema of one serializer field."""
+    if isinstance(field, serializers.ListSerializer):
+        schema = {'type': 'array', 'items': field_schema(field.child)}
+    elif isinstance(field, serializers.Serializer):
+        schema = object_schema(field)
+    elif isinstance(field, serializers.ManyRelatedField):
+        schema = {'type': 'array', 'items': field_schema(field.child_relation)}
+    elif isinstance(field, serializers.RelatedField):
+        pk = field.queryset.model._meta.pk if field.queryset is not None else None
+        schema = {'type': 'string' if pk is not None and pk.get_internal_type() == 'CharField' else 'integer'}
+    elif isinstance(field, serializers.MultipleChoiceField):
+        schema = {'type': 'array', 'items': {'enum': list(field.choices)}}
+    elif isinstance(field, serializers.ChoiceField):
+        schema = {'enum': list(field.choices) + ([None] if field.allow_null else [])}
+    elif isinstance(field, serializers.ListField):
+        schema = {'type': 'array', 'items': field_schema(field.child)}
+    else:
+        schema = next((dict(base) for kind, base in _FIELD_TYPES if isinstance(field, kind)), {})
+        if getattr(field, 'max_length', None):
+            schema['maxLength'] = field.max_length
+    schema = _with_null(schema, field)
+    if field.read_only:
+        schema['readOnly'] = True
+    return schema
+
+
+def object_schema(serializer):
+    fields = serializer.fields
+    schema = {
+        'type': 'object',
+        'properties': {name: field_schema(field) for name, field in fields.items()},
+    }
+    required = [name for name, field in fields.items() if field.required and not field.read_only]
+    if required:
+        schema['required'] = required
+    return schema
+
+
+class FormSection:
+    def __init__(self, form_type, key, model, serializer_class, optional):
+        self.form_type = form_type
+        self.key = key
+        self.model = model
+        self.serializer_class = serializer_class
+        self.many = key in MANY_SECTIONS
+        self.optional = optional
+
+        field_names = {field.name for field in model._meta.fields}
+        link = next((field for field in model._meta.fields if field.is_relation and field.related_model is Submission), None)
+        if link is None:
+            raise ValueError(f'{model.__name__} has no foreign key to Submission.')
+        # The foreign key to Submission (PARD calls it submission_id) and its column.
+        self.link = link.name
+        self.link_attname = link.attname
+        # Foreign keys filled in from the request when a payload leaves them out.
+        self.owners = tuple(name for name in ('submission', 'student') if name in field_names)
+
+        plan = SECTION_PLANS.get(key, {})
+        self.select = tuple(plan.get('select', ()))
+        self.prefetch = tuple(plan.get('prefetch', ()))
+        # Queries to read the section: the rows plus one per prefetch.
+        self.budget = 1 + len(self.prefetch)
+
+        serializer = serializer_class()
+        self.fields = tuple(serializer.fields)
+        item = object_schema(serializer)
+        # Lists may be empty; a single-object section is null until first saved.
+        self.schema = {'type': 'array', 'items': item} if self.many else dict(item, type=['object', 'null'])
+
+    def queryset(self):
+        queryset = self.model.objects.all()
+        if self.select:
+            queryset = queryset.select_related(*self.select)
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*self.prefetch)
+        return queryset
+
+    def for_submission(self, submission):
+        return self.queryset().filter(**{self.link: submission})
+
+    def __repr__(self):
+        return f'<FormSection {self.form_type}:{self.key}>'
+
+
+class FormSchema:
+    """The sections of one form type, in FORM_SECTIONS_MAP order."""
+
+    def __init__(self, form_type):
+        optional = set(OPTIONAL_SECTIONS.get(form_type, []))
+        self.form_type = form_type
+        self.label = FORM_TYPE_SLUG_MAP[form_type]
+        self.sections = {
+            key: FormSection(form_type, key, model, serializer_class, key in optional)
+            for key, (model, serializer_class) in FORM_SECTIONS_MAP[form_type].items()
+        }
+        # Queries to read a whole bundle of this form (see forms.bundles).
+        self.budget = sum(section.budget for section in self.sections.values())
+
+    def __iter__(self):
+        return iter(self.sections.values())
+
+    def __getitem__(self, key):
+        return self.sections[key]
+
+    def __contains__(self, key):
+        return key in self.sections
+
+    def json_schema(self):
+        return {
+            '$schema': JSON_SCHEMA_DIALECT,
+            'title': self.label,
+            'type': 'object',
+            'properties': {key: section.schema for key, section in self.sections.items()},
+            'required': [key for key, section in self.sections.items() if not section.optional],
+        }
+
+
+REGISTRY = {}
+SCHEMA_DOCUMENT = {}
+SCHEMA_ETAG = ''
+
+
+def build_registry():
+    """Compile every form type. Called once from FormsConfig.ready()."""
+    global SCHEMA_ETAG
+    REGISTRY.clear()
+    REGISTRY.update({form_type: FormSchema(form_type) for form_type in FORM_SECTIONS_MAP})
+    SCHEMA_DOCUMENT.clear()
+    SCHEMA_DOCUMENT.update({form_type: form.json_schema() for form_type, form in REGISTRY.items()})
+    digest = hashlib.sha1(json.dumps(SCHEMA_DOCUMENT, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    SCHEMA_ETAG = f'"{digest}"'
+
+
+def schema_document():
+    """The JSON Schema of every form type and its ETag."""
+    return SCHEMA_DOCUMENT, SCHEMA_ETAG
+
+
+def get_form(form_type):
+    """The compiled FormSchema for a form slug, or None."""
+    return REGISTRY.get(form_type)
+
+
+def all_sections():
+    """Every section of every form, keyed by section name (privacy_consent is shared by BIS and SCIF)."""
+    return {section.key: section for form in REGISTRY.values() for section in form}
@@ -0,0 +1,136 @@
+import logging
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.html import escape
+
+from forms.models import Student
+
+logger = logging.getLogger(__name__)
+
+MAX_TOKENS = 6
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+STUDENT_NUMBER_RE = re.compile(r'\d[\d-]*')
+
+RESULT_FIELDS = [
+    'student_number', 'first_name', 'last_name', 'middle_name', 'nickname',
+    'college', 'degree_program', 'current_year_level', 'status',
+]
+HIGHLIGHT_FIELDS = ['student_number', 'first_name', 'last_name', 'nickname']
+
+TRIGRAM_INDEX = 'student_name_trgm_idx'
+TRIGRAM_FIELDS = ['last_name', 'first_name', 'nickname']
+
+_trigram_available = {}
+
+
+def ensure_search_extensions(sender, using='default', **kwargs):
+    """pre_migrate hook: enable pg_trgm before the trigram indexes are created."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError as e:
+        logger.warning('Could not enable pg_trgm; fuzzy student search will be disabled: %s', e)
+    _trigram_available.pop(using, None)
+
+
+def ensure_trigram_index(sender, using='default', **kwargs):
+    """post_migrate hook: add the trigram name index, if pg_trgm could be enabled."""
+    if not trigram_available(using):
+        return
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(f'{quote(Student._meta.get_field(field).column)} gin_trgm_ops' for field in TRIGRAM_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(TRIGRAM_INDEX)} '
+            f'ON {quote(Student._meta.db_table)} USING gin ({columns})'
+        )
+
+
+def trigram_available(using='default'):
+    if using not in _trigram_available:
+        connection = connections[using]
+        available = False
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+                available = cursor.fetchone()[0]
+        _trigram_available[using] = available
+    return _trigram_available[using]
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text)][:MAX_TOKENS]
+
+
+def search_students(text, limit=20, queryset=None):
+    """
+    Ranked student search in one query. Combines:
+    - prefix full-text matching on names and nickname (search_vector),
+    - student number prefixes,
+    - trigram similarity on names for typos, when pg_trgm is installed.
+    """
+    text = (text or '').strip()
+    tokens = tokenize(text)
+    if not tokens:
+        return []
+
+    queryset = Student.objects.all() if queryset is None else queryset
+
+    # Each token matches as a word prefix: "mar del" finds "Maria Delgado".
+    query = SearchQuery(' & '.join(f'{token}:*' for token in tokens), search_type='raw', config='simple')
+    condition = Q(search_vector=query)
+    rank = SearchRank(F('search_vector'), query)
+
+    if STUDENT_NUMBER_RE.fullmatch(text):
+        condition |= Q(student_number__startswith=text)
+        rank = rank + Case(When(student_number__startswith=text, then=Value(2.0)), default=Value(0.0), output_field=FloatField())
+
+    if trigram_available(queryset.db):
+        for token in tokens:
+            if len(token) >= 3:
+                condition |= Q(last_name__trigram_similar=token) | Q(first_name__trigram_similar=token) | Q(nickname__trigram_similar=token)
+        rank = rank + Coalesce(
+            Greatest(
+                TrigramSimilarity('last_name', text),
+                TrigramSimilarity('first_name', text),
+                TrigramSimilarity('nickname', text),
+            ),
+            Value(0.0),
+            output_field=FloatField(),
+        )
+
+    results = (
+        queryset
+        .filter(condition)
+        .annotate(rank=rank)
+        .order_by('-rank', 'last_name', 'first_name', 'student_number')
+        .values(*RESULT_FIELDS, 'rank')[:limit]
+    )
+
+    rows = []
+    for row in results:
+        row['rank'] = round(row['rank'], 4)
+        row['highlight'] = {field: highlight(row[field], tokens) for field in HIGHLIGHT_FIELDS if row[field]}
+        rows.append(row)
+    return rows
+
+
+def highlight(value, tokens):
+    """Wrap word prefixes matching any token in <mark>, escaping everything else."""
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(token) for token in tokens) + r')', re.IGNORECASE)
+    parts, last = [], 0
+    for match in pattern.finditer(value):
+        parts.append(escape(value[last:match.start()]))
+        parts.append(f'<mark>{escape(match.group(0))}</mark>')
+        last = match.end()
+    parts.append(escape(value[last:]))
+    return ''.join(parts)
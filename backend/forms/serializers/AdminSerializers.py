@@ -1,3 +1,4 @@
+from django.db.models import F
 from rest_framework import serializers, generics
 from forms.models import Submission, Referral
 from .ProfileSetupSerializers import StudentSummarySerializer
@@ -9,6 +10,19 @@ class AdminSubmissionDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Submission
         fields = ['id', 'form_type', 'status', 'saved_on', 'submitted_on', 'student']
+
+class AdminPARDListSerializer(AdminSubmissionDetailSerializer):
+    pard_status = serializers.CharField(read_only=True, allow_null=True)
+
+    # Columns read by the PARD list; pair with select_related('student').
+    ONLY_FIELDS = [
+        'id', 'form_type', 'status', 'saved_on', 'submitted_on', 'student_id',
+        'student__student_number', 'student__first_name', 'student__last_name',
+        'student__current_year_level', 'student__degree_program',
+    ]
+
+    class Meta(AdminSubmissionDetailSerializer.Meta):
+        fields = AdminSubmissionDetailSerializer.Meta.fields + ['pard_status']
         
 class AdminReferralListSerializer(serializers.ModelSerializer):
     referrer = serializers.SerializerMethodField()
@@ -52,6 +66,50 @@ class AdminReferralListSerializer(serializers.ModelSerializer):
             return obj.submission.id
         return None
     
+# Flat projection of the referral inbox: one joined query instead of lazy
+# referrer/student/referred person lookups per row.
+REFERRAL_LIST_VALUES = {
+    'referrer_student_id': F('referrer__student_id'),
+    'referrer_student_first_name': F('referrer__student__first_name'),
+    'referrer_student_last_name': F('referrer__student__last_name'),
+    'referrer_first_name': F('referrer__first_name'),
+    'referrer_last_name': F('referrer__last_name'),
+    'referred_first_name': F('referred_person__first_name'),
+    'referred_last_name': F('referred_person__last_name'),
+    'referred_year_level': F('referred_person__year_level'),
+    'referred_degree_program': F('referred_person__degree_program'),
+}
+
+def referral_list_rows(rows):
+    """Shape REFERRAL_LIST_VALUES rows like AdminReferralListSerializer output."""
+    date_field = serializers.DateTimeField()
+    data = []
+    for row in rows:
+        referrer = None
+        if row['referrer_id']:
+            if row['referrer_student_id']:
+                referrer = {"name": f"{row['referrer_student_first_name']} {row['referrer_student_last_name']}"}
+            else:
+                referrer = {"name": f"{row['referrer_first_name']} {row['referrer_last_name']}"}
+
+        referred_person = None
+        if row['referred_person_id']:
+            referred_person = {
+                "name": f"{row['referred_first_name']} {row['referred_last_name']}",
+                "year_level": row['referred_year_level'],
+                "degree_program": row['referred_degree_program'],
+            }
+
+        data.append({
+            "id": row['id'],
+            "submission_id": row['submission_id'],
+            "referral_date": date_field.to_representation(row['referral_date']),
+            "referral_status": row['referral_status'],
+            "referrer": referrer,
+            "referred_person": referred_person,
+        })
+    return data
+    
 class AdminReferralDetailSerializer(serializers.ModelSerializer):
     referred_person = ReferredPersonSerializer(read_only=True)
     
@@ -33,4 +33,22 @@ class StudentSerializer(serializers.ModelSerializer):
 class StudentSummarySerializer(serializers.ModelSerializer):
     class Meta:
         model = Student
-        fields = ['student_number', 'first_name', 'last_name', 'current_year_level', 'degree_program']
\ No newline at end of file
+        fields = ['student_number', 'first_name', 'last_name', 'current_year_level', 'degree_program']
+
+class StudentListSerializer(serializers.ModelSerializer):
+    email = serializers.EmailField(source='user.email', read_only=True)
+
+    # Columns read by the admin student list; pair with select_related('user').
+    ONLY_FIELDS = [
+        'student_number', 'first_name', 'last_name', 'middle_name', 'college', 'current_year_level',
+        'degree_program', 'sex', 'status', 'is_complete', 'date_initial_entry', 'date_initial_entry_sem',
+        'user__email',
+    ]
+
+    class Meta:
+        model = Student
+        fields = [
+            'student_number', 'first_name', 'last_name', 'middle_name', 'email', 'college',
+            'current_year_level', 'degree_program', 'sex', 'status', 'is_complete',
+            'date_initial_entry', 'date_initial_entry_sem',
+        ]
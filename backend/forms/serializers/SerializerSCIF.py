@@ -1,3 +1,7 @@
+from django.db import models
+from django.db.models import prefetch_related_objects
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.utils import timezone
 from rest_framework import serializers
 from phonenumber_field.serializerfields import PhoneNumberField
 from forms.models import (
@@ -7,33 +11,144 @@ from forms.models import (
     GuidanceSpecialistNotes, Address, CollegeAward, PsychometricData, Membership
 )
 
+def bulk_safe(model):
+    """bulk_create/bulk_update skip Model.save() and save signals, so only use them when neither is customised."""
+    if model.save is not models.Model.save:
+        return False
+    return not any(signal.has_listeners(model) for signal in (pre_save, post_save, pre_delete, post_delete))
+
+
+def assign_changed(instance, attrs):
+    """Set `attrs` on `instance` and return the names of the fields whose stored value changed."""
+    dirty = []
+    for name, value in attrs.items():
+        if name == 'id':
+            continue
+        attname = instance._meta.get_field(name).attname
+        before = getattr(instance, attname)
+        setattr(instance, name, value)
+        if getattr(instance, attname) != before:
+            dirty.append(name)
+    return dirty
+
+
 class CustomListSerializer(serializers.ListSerializer):
-   def update(self, instance, validated_data):
-    instance_mapping = {item.id: item for item in instance}
-    data_mapping = {item.get('id'): item for item in validated_data if item.get('id') is not None}
+    """
+    Syncs a repeating section with its payload: rows with a known id are
+    updated, the rest created, and rows missing from the payload deleted.
 
-    ret = []
+    The diff is applied with one bulk_update, one bulk_create and one delete,
+    plus one through-table sync per many-to-many field, so saving a section
+    costs the same number of queries whatever its row count. Children that
+    write nested objects in create()/update() join in by defining
+    bulk_prepare(rows); without it their rows are saved one at a time.
+    """
 
-    # Update existing instances
-    for item_id, data in data_mapping.items():
-        if item_id in instance_mapping:
-            ret.append(self.child.update(instance_mapping[item_id], data))
+    def update(self, instance, validated_data):
+        instance_mapping = {item.id: item for item in instance}
+        data_mapping = {item.get('id'): item for item in validated_data if item.get('id') is not None}
 
-    # Create new instances
-    create_data = [item for item in validated_data 
-                   if item.get('id') is None or item.get('id') not in instance_mapping]
-    
-    for data in create_data:
-        ret.append(self.child.create(data))
+        update_rows = [(instance_mapping[item_id], data) for item_id, data in data_mapping.items() if item_id in instance_mapping]
+        create_data = [item for item in validated_data if item.get('id') not in instance_mapping]
+        # Delete items not in payload
+        stale_ids = set(instance_mapping) - set(data_mapping)
+
+        return self.sync(update_rows, create_data, stale_ids)
+
+    def sync(self, update_rows, create_data, delete_ids=()):
+        """
+        Apply a computed diff: `update_rows` is a list of (instance, validated
+        attrs), `create_data` a list of validated rows. Returns the updated
+        and created instances.
+        """
+        if self._can_bulk_sync():
+            ret = self._bulk_sync(update_rows, create_data)
+        else:
+            ret = [self.child.update(item, data) for item, data in update_rows]
+            ret += [self.child.create(data) for data in create_data]
+
+        if delete_ids:
+            self.child.Meta.model.objects.filter(id__in=delete_ids).delete()
+
+        return ret
+
+    def _can_bulk_sync(self):
+        child = self.child
+        if not bulk_safe(child.Meta.model):
+            return False
+        if hasattr(child, 'bulk_prepare'):
+            return True
+        if type(child).create is not serializers.ModelSerializer.create:
+            return False
+        if type(child).update is not serializers.ModelSerializer.update:
+            return False
+        return not any(isinstance(field, serializers.BaseSerializer) for field in child.fields.values())
+
+    def _bulk_sync(self, update_rows, create_data):
+        model = self.child.Meta.model
+        m2m_names = [field.name for field in model._meta.many_to_many]
+        auto_now = [field.name for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+
+        rows = [(item, dict(data)) for item, data in update_rows] + [(None, dict(data)) for data in create_data]
+        if hasattr(self.child, 'bulk_prepare'):
+            self.child.bulk_prepare(rows)
+
+        now = timezone.now()
+        synced, changed, created, update_fields = [], [], [], set()
+        for item, attrs in rows:
+            related = {name: attrs.pop(name) for name in m2m_names if name in attrs}
+            if item is None:
+                item = model(**attrs)
+                created.append(item)
+            else:
+                dirty = assign_changed(item, attrs)
+                if dirty:
+                    for name in auto_now:
+                        setattr(item, name, now)
+                    changed.append(item)
+                    update_fields.update(dirty, auto_now)
+            synced.append((item, related))
+
+        if changed:
+            model.objects.bulk_update(changed, sorted(update_fields))
+        if created:
+            model.objects.bulk_create(created)
+        for name in m2m_names:
+            self._sync_m2m(model, name, [(item, related[name]) for item, related in synced if name in related])
+
+        ret = [item for item, _ in synced]
+        if m2m_names:
+            prefetch_related_objects(ret, *m2m_names)
+        return ret
+
+    def _sync_m2m(self, model, name, pairs):
+        """Make the through table hold exactly the given (instance, related objects) pairs."""
+        if not pairs:
+            return
+        field = model._meta.get_field(name)
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+
+        wanted = dict.fromkeys((item.pk, related.pk) for item, values in pairs for related in values)
+        existing = {
+            (source_id, target_id): pk
+            for pk, source_id, target_id in through.objects
+            .filter(**{f'{source}__in': [item.pk for item, _ in pairs]})
+            .values_list('pk', source, target)
+        }
+
+        stale = [pk for key, pk in existing.items() if key not in wanted]
+        if stale:
+            through.objects.filter(pk__in=stale).delete()
+        missing = [key for key in wanted if key not in existing]
+        if missing:
+            through.objects.bulk_create([through(**{source: source_id, target: target_id}) for source_id, target_id in missing])
+
+        for item, _ in pairs:
+            getattr(item, '_prefetched_objects_cache', {}).pop(name, None)
 
-    # Optionally delete items not in payload
-    payload_ids = set(data_mapping.keys())
-    existing_ids = set(instance_mapping.keys())
-    for item_id in existing_ids - payload_ids:
-        instance_mapping[item_id].delete()
 
-    return ret
-   
 class AddressSerializer(serializers.ModelSerializer):
     class Meta:
         model = Address
@@ -351,6 +466,60 @@ class PreviousSchoolRecordSerializer(serializers.ModelSerializer):
         ]
         list_serializer_class = CustomListSerializer
 
+    def bulk_prepare(self, rows):
+        """
+        Bulk counterpart of create()/update() for CustomListSerializer: writes
+        the nested schools and school addresses of every (instance, attrs) row
+        and leaves the School in attrs for new rows.
+        """
+        new_addresses, new_schools = [], []
+        addresses, address_fields = {}, set()
+        schools, school_fields = {}, set()
+
+        for instance, attrs in rows:
+            school_data = dict(attrs.pop('school', None) or {})
+            address_data = school_data.pop('school_address', None)
+
+            if instance is None:
+                if not address_data:
+                    raise serializers.ValidationError("School address data is required")
+                attrs.setdefault('student', self.context.get('student'))
+                attrs.setdefault('submission', self.context.get('submission'))
+            elif not school_data and not address_data:
+                continue
+
+            school = instance.school if instance is not None else None
+            if school is None:
+                address = SchoolAddress(**(address_data or {}))
+                school = School(school_address=address, **school_data)
+                new_addresses.append(address)
+                new_schools.append(school)
+                attrs['school'] = school
+                continue
+
+            if address_data:
+                address = school.school_address
+                if address is None:
+                    school.school_address = address = SchoolAddress(**address_data)
+                    new_addresses.append(address)
+                    school_fields.add('school_address')
+                else:
+                    for attr, value in address_data.items():
+                        setattr(address, attr, value)
+                    addresses[address.pk] = address
+                    address_fields.update(address_data)
+            for attr, value in school_data.items():
+                setattr(school, attr, value)
+            schools[school.pk] = school
+            school_fields.update(school_data)
+
+        SchoolAddress.objects.bulk_create(new_addresses)
+        School.objects.bulk_create(new_schools)
+        if addresses and address_fields:
+            SchoolAddress.objects.bulk_update(list(addresses.values()), sorted(address_fields))
+        if schools and school_fields:
+            School.objects.bulk_update(list(schools.values()), sorted(school_fields))
+
     def create(self, validated_data):
         # Pop school and school_address data from validated_data
         school_data = validated_data.pop('school')
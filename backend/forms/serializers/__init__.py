@@ -10,6 +10,7 @@ from .ProfileSetupSerializers import (
     StudentSerializer,
     AddressSerializer,
     StudentSummarySerializer,
+    StudentListSerializer,
 )
 
 from .SerializerGeneralForm import (
@@ -42,7 +43,10 @@ from .SerializerSCIF import (
 from .AdminSerializers import (
     AdminSubmissionDetailSerializer,
     AdminReferralListSerializer,
-    AdminReferralDetailSerializer
+    AdminReferralDetailSerializer,
+    AdminPARDListSerializer,
+    REFERRAL_LIST_VALUES,
+    referral_list_rows
 )
 
 from .SerializerPARD import (
@@ -1,3 +1,466 @@
-from django.test import TestCase
+import copy
+import json
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from forms.bundles import load_bundle, load_bundles, query_budget
+from forms.map import FORM_TYPE_SLUG_MAP
+from forms.models import FamilyData, HealthData, PreviousSchoolRecord, School, SchoolAddress, Sibling, Submission
+from forms.schema import REGISTRY
+from forms.serializers import PreviousSchoolRecordSerializer, SiblingSerializer
+from forms.serializers.SerializerSCIF import CustomListSerializer
+from forms.search import highlight, search_students, trigram_available
+from users.models import CustomUser
+from users.management.commands.factories import (
+    CounselingInformationFactory, FamilyDataFactory, FamilyRelationshipFactory, HealthDataFactory,
+    PersonalityTraitsFactory, PreferencesFactory, PresentScholasticStatusFactory, PreviousSchoolRecordFactory,
+    PrivacyConsentFactory, SiblingFactory, SocioEconomicStatusFactory, StudentFactory, StudentSupportFactory,
+    SubmissionFactory, SupportFactory, create_records_for_student,
+)
+
+SLUG = 'student-cumulative-information-file'
+URL = f'/api/forms/{SLUG}/'
+# Columns that differ between two writes of the same data.
+VOLATILE = ('id', 'created_at', 'updated_at', 'saved_on', 'submission', 'family_data')
+
+
+class Rollback(Exception):
+    pass
+
+
+def comparable(data):
+    """A loaded bundle without ids and timestamps, its lists in a stable order."""
+    if isinstance(data, list):
+        return sorted((comparable(item) for item in data), key=lambda item: json.dumps(item, sort_keys=True, default=str))
+    if isinstance(data, dict):
+        return {key: comparable(value) for key, value in data.items() if key not in VOLATILE}
+    return data
+
+
+@override_settings(FORMS_DRAFT_BUFFER=True, FORMS_AUTOSAVE_CACHE_ALIAS='default')
+class DraftBufferTests(TestCase):
+    def setUp(self):
+        self.student = StudentFactory()
+        self.submission = SubmissionFactory(
+            student=self.student, form_type='Student Cumulative Information File', status='draft', submitted_on=None,
+        )
+        for _ in range(3):
+            SiblingFactory(submission=self.submission, students=[self.student])
+        family = FamilyDataFactory(student=self.student, submission=self.submission)
+        for person in (family.mother, family.father, family.guardian):
+            person.contact_number = '09171234567'
+            person.save()
+        HealthDataFactory(student_number=self.student, submission=self.submission)
+        PreviousSchoolRecordFactory(student=self.student, submission=self.submission)
+        PersonalityTraitsFactory(student=self.student, submission=self.submission)
+        FamilyRelationshipFactory(student=self.student, submission=self.submission)
+        CounselingInformationFactory(student=self.student, submission=self.submission)
+        PrivacyConsentFactory(student=self.student, submission=self.submission)
+
+        self.client = APIClient(SERVER_NAME='localhost')
+        self.client.force_authenticate(self.student.user)
+
+    def get(self):
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def save(self, payload):
+        return self.client.patch(URL, payload, format='json')
+
+    def finalize(self):
+        return self.client.post(f'/api/forms/finalize/{self.submission.pk}/')
+
+    def edit(self, data):
+        """A save that changes a sibling, drops the others, adds one and edits two single sections."""
+        kept = dict(data['siblings'][0], age=33)
+        added = {'first_name': 'Ben', 'last_name': 'Cruz', 'sex': 'Male', 'age': 3, 'students': []}
+        mother = dict(data['family_data']['mother'], first_name='Ana')
+        return {'siblings': [kept, added], 'health_data': {'height': 171.5}, 'family_data': {'mother': mother}}
+
+    def test_save_is_buffered_and_overlaid(self):
+        data = self.get()
+        sibling = Sibling.objects.filter(submission=self.submission).order_by('id').first()
+
+        response = self.save(self.edit(data))
+        self.assertEqual(response.status_code, 200)
+
+        self.submission.refresh_from_db()
+        self.assertEqual(sorted(self.submission.draft_buffer), ['family_data', 'health_data', 'siblings'])
+        self.assertEqual(Sibling.objects.filter(submission=self.submission).count(), 3)
+        self.assertEqual(Sibling.objects.get(pk=sibling.pk).age, sibling.age)
+
+        after = self.get()
+        self.assertEqual([(row['first_name'], row['age']) for row in after['siblings']],
+                         [(sibling.first_name, 33), ('Ben', 3)])
+        self.assertEqual(after['health_data']['height'], 171.5)
+        self.assertEqual(after['health_data']['weight'], data['health_data']['weight'])
+        self.assertEqual(after['family_data']['mother']['first_name'], 'Ana')
+        self.assertEqual(after['family_data']['mother']['last_name'], data['family_data']['mother']['last_name'])
+
+    def test_finalize_writes_the_same_rows_as_a_direct_save(self):
+        payload = self.edit(self.get())
+
+        def save_and_finalize():
+            self.assertEqual(self.save(payload).status_code, 200)
+            self.assertEqual(self.finalize().status_code, 200)
+            self.submission.refresh_from_db()
+            self.assertEqual(self.submission.draft_buffer, {})
+            return comparable(load_bundle(self.submission, SLUG))
+
+        with self.assertRaises(Rollback), transaction.atomic():
+            buffered = save_and_finalize()
+            raise Rollback
+        with override_settings(FORMS_DRAFT_BUFFER=False):
+            direct = save_and_finalize()
+
+        self.assertEqual(buffered, direct)
+        siblings = Sibling.objects.filter(submission=self.submission)
+        self.assertEqual(siblings.count(), 2)
+        self.assertTrue(siblings.filter(first_name='Ben', age=3).exists())
+        self.assertEqual(HealthData.objects.get(submission=self.submission).height, 171.5)
+
+    def test_rows_left_out_of_a_list_are_deleted_at_finalize(self):
+        data = self.get()
+        kept = data['siblings'][0]
+        self.assertEqual(self.save({'siblings': [kept]}).status_code, 200)
+        self.assertEqual(Sibling.objects.filter(submission=self.submission).count(), 3)
+
+        self.assertEqual(self.finalize().status_code, 200)
+        self.assertEqual(list(Sibling.objects.filter(submission=self.submission).values_list('pk', flat=True)),
+                         [kept['id']])
+
+    def test_finalize_error_keeps_the_buffer(self):
+        data = self.get()
+        payload = self.edit(data)
+        del payload['family_data']
+        self.assertEqual(self.save(payload).status_code, 200)
+        self.submission.refresh_from_db()
+        draft_buffer = self.submission.draft_buffer
+        # The buffer is written out before the check fails, and must be rolled back with it.
+        FamilyData.objects.filter(submission=self.submission).delete()
+
+        response = self.finalize()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], {'family_data': ['Section missing.']})
+
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, 'draft')
+        self.assertEqual(self.submission.draft_buffer, draft_buffer)
+        self.assertEqual(Sibling.objects.filter(submission=self.submission).count(), 3)
+        self.assertEqual(HealthData.objects.get(submission=self.submission).height, data['health_data']['height'])
+
+    def test_stale_delta_conflicts_and_writes_nothing(self):
+        versions = self.get()['versions']
+        self.assertEqual(self.save({'health_data': {'height': 160.5}}).status_code, 200)
+        self.submission.refresh_from_db()
+        state = copy.deepcopy((self.submission.draft_buffer, self.submission.section_versions))
+        height = HealthData.objects.get(submission=self.submission).height
+
+        delta = {'version': versions['health_data'], 'ops': [{'op': 'replace', 'path': '/weight', 'value': 62}]}
+        response = self.client.patch(f'{URL}delta/', {'sections': {'health_data': delta}}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['versions'], {'health_data': versions['health_data'] + 1})
+
+        self.submission.refresh_from_db()
+        self.assertEqual((self.submission.draft_buffer, self.submission.section_versions), state)
+        self.assertEqual(HealthData.objects.get(submission=self.submission).height, height)
+        self.assertEqual(Submission.objects.get(pk=self.submission.pk).status, 'draft')
+
+
+class ExportFilterTests(TestCase):
+    def setUp(self):
+        self.student = StudentFactory(status='enrolled')
+        SubmissionFactory(student=self.student, form_type='Basic Information Sheet')
+        self.client = APIClient(SERVER_NAME='localhost')
+        self.client.force_authenticate(CustomUser.objects.create_superuser('exports@example.com', 'pw'))
+
+    def export(self, dataset, query):
+        response = self.client.get(f'/api/forms/admin/exports/{dataset}/?output=jsonl&{query}')
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, body.decode()
+
+    def test_filter_without_values_is_ignored(self):
+        for dataset, query in [('students', 'status=,'), ('students', 'status=%20,%20'),
+                               ('basic-information-sheet', 'submitted_from=,'),
+                               ('basic-information-sheet', 'submitted_to=,,')]:
+            with self.subTest(dataset=dataset, query=query):
+                status, body = self.export(dataset, query)
+                self.assertEqual(status, 200)
+                self.assertIn(self.student.student_number, body)
+
+    def test_malformed_filters_are_rejected(self):
+        for dataset, query in [('basic-information-sheet', 'submitted_from=yesterday'),
+                               ('counseling-referral-slip', 'referred_to=2024-13-01')]:
+            with self.subTest(dataset=dataset, query=query):
+                status, body = self.export(dataset, query)
+                self.assertEqual(status, 400)
+                self.assertIn('must be a date', body)
+
+    def test_comma_separated_values_match_any(self):
+        status, body = self.export('students', f'status=graduated,{self.student.status}')
+        self.assertEqual(status, 200)
+        self.assertIn(self.student.student_number, body)
+        status, body = self.export('students', 'status=graduated,')
+        self.assertEqual(status, 200)
+        self.assertNotIn(self.student.student_number, body)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AdminListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for _ in range(30):
+            SubmissionFactory(student=StudentFactory(), form_type='Psychosocial Assistance and Referral Desk')
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME='localhost')
+        self.client.force_authenticate(CustomUser.objects.create_superuser('lists@example.com', 'pw'))
+
+    def test_lists_are_paginated_by_default(self):
+        for url in ('/api/forms/admin/students/', '/api/forms/admin/psychosocial-assistance-and-referral-desk'):
+            with self.subTest(url=url):
+                page = self.client.get(url).json()
+                self.assertEqual(len(page['results']), 25)
+                self.assertIsNotNone(page['next'])
+                rest = self.client.get(page['next']).json()
+                self.assertEqual(len(rest['results']), 5)
+                self.assertIsNone(rest['next'])
+
+                self.assertEqual(len(self.client.get(f'{url}?page_size=500').json()['results']), 30)
+                self.assertEqual(len(self.client.get(f'{url}?page_size=10').json()['results']), 10)
+
+    def test_whole_list_is_opt_out(self):
+        for url in ('/api/forms/admin/students/', '/api/forms/admin/psychosocial-assistance-and-referral-desk'):
+            with self.subTest(url=url):
+                rows = self.client.get(f'{url}?paginate=false').json()
+                self.assertIsInstance(rows, list)
+                self.assertEqual(len(rows), 30)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AdminSubmissionListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [StudentFactory() for _ in range(3)]
+        for student in cls.students:
+            SubmissionFactory(student=student, form_type='Basic Information Sheet')
+            SubmissionFactory(student=student, form_type='Student Cumulative Information File')
+        SubmissionFactory(student=cls.students[0], form_type='Psychosocial Assistance and Referral Desk',
+                          status='draft', submitted_on=None)
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME='localhost')
+        self.client.force_authenticate(CustomUser.objects.create_superuser('submissions@example.com', 'pw'))
+
+    def rows(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_form_lists_are_the_generic_list(self):
+        for url, form_type in [('/api/forms/admin/basic-information-sheet-submissions', 'Basic Information Sheet'),
+                               ('/api/forms/admin/student-cumulative-information-file-submissions',
+                                'Student Cumulative Information File')]:
+            with self.subTest(url=url):
+                slug = url.rsplit('/', 1)[1].removesuffix('-submissions')
+                self.assertEqual(self.rows(url), self.rows(f'/api/forms/admin/submissions/{slug}/'))
+                rows = self.rows(f'{url}?paginate=false')
+                self.assertEqual(len(rows), 3)
+                self.assertEqual({row['form_type'] for row in rows}, {form_type})
+
+    def test_student_forms_are_the_generic_list(self):
+        student = self.students[0]
+        rows = self.rows(f'/api/forms/admin/student-forms/{student.student_number}/?paginate=false')
+        self.assertEqual(sorted(row['form_type'] for row in rows),
+                         ['Basic Information Sheet', 'Student Cumulative Information File'])
+        self.assertEqual(
+            self.rows(f'/api/forms/admin/student-forms/{student.student_number}/?fields=id'),
+            self.rows(f'/api/forms/admin/submissions/?student_number={student.student_number}&fields=id'),
+        )
+
+    def test_whole_list_keeps_the_ordering(self):
+        rows = self.rows('/api/forms/admin/submissions/?paginate=false&ordering=submitted_on&fields=id,submitted_on')
+        self.assertEqual(list(rows[0]), ['id', 'submitted_on'])
+        self.assertEqual([row['submitted_on'] for row in rows], sorted(row['submitted_on'] for row in rows))
+        self.assertEqual(len(rows), 6)
+
+
+class QueryBudgetTests(TestCase):
+    """Every form type's bundle reads in exactly its budget, however many rows it holds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.submissions = {slug: [] for slug in REGISTRY}
+        for _ in range(2):
+            student = StudentFactory()
+            for slug, label in FORM_TYPE_SLUG_MAP.items():
+                submission = SubmissionFactory(student=student, form_type=label)
+                cls.submissions[slug].append(submission)
+                if slug == 'basic-information-sheet':
+                    PreferencesFactory(student_number=student, submission=submission)
+                    StudentSupportFactory(student_number=student, submission=submission,
+                                          support=[SupportFactory(), SupportFactory()])
+                    SocioEconomicStatusFactory(student_number=student, submission=submission)
+                    PresentScholasticStatusFactory(student=student, submission=submission)
+                    PrivacyConsentFactory(student=student, submission=submission)
+                elif slug == 'student-cumulative-information-file':
+                    for _ in range(3):
+                        SiblingFactory(submission=submission, students=[student])
+                    FamilyDataFactory(student=student, submission=submission)
+                    HealthDataFactory(student_number=student, submission=submission)
+                    create_records_for_student(student=student, submission=submission)
+                    PersonalityTraitsFactory(student=student, submission=submission)
+                    FamilyRelationshipFactory(student=student, submission=submission)
+                    CounselingInformationFactory(student=student, submission=submission)
+                    PrivacyConsentFactory(student=student, submission=submission)
+
+    def test_bundle_runs_its_budget(self):
+        for slug, form in REGISTRY.items():
+            with self.subTest(form_type=slug), self.assertNumQueries(form.budget):
+                load_bundle(self.submissions[slug][0], slug)
+
+    def test_bundles_run_one_budget_for_many_submissions(self):
+        for slug, form in REGISTRY.items():
+            with self.subTest(form_type=slug), self.assertNumQueries(form.budget):
+                bundles = load_bundles(self.submissions[slug], slug)
+            self.assertEqual(len(bundles), 2)
+
+    def test_overrun_is_logged_not_raised(self):
+        with self.assertLogs('forms.bundles', 'WARNING') as logs:
+            with query_budget(1, 'test read'):
+                Submission.objects.count()
+                Submission.objects.count()
+        self.assertIn('test read ran 2 queries; its budget is 1.', logs.output[0])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Student search needs Postgres full-text search.')
+class StudentSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def student(number, first_name, last_name, nickname='Jo'):
+            return StudentFactory(student_number=number, first_name=first_name, last_name=last_name,
+                                  middle_name='Santos', nickname=nickname)
+
+        cls.by_last_name = student('2019-10001', 'Maria', 'Delgado')
+        cls.by_nickname = student('2020-20001', 'Ana', 'Reyes', nickname='Delgado')
+        cls.other = student('2019-10002', 'Pedro', 'Lim')
+        cls.tagged = student('2021-30001', 'Lia', 'Cruz', nickname='<b>Lia</b>')
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME='localhost')
+        self.client.force_authenticate(CustomUser.objects.create_superuser('search@example.com', 'pw'))
+
+    def numbers(self, text, **kwargs):
+        return [row['student_number'] for row in search_students(text, **kwargs)]
+
+    def test_tokens_match_word_prefixes(self):
+        self.assertEqual(self.numbers('mar del'), ['2019-10001'])
+        self.assertEqual(self.numbers('ped'), ['2019-10002'])
+        self.assertEqual(self.numbers('   '), [])
+
+    def test_names_outrank_nicknames(self):
+        rows = search_students('delgado')
+        self.assertEqual([row['student_number'] for row in rows], ['2019-10001', '2020-20001'])
+        self.assertGreater(rows[0]['rank'], rows[1]['rank'])
+
+    def test_student_number_prefix(self):
+        self.assertEqual(self.numbers('2019-1000'), ['2019-10001', '2019-10002'])
+        self.assertEqual(self.numbers('2020'), ['2020-20001'])
+
+    def test_without_trigram_falls_back_to_full_text(self):
+        with mock.patch('forms.search.trigram_available', return_value=False), self.assertNumQueries(2) as queries:
+            self.assertEqual(self.numbers('delgado'), ['2019-10001', '2020-20001'])
+            self.assertEqual(self.numbers('delgadp'), [])
+        for query in queries.captured_queries:
+            self.assertNotIn('SIMILARITY', query['sql'].upper())
+
+    def test_trigram_matches_typos(self):
+        if not trigram_available():
+            self.skipTest('pg_trgm is not installed.')
+        self.assertEqual(self.numbers('delgadp')[:1], ['2019-10001'])
+
+    def test_highlight_escapes_everything_but_the_marks(self):
+        self.assertEqual(highlight('<b>Lia</b>', ['lia']), '&lt;b&gt;<mark>Lia</mark>&lt;/b&gt;')
+        self.assertEqual(highlight('Delgado & Co', ['del']), '<mark>Del</mark>gado &amp; Co')
+        row = search_students('lia')[0]
+        self.assertEqual(row['highlight']['nickname'], '&lt;b&gt;<mark>Lia</mark>&lt;/b&gt;')
+        self.assertEqual(row['highlight']['first_name'], '<mark>Lia</mark>')
+
+    def test_view(self):
+        response = self.client.get('/api/forms/admin/students/search/', {'q': 'delgado', 'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['student_number'] for row in response.json()['results']], ['2019-10001'])
+        self.assertEqual(self.client.get('/api/forms/admin/students/search/').status_code, 400)
+
+
+class BulkSyncTests(TestCase):
+    """CustomListSerializer's bulk path writes the same rows as saving them one at a time."""
+
+    def setUp(self):
+        self.student = StudentFactory()
+        self.other = StudentFactory()
+        self.submission = SubmissionFactory(student=self.student, form_type='Student Cumulative Information File')
+        for _ in range(3):
+            SiblingFactory(submission=self.submission, students=[self.student])
+        create_records_for_student(student=self.student, submission=self.submission)
+        self.context = {'student': self.student, 'submission': self.submission}
+
+    def sync(self, serializer_class, payload):
+        """Save `payload` over the submission's rows and return them as comparable data."""
+        model = serializer_class.Meta.model
+        rows = model.objects.filter(submission=self.submission).order_by('pk')
+        serializer = serializer_class(rows, data=payload, many=True, context=self.context)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        rows = model.objects.filter(submission=self.submission).order_by('pk')
+        return comparable(serializer_class(rows, many=True).data), School.objects.count(), SchoolAddress.objects.count()
+
+    def assertSameAsPerRow(self, serializer_class, payload):
+        serializer = serializer_class(many=True, context=self.context)
+        self.assertIsInstance(serializer, CustomListSerializer)
+        self.assertTrue(serializer._can_bulk_sync())
+
+        with self.assertRaises(Rollback), transaction.atomic():
+            bulk = self.sync(serializer_class, copy.deepcopy(payload))
+            raise Rollback
+        with mock.patch.object(CustomListSerializer, '_can_bulk_sync', return_value=False):
+            per_row = self.sync(serializer_class, copy.deepcopy(payload))
+
+        self.assertEqual(bulk, per_row)
+        return bulk
+
+    def serialized(self, serializer_class):
+        rows = serializer_class.Meta.model.objects.filter(submission=self.submission).order_by('pk')
+        return [dict(row) for row in serializer_class(rows, many=True).data]
+
+    def test_siblings(self):
+        changed, unchanged, _ = self.serialized(SiblingSerializer)
+        changed.update(age=41, students=[self.other.pk])
+        added = {'first_name': 'Ben', 'last_name': 'Cruz', 'sex': 'Male', 'age': 3,
+                 'submission': self.submission.pk, 'students': [self.other.pk]}
+
+        rows, _, _ = self.assertSameAsPerRow(SiblingSerializer, [changed, unchanged, added])
+        self.assertEqual(len(rows), 3)
+        self.assertIn(comparable(changed), rows)
+        self.assertIn(('Ben', 3, [self.other.pk]), [(row['first_name'], row['age'], row['students']) for row in rows])
+
+    def test_previous_school_records(self):
+        changed, unchanged, _ = self.serialized(PreviousSchoolRecordSerializer)
+        changed['honors_received'] = 'With honors'
+        changed['school'] = dict(changed['school'], name='Renamed High')
+        changed['school']['school_address'] = dict(changed['school']['school_address'], zip_code='1101')
+        added = {
+            'education_level': 'College', 'start_year': 2020, 'end_year': 2024, 'honors_received': '',
+            'submission': self.submission.pk,
+            'school': {'name': 'New College', 'school_address': {'address_line_1': '1 Road', 'zip_code': '4000'}},
+        }
+
+        rows, schools, addresses = self.assertSameAsPerRow(PreviousSchoolRecordSerializer, [changed, unchanged, added])
+        self.assertEqual(sorted(row['education_level'] for row in rows), sorted(['College', changed['education_level'], unchanged['education_level']]))
+        renamed = next(row for row in rows if row['school']['name'] == 'Renamed High')
+        self.assertEqual((renamed['honors_received'], renamed['school']['school_address']['zip_code']), ('With honors', '1101'))
+        self.assertEqual(PreviousSchoolRecord.objects.filter(student=self.student, education_level='College').count(), 1)
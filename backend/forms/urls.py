@@ -1,8 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views.profilesetup import create_student_profile, get_student_profile, update_student_profile, check_student_number
-from .views.GeneralSubmissionViewSet import FormBundleView, FinalizeSubmissionView, AdminFormEditView
-from .views.adminDisplay import AdminStudentListView, get_student_profile_by_id, AdminBISList, AdminStudentFormsView, AdminSCIFList, AdminPARDList, AdminStudentFormView, AdminReferralListView, get_referral_detail
+from .views.GeneralSubmissionViewSet import FormBundleView, FormDeltaView, FinalizeSubmissionView, AdminFormEditView
+from .views.adminDisplay import AdminStudentListView, get_student_profile_by_id, AdminPARDList, AdminStudentFormView, AdminReferralListView, AdminSubmissionListView, get_referral_detail, get_student_overview
 from .views.display import SubmissionViewSet 
 from .views.getEnums import EnumChoicesView
 from .views.BISEditView import BISEditView
@@ -12,7 +12,10 @@ from .views.AdminProfileView import get_counselor_profile, update_counselor_prof
 from .views.GuestSubmissionView import create_referral_submission, verify_referral_submission
 from .views.ReferralViewSet import ReferralSubmissionView, AcknowledgementReceiptView
 from .views.FormStatusView import FormStatusView
+from .views.FormSchemaView import FormSchemaView
 from .views.GraduationView import GraduationView
+from .views.ExportView import AdminExportView, AdminDossierExportView
+from .views.StudentSearchView import AdminStudentSearchView
 
 app_name= 'forms'
 
@@ -25,19 +28,30 @@ urlpatterns = [
     path('student/profile/', get_student_profile),
     path('student/profile/update/', update_student_profile, name='update_student_profile'),
     path('admin/students/<str:student_id>/update/', update_student_profile, name='admin-update-student'),
-    path('admin/basic-information-sheet-submissions', AdminBISList.as_view(), name='get_bis_students'),
-    path('admin/student-cumulative-information-file-submissions', AdminSCIFList.as_view(), name='get_scif_students'),
+    path('admin/basic-information-sheet-submissions', AdminSubmissionListView.as_view(), {'form_type': 'basic-information-sheet'}, name='get_bis_students'),
+    path('admin/student-cumulative-information-file-submissions', AdminSubmissionListView.as_view(), {'form_type': 'student-cumulative-information-file'}, name='get_scif_students'),
     path('admin/counseling-referral-slip-submissions/', AdminReferralListView.as_view(), name='admin-referral-list'),
+    path('admin/submissions/', AdminSubmissionListView.as_view(), name='admin-submission-list'),
+    path('admin/submissions/<str:form_type>/', AdminSubmissionListView.as_view(), name='admin-submission-list-by-type'),
+    path('admin/exports/<str:dataset>/', AdminExportView.as_view(), name='admin-export'),
+    path('admin/dossiers/', AdminDossierExportView.as_view(), name='admin-dossier-export'),
     
     # Form Status Check
     path('check-form-submission/', FormStatusView.as_view(), name='forms-status'),
+
+    # Compiled form schemas (see forms.schema)
+    path('schema/', FormSchemaView.as_view(), name='form-schema'),
+    path('<str:form_type>/schema/', FormSchemaView.as_view(), name='form-schema-detail'),
     
     path('<str:form_type>/', FormBundleView.as_view(), name='form-bundle'),
+    path('<str:form_type>/delta/', FormDeltaView.as_view(), name='form-delta'),
     path('finalize/<int:submission_id>/', FinalizeSubmissionView.as_view(), name='finalize-submission'),
     path('admin/students/', AdminStudentListView.as_view(), name='admin-student-list'),
+    path('admin/students/search/', AdminStudentSearchView.as_view(), name='admin-student-search'),
     path('admin/students/<str:student_id>/', get_student_profile_by_id),
+    path('admin/students/<str:student_id>/overview/', get_student_overview, name='admin-student-overview'),
     path('get/enums/', EnumChoicesView.as_view(), name='enum-choices'),
-    path('admin/student-forms/<str:student_id>/', AdminStudentFormsView.as_view()),
+    path('admin/student-forms/<str:student_id>/', AdminSubmissionListView.as_view()),
     path('admin/student-forms/<str:student_id>/<str:form_type>/', AdminStudentFormView.as_view(), name='admin-student-form-view'),
     path('graduation/<str:student_number>/', GraduationView.as_view(), name='graduation'),
     
@@ -13,12 +13,15 @@ def check_required_fields(instance, fields, status):
     if status == 'draft':
         return  # Skip validation for draft forms
     
-    # Validation logic for submitted forms
+    # Validation logic for submitted forms; report every missing field at once
+    errors = {}
     for field, condition in fields.items():
         value = getattr(instance, field, None)
         if condition == 'required' and not value:
-            raise ValidationError({field: f'This field is required when the form is submitted.'})
+            errors[field] = 'This field is required when the form is submitted.'
 
+    if errors:
+        raise ValidationError(errors)
     return None
 
 
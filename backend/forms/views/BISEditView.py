@@ -6,7 +6,9 @@ from forms.models import Submission, StudentSupport, Support
 from forms.models import SocioEconomicStatus, Preferences, PresentScholasticStatus
 from forms.serializers import PreferencesSerializer,StudentSupportSerializer, SocioEconomicStatusSerializer, PresentScholasticStatusSerializer, BISStudentSerializer
 from forms.serializers import AdminSubmissionDetailSerializer
-from forms.map import FORM_SECTIONS_MAP
+from forms.bundles import load_bundle
+from forms.drafts import flush_draft
+from forms.schema import get_form
 import logging 
 
 logger = logging.getLogger(__name__)
@@ -26,27 +28,8 @@ class BISEditView(APIView):
             if not request.user.is_staff and submission.student.user != request.user:
                 return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
-            sections = FORM_SECTIONS_MAP.get('bis')
-            if not sections:
-                return Response({'error': 'Invalid form type'}, status=status.HTTP_400_BAD_REQUEST)
-
             data = {'submission': AdminSubmissionDetailSerializer(submission).data}
-
-            for key, (model, serializer) in sections.items():
-                many = model._meta.model_name in ['sibling', 'previousschoolrecord']
-                
-                if any(field.name == 'submission' for field in model._meta.fields):
-                    queryset = model.objects.filter(submission=submission)
-                elif any(field.name == 'student' for field in model._meta.fields):
-                    queryset = model.objects.filter(student=submission.student)
-                else:
-                    queryset = model.objects.none()
-
-                if many:
-                    data[key] = serializer(queryset, many=True).data
-                else:
-                    instance = queryset.first()
-                    data[key] = serializer(instance).data if instance else None
+            data.update(load_bundle(submission, 'basic-information-sheet'))
 
             return Response(data, status=status.HTTP_200_OK)
 
@@ -65,6 +48,11 @@ class BISEditView(APIView):
             if not request.user.is_staff and submission.student.user != request.user:
                 logger.info("Permission not allowed. User is not a staff or a student.")
                 return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+            # Edits go straight to the section tables; write out buffered draft sections first.
+            errors = flush_draft(get_form('basic-information-sheet'), submission, submission.student, request)
+            if errors:
+                return Response({'message': 'Some sections failed validation.', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
             
             # Get the data from request
             data = request.data
@@ -1,15 +1,16 @@
 from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
-from forms.map import FORM_SECTIONS_MAP, FORM_TYPE_SLUG_MAP
+from forms.map import FORM_TYPE_SLUG_MAP
 from forms.models import Submission
+from forms.schema import get_form
 
 class BaseFormMixin:
     """Common utilities for form-based views."""
 
     def get_form_sections(self, form_type):
-        """Retrieve the sections for a given form slug."""
-        return FORM_SECTIONS_MAP.get(form_type)
+        """Retrieve the compiled sections (forms.schema.FormSchema) for a given form slug."""
+        return get_form(form_type)
 
     def get_submission(self, student, form_type):
         """Fetch the student's submission for a given form type."""
@@ -24,4 +25,4 @@ class BaseFormMixin:
 
     def update_submission_timestamp(self, submission):
         submission.saved_on = timezone.now()
-        submission.save()
+        submission.save(update_fields=['saved_on', 'updated_at'])
@@ -0,0 +1,62 @@
+from django.http import StreamingHttpResponse
+from django.utils.timezone import localdate
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.views import APIView
+
+from forms.dossiers import select_students, stream_dossiers
+from forms.exports import ExportError, export
+
+
+class AdminExportView(APIView):
+    """
+    Streams a dataset as CSV or JSONL.
+
+    GET admin/exports/<dataset>/?output=csv|jsonl&columns=a,b&<filter>=value
+    Rows are read through a server-side cursor and written as they arrive, so
+    memory use does not depend on the number of rows.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, dataset):
+        output = request.query_params.get('output', 'csv')
+        columns = [column for column in request.query_params.get('columns', '').split(',') if column]
+
+        try:
+            chunks, content_type = export(dataset, output=output, columns=columns, params=request.query_params)
+        except ExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{dataset}-{localdate().isoformat()}.{output}"'
+        return response
+
+
+class AdminDossierExportView(APIView):
+    """
+    Streams a zip of per-student dossiers (profile and every submitted form).
+
+    POST admin/dossiers/ with {"student_numbers": [...], "filters": {...}, "html": false}.
+    Filters are those of the students export dataset. Students are loaded in
+    batches and each dossier is written to the response as soon as it is built.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        student_numbers = request.data.get('student_numbers') or []
+        if isinstance(student_numbers, str):
+            student_numbers = student_numbers.split(',')
+        filters = request.data.get('filters') or {}
+        if not isinstance(student_numbers, list) or not isinstance(filters, dict):
+            return Response({'error': 'student_numbers must be a list and filters an object.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            found, missing = select_students(student_numbers, filters)
+        except ExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        chunks = stream_dossiers(found, missing=missing, html=bool(request.data.get('html')))
+        response = StreamingHttpResponse(chunks, content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="dossiers-{localdate().isoformat()}.zip"'
+        return response
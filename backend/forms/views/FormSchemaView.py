@@ -0,0 +1,29 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from forms.schema import schema_document
+
+
+class FormSchemaView(APIView):
+    """
+    JSON Schema of every form type, or of one with a form_type slug.
+
+    The document is compiled with the form registry at startup, so it only
+    changes on deploy: responses carry its ETag and a matching If-None-Match
+    is answered with 304.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, form_type=None):
+        document, etag = schema_document()
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+        if form_type is not None and form_type not in document:
+            return Response({'error': 'Invalid form type.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(document if form_type is None else document[form_type], headers=headers)
@@ -2,7 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from forms.models import Student, Submission
+from analytics import counters
 
 class FormStatusView(APIView):
     """
@@ -26,28 +26,13 @@ class FormStatusView(APIView):
             
             student = request.user.student
             
-            # Check each form type for students
+            # One primary-key read of the student's submitted-forms bitmap
+            submitted = counters.submitted_forms(student.pk)
             result = {
-                'bis': Submission.objects.filter(
-                    student=student,
-                    form_type='Basic Information Sheet',
-                    status='submitted'
-                ).exists(),
-                'scif': Submission.objects.filter(
-                    student=student,
-                    form_type='Student Cumulative Information File',
-                    status='submitted'
-                ).exists(),
-                'pard': Submission.objects.filter(
-                    student=student,
-                    form_type='Psychosocial Assistance and Referral Desk',
-                    status='submitted'
-                ).exists(),
-                'referral-form': Submission.objects.filter(
-                    student=student,
-                    form_type='Counseling Referral Slip',
-                    status='submitted'
-                ).exists()
+                'bis': submitted['Basic Information Sheet'],
+                'scif': submitted['Student Cumulative Information File'],
+                'pard': submitted['Psychosocial Assistance and Referral Desk'],
+                'referral-form': submitted['Counseling Referral Slip']
             }
             
             return Response(result, status=status.HTTP_200_OK)
@@ -263,7 +263,15 @@ from django.core.exceptions import ValidationError
 from forms.models import Submission, PrivacyConsent
 from forms.serializers import SubmissionSerializer, PrivacyConsentSerializer
 from .BaseFormMixin import BaseFormMixin
-from forms.map import FORM_SECTIONS_MAP, FORM_TYPE_UNSLUG_MAP, OPTIONAL_SECTIONS, FORM_TYPE_SLUG_MAP
+from forms.bundles import load_bundle
+from django.db import transaction
+from forms.writes import write_sections, section_versions
+from forms.drafts import flush_draft, save_draft
+from forms import autosave
+from forms.deltas import DeltaError, parse_deltas, apply_deltas
+from forms.finalize import finalize_errors
+from forms.schema import get_form
+from forms.map import FORM_TYPE_UNSLUG_MAP, FORM_TYPE_SLUG_MAP
 from users.utils import log_action
 from django.http import HttpResponse
 
@@ -303,7 +311,7 @@ class FormBundleView(APIView, BaseFormMixin):
             return Response({'error': 'Invalid form type.'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            submission = Submission.objects.get(
+            submission = Submission.objects.select_related('student').get(
                 student=student,
                 form_type=FORM_TYPE_SLUG_MAP.get(form_type)
             )
@@ -321,30 +329,9 @@ class FormBundleView(APIView, BaseFormMixin):
         if not submission_exists:
             return Response(response_data, status=status.HTTP_200_OK)
 
-        for key, (model, serializer_class) in sections.items():
-            many = key in [
-                'siblings',
-                'previous_school_record',
-                'college_awards',
-                'memberships',
-                'psychometric_data',
-            ]
-            if model._meta.model_name == 'pard':
-                filter_field = 'submission_id'
-                filter_value = submission
-            elif 'submission' in [f.name for f in model._meta.fields]:
-                filter_field = 'submission'
-                filter_value = submission
-            else:
-                filter_field = 'student'
-                filter_value = student
-            queryset = model.objects.filter(**{filter_field: filter_value})
-
-            if many:
-                response_data[key] = serializer_class(queryset, many=True).data
-            else:
-                instance = queryset.first()
-                response_data[key] = serializer_class(instance).data if instance else None
+        response_data.update(load_bundle(submission, form_type))
+        response_data['versions'] = section_versions(submission, sections)
+        response_data['durable'] = autosave.pending(submission.pk, submission.autosave_token) is None
 
         return Response(response_data, status=status.HTTP_200_OK)
 
@@ -369,7 +356,11 @@ class FormBundleView(APIView, BaseFormMixin):
         }, status=status.HTTP_201_CREATED)
 
     def patch(self, request, form_type):
-        """Update multiple sections at once."""
+        """
+        Update multiple sections at once. Browser autosaves pass ?autosave=1
+        and may be coalesced (see forms.autosave); `durable` in the response
+        says whether the data has reached the database.
+        """
         student = request.user.student
         sections = self.get_form_sections(form_type)
         if not sections:
@@ -382,29 +373,19 @@ class FormBundleView(APIView, BaseFormMixin):
         if submission.status == 'submitted':
             return Response({'error': 'You cannot modify a submitted form.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        errors, updated_data = {}, {}
-
-        for key, (model, serializer_class) in sections.items():
-            section_data = request.data.get(key)
-            if section_data is None:
-                continue
-
-            many = isinstance(section_data, list)
-            section_data = self._attach_foreign_keys(section_data, model, submission, student, many)
-            serializer = self._get_section_serializer(serializer_class, model, submission, student, section_data, many)
-
-            if serializer.is_valid():
-                serializer.save()
-                updated_data[key] = serializer.data
-            else:
-                errors[key] = serializer.errors
-
+        # Drafts are saved to the submission's draft buffer (see forms.drafts).
+        coalesce = request.query_params.get('autosave') in ('1', 'true')
+        updated_data, errors, durable = save_draft(sections, request.data, submission, student, request, coalesce=coalesce)
         if errors:
             return Response({'message': 'Some sections failed validation.', 'errors': errors, 'data': updated_data},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        self.update_submission_timestamp(submission)
-        return Response({'message': 'Form updated successfully.', 'data': updated_data}, status=status.HTTP_200_OK)
+        return Response({
+            'message': 'Form updated successfully.',
+            'data': updated_data,
+            'versions': section_versions(submission, sections),
+            'durable': durable,
+        }, status=status.HTTP_200_OK)
 
     def delete(self, request, form_type):
         """Delete a draft submission."""
@@ -419,41 +400,35 @@ class FormBundleView(APIView, BaseFormMixin):
         submission.delete()
         return Response({'message': 'Submission deleted successfully.'}, status=status.HTTP_204_NO_CONTENT)
 
-    # --- Helper methods ---
-
-    def _attach_foreign_keys(self, section_data, model, submission, student, many):
-        """Ensure each section has submission/student foreign keys attached."""
-        def attach_keys(item):
-            if 'submission' not in item and 'submission' in [f.name for f in model._meta.fields]:
-                item['submission'] = submission.id
-            if 'student' not in item and 'student' in [f.name for f in model._meta.fields]:
-                item['student'] = student.student_number
-            return item
-
-        if many:
-            return [attach_keys(item) for item in section_data]
-        return attach_keys(section_data)
-
-    def _get_section_serializer(self, serializer_class, model, submission, student, section_data, many):
-        """Return a properly configured serializer instance for a given section."""
-        if many:
-            instances = model.objects.filter(submission=submission)
-            return serializer_class(
-                instance=instances,
-                data=section_data,
-                many=True,
-                partial=True,
-                context={'submission': submission, 'student': student, 'request': self.request}
-            )
-        else:
-            instance = model.objects.filter(submission=submission).first()
-            return serializer_class(
-                instance=instance,
-                data=section_data,
-                many=False,
-                partial=True,
-                context={'submission': submission, 'student': student,  'request': self.request}
-            )
+class FormDeltaView(APIView, BaseFormMixin):
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request, form_type):
+        """Autosave field-level changes to versioned sections (see forms.deltas)."""
+        student = request.user.student
+        sections = self.get_form_sections(form_type)
+        if not sections:
+            return Response({'error': 'Invalid form type.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        submission, error = self.get_submission(student, form_type)
+        if error:
+            return error
+        if submission.status == 'submitted':
+            return Response({'error': 'You cannot modify a submitted form.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            deltas = parse_deltas(sections, request.data)
+        except DeltaError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        result, errors, conflicts = apply_deltas(sections, deltas, submission, student, request)
+        if conflicts:
+            return Response({'error': 'Stale section versions.', 'versions': conflicts}, status=status.HTTP_409_CONFLICT)
+        if errors:
+            return Response({'message': 'Some sections failed validation.', 'errors': errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_200_OK)
 
 class FinalizeSubmissionView(APIView):
     permission_classes = [IsAuthenticated]
@@ -472,35 +447,22 @@ class FinalizeSubmissionView(APIView):
             return Response({'message': 'Already submitted.'}, status=status.HTTP_400_BAD_REQUEST)
 
         form_type_slug = FORM_TYPE_UNSLUG_MAP.get(submission.form_type)
-        sections = FORM_SECTIONS_MAP.get(form_type_slug)
+        sections = get_form(form_type_slug)
         if not sections:
             return Response({'error': 'Invalid form type.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        errors = {}
-        for key, (model, _) in sections.items():
-            filter_kwargs = {}
-            if 'submission' in [f.name for f in model._meta.fields]:
-                filter_kwargs['submission'] = submission
-            if 'student' in [f.name for f in model._meta.fields]:
-                filter_kwargs['student'] = request.user.student
-
-            instance = model.objects.filter(**filter_kwargs).first()
-            if not instance and key not in OPTIONAL_SECTIONS.get(form_type_slug, []):
-                errors[key] = ['Section missing.']
-                continue
-
-            if instance:
-                try:
-                    instance.clean()
-                except ValidationError as e:
-                    errors[key] = e.message_dict
+        # Write out the buffered draft, check it and submit in one transaction.
+        with transaction.atomic():
+            errors = flush_draft(sections, submission, submission.student, request)
+            if not errors:
+                errors = finalize_errors(submission, form_type_slug)
+            if errors:
+                transaction.set_rollback(True)
+                return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        if errors:
-            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
-
-        submission.status = 'submitted'
-        submission.submitted_on = timezone.now()
-        submission.save()
+            submission.status = 'submitted'
+            submission.submitted_on = timezone.now()
+            submission.save()
 
         log_action(request, "submission", "Form finalized and submitted",
                    f"Submission ID: {submission.id}, Form type: {submission.form_type}")
@@ -520,81 +482,25 @@ class AdminFormEditView(APIView, BaseFormMixin):
             return Response({'error': 'Submission not found.'}, status=status.HTTP_404_NOT_FOUND)
 
         form_type_slug = FORM_TYPE_UNSLUG_MAP.get(submission.form_type)
-        sections = FORM_SECTIONS_MAP.get(form_type_slug)
+        sections = get_form(form_type_slug)
 
         if not sections:
             return Response({'error': 'Invalid form type.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        updated_data = {}
-        errors = {}
-
-        for key, (model, serializer_class) in sections.items():
-            section_data = request.data.get(key)
-            # Accept empty lists/empty objects as valid payloads (they should
-            # be processed and may signal deletions). Only skip when the key
-            # is absent (None).
-            if section_data is None:
-                continue
-
-            many = isinstance(section_data, list)
-            section_data = self._attach_foreign_keys(
-                section_data, model, submission, submission.student, many
-            )
-
-            serializer = self._get_section_serializer(
-                serializer_class, model, submission, submission.student, section_data, many
-            )
-
-            if serializer.is_valid():
-                serializer.save()
-                updated_data[key] = serializer.data
-            else:
-                errors[key] = serializer.errors
-
+        # Admin edits go straight to the section tables; write out buffered draft sections first.
+        with transaction.atomic():
+            errors = flush_draft(sections, submission, submission.student, request)
+            if not errors:
+                updated_data, errors = write_sections(sections, request.data, submission, submission.student, request)
+            if errors:
+                transaction.set_rollback(True)
         if errors:
             return Response(
-                {'message': 'Some sections failed validation.', 'errors': errors, 'data': updated_data},
+                {'message': 'Some sections failed validation.', 'errors': errors, 'data': {}},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        submission.saved_on = timezone.now()
-        submission.save()
-
         return Response(
             {'message': 'Form updated successfully by admin.', 'data': updated_data},
             status=status.HTTP_200_OK
         )
-        
-    def _attach_foreign_keys(self, section_data, model, submission, student, many):
-        """Ensure each section has submission/student foreign keys attached."""
-        def attach_keys(item):
-            if 'submission' not in item and 'submission' in [f.name for f in model._meta.fields]:
-                item['submission'] = submission.id
-            if 'student' not in item and 'student' in [f.name for f in model._meta.fields]:
-                item['student'] = student.student_number
-            return item
-
-        if many:
-            return [attach_keys(item) for item in section_data]
-        return attach_keys(section_data)
-
-    def _get_section_serializer(self, serializer_class, model, submission, student, section_data, many):
-        """Return a properly configured serializer instance for a given section."""
-        if many:
-            instances = model.objects.filter(submission=submission)
-            return serializer_class(
-                instance=instances,
-                data=section_data,
-                many=True,
-                partial=True,
-                context={'submission': submission, 'student': student,  'request': self.request}
-            )
-        else:
-            instance = model.objects.filter(submission=submission).first()
-            return serializer_class(
-                instance=instance,
-                data=section_data,
-                many=False,
-                partial=True,
-                context={'submission': submission, 'student': student,  'request': self.request}
-            )
\ No newline at end of file
@@ -0,0 +1,34 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.views import APIView
+
+from forms.search import search_students
+from analytics.filters import cohort_params, student_q
+from forms.models import Student
+
+
+class AdminStudentSearchView(APIView):
+    """
+    Ranked, typo-tolerant student lookup: ?q=<name, nickname or student number>.
+    Accepts limit (max 50) and the same cohort filters as the student list.
+    """
+    permission_classes = [IsAdminUser]
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': "The 'q' parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.max_limit)
+        except ValueError:
+            return Response({'error': 'limit must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Student.objects.filter(student_q(cohort_params(request.query_params)))
+        statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+
+        return Response({'query': query, 'results': search_students(query, limit=limit, queryset=queryset)})
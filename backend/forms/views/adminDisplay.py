@@ -2,18 +2,47 @@
 from rest_framework.permissions import IsAdminUser
 from rest_framework.generics import ListAPIView
 from forms.models import Student, Submission, Referral, PARD
-from forms.serializers import StudentSerializer, AdminSubmissionDetailSerializer, SubmissionSerializer, AdminReferralListSerializer, AdminReferralDetailSerializer, PARDSerializer
+from forms.serializers import StudentSerializer, StudentListSerializer, SubmissionSerializer, AdminReferralListSerializer, AdminReferralDetailSerializer, PARDSerializer, AdminPARDListSerializer, REFERRAL_LIST_VALUES, referral_list_rows
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
-from forms.map import FORM_SECTIONS_MAP, FORM_TYPE_UNSLUG_MAP, FORM_TYPE_SLUG_MAP
+from rest_framework.exceptions import APIException
+from forms.map import FORM_TYPE_UNSLUG_MAP, FORM_TYPE_SLUG_MAP
+from forms.pagination import StudentCursorPagination, SubmissionCursorPagination, SubmissionListPagination, ReferralInboxPagination
+from forms.bundles import load_bundle
+from forms.overview import parse_expand, student_overview
+from forms.projections import SubmissionProjection, ProjectionError
+from django.core.exceptions import ValidationError
+from django.db.models import Exists, OuterRef, Subquery
+from rest_framework.filters import OrderingFilter
+from analytics.filters import cohort_params, student_q
 
 class AdminStudentListView(ListAPIView):
-    queryset = Student.objects.all()
-    serializer_class = StudentSerializer
+    """
+    Compact student list for admins.
+
+    Filters: status, college, degree_program, year_level, entry_year,
+    entry_semester, sex, region (comma-separated for several values).
+    Ordering: ?ordering=last_name, -degree_program, etc.
+    Pagination: cursor pages of page_size (default 25, at most 100);
+    ?paginate=false returns the whole list.
+    """
+    serializer_class = StudentListSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = StudentCursorPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['student_number', 'last_name', 'first_name', 'college', 'degree_program', 'current_year_level', 'status']
+    ordering = ['last_name', 'first_name', 'student_number']
+
+    def get_queryset(self):
+        queryset = Student.objects.select_related('user').only(*StudentListSerializer.ONLY_FIELDS)
+        queryset = queryset.filter(student_q(cohort_params(self.request.query_params)))
+        statuses = [value for value in self.request.query_params.get('status', '').split(',') if value]
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+        return queryset
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
@@ -25,6 +54,24 @@ def get_student_profile_by_id(request, student_id):
     except Student.DoesNotExist:
         return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
     
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_student_overview(request, student_id):
+    """
+    Student 360: profile, submissions with section counts and PARD status,
+    referrals made/received, acknowledgement receipts and graduation info.
+    ?expand=basic-information-sheet,... (or all) adds full section data.
+    """
+    try:
+        expand = parse_expand(request.query_params.get('expand'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    overview = student_overview(student_id, expand=expand)
+    if overview is None:
+        return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(overview)
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_referral_detail(request, submission_id):
@@ -64,48 +111,109 @@ def get_referral_detail(request, submission_id):
     )
   
     
-class AdminBISList(APIView):
+class AdminSubmissionListView(APIView):
+    """
+    Submitted forms of one type (or of every type), newest first. Also
+    serves the per-form lists and a student's forms, with form_type or
+    student_id fixed by the URL.
+
+    Fields: ?fields=id,submitted_on,student.last_name (`student` for the
+    student summary); defaults to the AdminSubmissionDetailSerializer shape.
+    Filters: student_number plus the cohort filters (college, degree_program,
+    year_level, entry_year, entry_semester, sex, region).
+    Ordering: ?ordering=submitted_on or -submitted_on.
+    Pagination: cursor pages of page_size (default 25, at most 100);
+    ?paginate=false returns the whole list.
+    """
     permission_classes = [IsAdminUser]
-
-    def get(self, request):
-        if not request.user.is_staff:
-            return Response({'error': 'Permission denied, admins only.'}, status=403)
-
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['submitted_on']
+    ordering = ['-submitted_on', '-id']
+
+    def get(self, request, form_type=None, student_id=None):
+        submissions = Submission.objects.filter(status='submitted', submitted_on__isnull=False)
+        if form_type is not None:
+            form_type_display = FORM_TYPE_SLUG_MAP.get(form_type)
+            if not form_type_display:
+                return Response({'error': 'Invalid form type.'}, status=status.HTTP_400_BAD_REQUEST)
+            submissions = submissions.filter(form_type=form_type_display)
+
+        student_number = student_id or request.query_params.get('student_number')
+        if student_number:
+            submissions = submissions.filter(student__student_number=student_number)
+        submissions = submissions.filter(student_q(cohort_params(request.query_params), prefix='student__'))
+
+        paginator = SubmissionListPagination()
+        ordering = paginator.get_ordering(request, submissions, self)
+        fields = [field.strip() for field in request.query_params.get('fields', '').split(',') if field.strip()]
         try:
-            submissions = Submission.objects.filter(form_type="Basic Information Sheet", status="submitted") 
-            serializer = AdminSubmissionDetailSerializer(submissions, many=True)
-            return Response(serializer.data, status=200)
+            projection = SubmissionProjection(fields, extra=[field.lstrip('-') for field in ordering])
+        except ProjectionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        except Exception as e:
-            return Response({'error': str(e)}, status=500)
-
-class AdminSCIFList(APIView):
-    permission_classes = [IsAdminUser]
-
-    def get(self, request):
-        if not request.user.is_staff:
-            return Response({'error': 'Permission denied, admins only.'}, status=403)
-
-        try:
-            submissions = Submission.objects.filter(form_type="Student Cumulative Information File", status="submitted") 
-            serializer = AdminSubmissionDetailSerializer(submissions, many=True)
-            return Response(serializer.data, status=200)
+        rows = submissions.values(*projection.lookups())
+        page = paginator.paginate_queryset(rows, request, view=self)
+        if page is None:
+            return Response(projection.shape(rows.order_by(*ordering)), status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(projection.shape(page))
 
-        except Exception as e:
-            return Response({'error': str(e)}, status=500)
-    
 class AdminReferralListView(APIView):
+    """
+    Referral inbox, newest first, from one joined values() query.
+
+    Filters: status (unread/read/acknowledged, comma-separated), referred_from
+    and referred_to (YYYY-MM-DD), referrer_type (student|guest).
+    Pagination: pass page_size and/or cursor for keyset pages on referral_date.
+    """
     permission_classes = [IsAdminUser]
 
     def get(self, request):
         try:
-            referrals = Referral.objects.filter(submission__status="submitted").order_by('-referral_date')
-            serializer = AdminReferralListSerializer(referrals, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            referrals = Referral.objects.filter(submission__status="submitted")
+
+            statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+            if statuses:
+                referrals = referrals.filter(referral_status__in=statuses)
+            if request.query_params.get('referred_from'):
+                referrals = referrals.filter(referral_date__date__gte=request.query_params['referred_from'])
+            if request.query_params.get('referred_to'):
+                referrals = referrals.filter(referral_date__date__lte=request.query_params['referred_to'])
+            referrer_type = request.query_params.get('referrer_type')
+            if referrer_type == 'student':
+                referrals = referrals.filter(referrer__student__isnull=False)
+            elif referrer_type == 'guest':
+                referrals = referrals.filter(referrer__isnull=False, referrer__student__isnull=True)
+            elif referrer_type:
+                return Response({'error': "referrer_type must be 'student' or 'guest'."}, status=status.HTTP_400_BAD_REQUEST)
+
+            rows = referrals.values(
+                'id', 'submission_id', 'referral_date', 'referral_status', 'referrer_id', 'referred_person_id',
+                **REFERRAL_LIST_VALUES,
+            )
+
+            if 'cursor' in request.query_params or 'page_size' in request.query_params:
+                paginator = ReferralInboxPagination()
+                page = paginator.paginate_queryset(rows, request, view=self)
+                return paginator.get_paginated_response(referral_list_rows(page))
+
+            return Response(referral_list_rows(rows.order_by('-referral_date', '-id')), status=status.HTTP_200_OK)
+        except ValidationError as e:
+            return Response({'error': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+        except APIException:
+            # e.g. NotFound for a malformed cursor; let DRF answer it.
+            raise
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 class AdminPARDList(APIView):
+    """
+    Submitted PARD forms with their case status, in one query.
+
+    Filters: status (comma-separated PARD statuses), submitted_from and
+    submitted_to (YYYY-MM-DD). Deleted cases are always left out.
+    Pagination: cursor pages of page_size (default 25, at most 100);
+    ?paginate=false returns the whole list.
+    """
     permission_classes = [IsAdminUser]
 
     def get(self, request):
@@ -113,41 +221,40 @@ class AdminPARDList(APIView):
             return Response({'error': 'Permission denied, admins only.'}, status=403)
 
         try:
-            submissions = Submission.objects.filter(
-                form_type="Psychosocial Assistance and Referral Desk", 
-                status="submitted"
-            ).select_related('student')
-
-            data = []
-            for submission in submissions:
-                submission_data = AdminSubmissionDetailSerializer(submission).data
-                
-                # Add PARD status only
-                try:
-                    pard = PARD.objects.get(submission_id=submission)
-                    # Skip deleted PARD submissions
-                    if pard.status == 'deleted':
-                        continue
-                    submission_data['pard_status'] = pard.status
-                except PARD.DoesNotExist:
-                    submission_data['pard_status'] = None
-                    
-                data.append(submission_data)
-            
-            return Response(data, status=200)
-        except Exception as e:
-            return Response({'error': str(e)}, status=500)
+            pard_status = PARD.objects.filter(submission_id=OuterRef('pk')).order_by('-id').values('status')[:1]
+            submissions = (
+                Submission.objects
+                .filter(form_type="Psychosocial Assistance and Referral Desk", status="submitted")
+                .select_related('student')
+                .only(*AdminPARDListSerializer.ONLY_FIELDS)
+                .annotate(pard_status=Subquery(pard_status))
+                .exclude(Exists(PARD.objects.filter(submission_id=OuterRef('pk'), status='deleted')))
+                .order_by('-submitted_on', '-id')
+            )
 
-class AdminStudentFormsView(APIView):
-    def get(self, request, student_id):
-        try:
-            submissions = Submission.objects.filter(student__student_number=student_id, status='submitted')
+            statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+            if statuses:
+                submissions = submissions.filter(pard_status__in=statuses)
+            if request.query_params.get('submitted_from'):
+                submissions = submissions.filter(submitted_on__date__gte=request.query_params['submitted_from'])
+            if request.query_params.get('submitted_to'):
+                submissions = submissions.filter(submitted_on__date__lte=request.query_params['submitted_to'])
+
+            paginator = SubmissionCursorPagination()
+            page = paginator.paginate_queryset(submissions, request, view=self)
+            if page is not None:
+                return paginator.get_paginated_response(AdminPARDListSerializer(page, many=True).data)
 
-            serializer = AdminSubmissionDetailSerializer(submissions, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            serializer = AdminPARDListSerializer(submissions, many=True)
+            return Response(serializer.data, status=200)
+        except ValidationError as e:
+            return Response({'error': e.messages}, status=400)
+        except APIException:
+            # e.g. NotFound for a malformed cursor; let DRF answer it.
+            raise
         except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
+            return Response({'error': str(e)}, status=500)
+
 class AdminStudentFormView(APIView):
     permission_classes = [IsAdminUser]  
 
@@ -168,88 +275,6 @@ class AdminStudentFormView(APIView):
         data = {
             'submission': SubmissionSerializer(submission).data,
         }
-
-        # Special handling for PARD
-        if form_type == 'psychosocial-assistance-and-referral-desk':
-            
-            
-            try:
-                pard = PARD.objects.get(submission_id=submission)
-                data['pard_data'] = PARDSerializer(pard).data
-            except PARD.DoesNotExist:
-                data['pard_data'] = None
-                
-            return Response(data, status=status.HTTP_200_OK)
-
-        # Regular form handling
-        sections = FORM_SECTIONS_MAP.get(form_type)
-        if not sections:
-            return Response({'error': 'Invalid form type sections.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        data = {
-            'submission': SubmissionSerializer(submission).data,
-        }
-
-        # Special handling for PARD
-        if form_type == 'psychosocial-assistance-and-referral-desk':
-            
-            
-            try:
-                pard = PARD.objects.get(submission_id=submission)
-                data['pard_data'] = PARDSerializer(pard).data
-            except PARD.DoesNotExist:
-                data['pard_data'] = None
-                
-            return Response(data, status=status.HTTP_200_OK)
-
-        # Regular form handling
-        sections = FORM_SECTIONS_MAP.get(form_type)
-        if not sections:
-            return Response({'error': 'Invalid form type sections.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        data = {
-            'submission': SubmissionSerializer(submission).data,
-        }
-
-        # Special handling for PARD
-        if form_type == 'psychosocial-assistance-and-referral-desk':
-            
-            
-            try:
-                pard = PARD.objects.get(submission_id=submission)
-                data['pard_data'] = PARDSerializer(pard).data
-            except PARD.DoesNotExist:
-                data['pard_data'] = None
-                
-            return Response(data, status=status.HTTP_200_OK)
-
-        # Regular form handling
-        sections = FORM_SECTIONS_MAP.get(form_type)
-        if not sections:
-            return Response({'error': 'Invalid form type sections.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        for key, (model, serializer) in sections.items():
-            # Treat these section keys as multi-item lists so the API returns
-            # all related objects (not just the first one).
-            many = key in [
-                'siblings',
-                'previous_school_record',
-                'college_awards',
-                'memberships',
-                'psychometric_data',
-            ]
-
-            if any(field.name == 'submission' for field in model._meta.fields):
-                queryset = model.objects.filter(submission=submission)
-            elif any(field.name == 'student' for field in model._meta.fields):
-                queryset = model.objects.filter(student=submission.student)
-            else:
-                queryset = model.objects.none()
-
-            if many:
-                data[key] = serializer(queryset, many=True).data
-            else:
-                instance = queryset.first()
-                data[key] = serializer(instance).data if instance else None
+        data.update(load_bundle(submission, form_type))
 
         return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
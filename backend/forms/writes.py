@@ -0,0 +1,171 @@
+"""
+Section write path behind FormBundleView.patch and AdminFormEditView.patch.
+
+Every section in a payload is validated before anything is written, and if
+one fails nothing is saved. The valid sections are then persisted, with the
+submission's saved_on, in one transaction. Sections whose serializer is a
+plain ModelSerializer over a model without a custom save(), many-to-many
+fields or save/delete signals are written with one bulk_create and one
+bulk_update per model; repeating sections sync themselves in bulk through
+CustomListSerializer. The others go through their serializer's save().
+"""
+from collections import defaultdict
+from functools import lru_cache
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from forms.models import Submission
+from forms.serializers.SerializerSCIF import bulk_safe
+
+
+def attach_owners(section_data, section, submission, student, many):
+    owners = {'submission': submission.id, 'student': student.student_number if student else None}
+    for item in section_data if many else [section_data]:
+        for name in section.owners:
+            if name not in item:
+                item[name] = owners[name]
+    return section_data
+
+
+@lru_cache(maxsize=None)
+def bulk_writable(serializer_class, model):
+    if serializer_class.create is not serializers.ModelSerializer.create:
+        return False
+    if serializer_class.update is not serializers.ModelSerializer.update:
+        return False
+    if not bulk_safe(model) or model._meta.many_to_many:
+        return False
+    return not any(isinstance(field, serializers.BaseSerializer) for field in serializer_class().fields.values())
+
+
+def validate_sections(form, payload, submission, student, request=None):
+    """
+    Bind and validate a serializer for each section of `form` present in
+    `payload`. Returns (writes, errors); `writes` is a list of (section, serializer, many).
+    """
+    context = {'submission': submission, 'student': student, 'request': request}
+    writes, errors = [], {}
+    for section in form:
+        section_data = payload.get(section.key)
+        # Empty lists/objects are processed (they may signal deletions);
+        # only absent keys are skipped.
+        if section_data is None:
+            continue
+
+        many = isinstance(section_data, list)
+        section_data = attach_owners(section_data, section, submission, student, many)
+        queryset = section.for_submission(submission)
+        instance = list(queryset) if many else queryset.first()
+        serializer = section.serializer_class(instance=instance, data=section_data, many=many, partial=True, context=context)
+        if serializer.is_valid():
+            writes.append((section, serializer, many))
+        else:
+            errors[section.key] = serializer.errors
+    return writes, errors
+
+
+class BulkWriter:
+    """Collects section rows and writes them with one statement per model and operation."""
+
+    def __init__(self):
+        self.now = timezone.now()
+        self.creates = defaultdict(list)
+        self.updates = defaultdict(dict)
+        self.update_fields = defaultdict(set)
+
+    def create(self, model, attrs):
+        instance = model(**attrs)
+        self.creates[model].append(instance)
+        return instance
+
+    def update(self, model, instance, attrs):
+        fields = [name for name in attrs if name != 'id']
+        for name in fields:
+            setattr(instance, name, attrs[name])
+        # bulk_update does not run pre_save, so auto_now columns are set here.
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                setattr(instance, field.attname, self.now)
+                fields.append(field.name)
+        self.updates[model][instance.pk] = instance
+        self.update_fields[model].update(fields)
+        return instance
+
+    def stage(self, model, serializer):
+        attrs = serializer.validated_data
+        if serializer.instance is None:
+            serializer.instance = self.create(model, attrs)
+        else:
+            self.update(model, serializer.instance, attrs)
+
+    def flush(self):
+        for model, instances in self.updates.items():
+            if instances and self.update_fields[model]:
+                model.objects.bulk_update(list(instances.values()), sorted(self.update_fields[model]))
+        for model, instances in self.creates.items():
+            model.objects.bulk_create(instances)
+
+
+def section_versions(submission, form):
+    """Version number of every section of the form; 0 for sections never saved."""
+    return {section.key: submission.section_versions.get(section.key, 0) for section in form}
+
+
+def lock_submission(submission):
+    """
+    Lock the submission row for the rest of the transaction and refresh its
+    section versions, draft buffer and autosave token, so concurrent saves
+    apply one after the other.
+    """
+    submission.section_versions, submission.draft_buffer, submission.autosave_token = (
+        Submission.objects.select_for_update()
+        .values_list('section_versions', 'draft_buffer', 'autosave_token')
+        .get(pk=submission.pk)
+    )
+    return submission.section_versions
+
+
+def touch_submission(submission, keys, now, fields=()):
+    """
+    Bump saved_on and the version of each written section, saving `fields`
+    in the same UPDATE. Call after lock_submission().
+    """
+    versions = dict(submission.section_versions)
+    for key in keys:
+        versions[key] = versions.get(key, 0) + 1
+    submission.section_versions = versions
+    submission.saved_on = now
+    submission.save(update_fields=['saved_on', 'section_versions', 'updated_at', *fields])
+
+
+def persist_sections(writes):
+    """Write validated sections to their tables. Returns the timestamp used for auto_now columns."""
+    writer = BulkWriter()
+    for section, serializer, many in writes:
+        # Repeating sections are synced in bulk by CustomListSerializer itself.
+        if not many and bulk_writable(type(serializer), section.model):
+            writer.stage(section.model, serializer)
+        else:
+            serializer.save()
+    writer.flush()
+    return writer.now
+
+
+def save_sections(writes, submission):
+    """Persist validated sections, bump saved_on and their versions atomically. Returns {key: data}."""
+    with transaction.atomic():
+        lock_submission(submission)
+        now = persist_sections(writes)
+        touch_submission(submission, [section.key for section, _, _ in writes], now)
+
+    return {section.key: serializer.data for section, serializer, _ in writes}
+
+
+def write_sections(form, payload, submission, student, request=None):
+    """Validate then save every section in `payload`. Returns (data, errors); nothing is written on errors."""
+    writes, errors = validate_sections(form, payload, submission, student, request)
+    if errors:
+        return {}, errors
+    return save_sections(writes, submission), {}
@@ -140,7 +140,7 @@ export const AdminBISList = () => {
     const fetchData = async () => {
       try {
         const res = await request(
-          "/api/forms/admin/basic-information-sheet-submissions"
+          "/api/forms/admin/basic-information-sheet-submissions?paginate=false"
         );
         if (res.ok) {
           const data = await res.json();
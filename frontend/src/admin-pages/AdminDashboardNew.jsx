@@ -118,7 +118,7 @@ const filterAndSortRows = (rows, filterText, selectedFilters, sortField, sortDir
     const fetchPardForms = async () => {
       try {
         const res = await request(
-          "/api/forms/admin/psychosocial-assistance-and-referral-desk"
+          "/api/forms/admin/psychosocial-assistance-and-referral-desk?paginate=false"
         );
         if (!res || !res.ok) throw new Error("Failed to fetch PARD forms");
         const data = await res.json();
@@ -140,7 +140,7 @@ export const AdminSCIFList = () => {
     const fetchData = async () => {
       try {
         const res = await request(
-          "/api/forms/admin/student-cumulative-information-file-submissions"
+          "/api/forms/admin/student-cumulative-information-file-submissions?paginate=false"
         );
         if (!res.ok) throw new Error("Failed to fetch SCIF submissions");
         const data = await res.json();
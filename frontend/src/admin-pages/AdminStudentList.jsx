@@ -118,7 +118,7 @@ export const AdminStudentList = () => {
   useEffect(() => {
     const fetchStudents = async () => {
       try {
-        const res = await request("/api/forms/admin/students/");
+        const res = await request("/api/forms/admin/students/?paginate=false");
         if (!res.ok) throw new Error("Failed to fetch students");
         const data = await res.json();
         data.sort((a, b) => a.last_name.localeCompare(b.last_name));
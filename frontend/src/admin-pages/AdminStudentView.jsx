@@ -23,7 +23,7 @@ export const AdminStudentView = () => {
           const data = await res.json();
           setStudent(data);
 
-          const formRes = await request(`http://localhost:8000/api/forms/admin/student-forms/${studentId}/`);
+          const formRes = await request(`http://localhost:8000/api/forms/admin/student-forms/${studentId}/?paginate=false`);
           if (formRes.ok) {
             const forms = await formRes.json();
             setSubmittedForms(forms); 